@@ -0,0 +1,123 @@
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from payload_cache import payload_cache
+from metrics import VECTOR_GET, timed
+
+
+class ActionCatalog:
+    """
+    In-memory index of the onboarding_flow collection for exact-ID lookups.
+
+    Holds O(1) maps of action_id -> parsed workflow step, action_id -> step_id and
+    action_id -> raw collection records, so lookups by a known action_id or step_id
+    don't need a vector search. Loaded once at startup from the collection; callers
+    fall back to vector search on a miss.
+    """
+
+    def __init__(self):
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.action_to_step: Dict[str, str] = {}
+        self.records: Dict[str, List[Dict[str, Any]]] = {}
+        self.is_loaded = False
+        self._lock = threading.Lock()
+
+    def _index(self, ids, documents, metadatas):
+        """Build fresh lookup maps from collection records."""
+        steps, action_to_step, records = {}, {}, {}
+        for record_id, document, metadata in zip(ids, documents, metadatas):
+            metadata = metadata or {}
+            action_id = metadata.get("action_id")
+            if not action_id:
+                continue
+
+            records.setdefault(action_id, []).append({
+                "id": record_id,
+                "content": document,
+                "metadata": metadata
+            })
+            if "step_id" in metadata:
+                action_to_step[action_id] = metadata["step_id"]
+            if "full_action" in metadata and action_id not in steps:
+                try:
+                    steps[action_id] = payload_cache.parse(metadata["full_action"])
+                except json.JSONDecodeError:
+                    print(f"Error parsing JSON for action_id {action_id}")
+        return steps, action_to_step, records
+
+    def _swap(self, steps, action_to_step, records):
+        with self._lock:
+            self.steps = steps
+            self.action_to_step = action_to_step
+            self.records = records
+            self.is_loaded = True
+
+    def load_from_vector_store(self, vector_store) -> bool:
+        """
+        (Re)load the catalog from every record of the vector store's collection.
+
+        Returns:
+            bool: True if the collection could be read.
+        """
+        try:
+            with timed(VECTOR_GET):
+                results = vector_store.get(include=["documents", "metadatas"])
+        except Exception as e:
+            print(f"Error loading action catalog from vector store: {e}")
+            return False
+
+        ids = results.get("ids") or []
+        documents = results.get("documents") or [None] * len(ids)
+        metadatas = results.get("metadatas") or [{}] * len(ids)
+        self._swap(*self._index(ids, documents, metadatas))
+        print(f"Action catalog loaded {len(self.steps)} steps and {len(self.action_to_step)} action mappings")
+        return True
+
+    def load_from_definitions(self, workflow_steps, action_to_step, onboarding_flow=None):
+        """
+        Load the catalog from the workflow definitions uploaded by upload_workflow_to_chroma,
+        using the same record layout as the collection.
+        """
+        from upload_workflow_to_chroma import build_workflow_records
+        ids, documents, metadatas = build_workflow_records(workflow_steps, action_to_step, onboarding_flow)
+        self._swap(*self._index(ids, documents, metadatas))
+        print(f"Action catalog loaded {len(self.steps)} steps from workflow definitions")
+
+    def ensure_loaded(self, vector_store):
+        """
+        Load the catalog once per process. If the collection can't be read, the
+        catalog is seeded from the workflow definitions in upload_workflow_to_chroma.
+        """
+        if self.is_loaded:
+            return
+        if not self.load_from_vector_store(vector_store):
+            from upload_workflow_to_chroma import workflow_steps, action_to_step, onboarding_flow
+            self.load_from_definitions(workflow_steps, action_to_step, onboarding_flow)
+
+    def get_step(self, step_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the parsed workflow step for an action_id or step_id, or None.
+        """
+        step = self.steps.get(step_id)
+        if step is not None:
+            return step
+        mapped_step_id = self.action_to_step.get(step_id)
+        if mapped_step_id:
+            return self.steps.get(mapped_step_id)
+        return None
+
+    def get_step_id(self, action_id: str) -> Optional[str]:
+        """Returns the step_id an action_id maps to, or None."""
+        return self.action_to_step.get(action_id)
+
+    def get_records(self, action_id: str) -> List[Dict[str, Any]]:
+        """
+        Returns the collection records whose metadata action_id matches exactly,
+        formatted like VectorDBTools results.
+        """
+        return [dict(record) for record in self.records.get(action_id, ())]
+
+
+# Shared catalog for RAGChainBuilder, VectorDBTools and /submit
+action_catalog = ActionCatalog()
@@ -0,0 +1,100 @@
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+from frozen import FrozenDict, freeze
+
+# Fields with a secondary index, besides action_id
+INDEXED_FIELDS = ("stage_name", "action_type", "api_endpoint_ref")
+
+
+class ActionRegistry:
+    """
+    Immutable, load-once index over an action catalog.
+
+    Actions are frozen (frozen.freeze) when the registry is built, and every
+    index is a read-only mapping of tuples, so the shared catalog can be handed to
+    any caller without copying and without the risk of one request mutating it for
+    the next. Lookups by action_id and by the INDEXED_FIELDS are dict lookups.
+    """
+
+    __slots__ = ("name", "_actions", "_by_id", "_indexes")
+
+    def __init__(self, actions: Iterable[Dict[str, Any]], name: str = "actions"):
+        """
+        Args:
+            actions (Iterable[dict]): The catalog's action definitions.
+            name (str): Label used in error messages.
+
+        Raises:
+            ValueError: If two actions share an action_id.
+        """
+        self.name = name
+        self._actions: Tuple[FrozenDict, ...] = tuple(freeze(action) for action in actions)
+
+        by_id: Dict[str, FrozenDict] = {}
+        indexes: Dict[str, Dict[Any, list]] = {field: {} for field in INDEXED_FIELDS}
+        for action in self._actions:
+            action_id = action["action_id"]
+            if action_id in by_id:
+                raise ValueError(f"Duplicate action_id '{action_id}' in {name}")
+            by_id[action_id] = action
+            for field in INDEXED_FIELDS:
+                value = action.get(field)
+                if value is not None:
+                    indexes[field].setdefault(value, []).append(action)
+
+        self._by_id: Mapping[str, FrozenDict] = MappingProxyType(by_id)
+        self._indexes: Mapping[str, Mapping[Any, Tuple[FrozenDict, ...]]] = MappingProxyType({
+            field: MappingProxyType({value: tuple(matches) for value, matches in index.items()})
+            for field, index in indexes.items()
+        })
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    def __iter__(self) -> Iterator[FrozenDict]:
+        return iter(self._actions)
+
+    def __contains__(self, action_id: str) -> bool:
+        return action_id in self._by_id
+
+    @property
+    def actions(self) -> Tuple[FrozenDict, ...]:
+        """Every action, in catalog order."""
+        return self._actions
+
+    @property
+    def by_id(self) -> Mapping[str, FrozenDict]:
+        """Read-only mapping of action_id to action."""
+        return self._by_id
+
+    def get(self, action_id: str) -> Optional[FrozenDict]:
+        """Returns the action with this action_id, or None."""
+        return self._by_id.get(action_id)
+
+    def find(self, field: str, value: Any) -> Tuple[FrozenDict, ...]:
+        """
+        Returns the actions whose `field` equals `value`, in catalog order.
+
+        Args:
+            field (str): One of INDEXED_FIELDS.
+            value: The value to match.
+        """
+        try:
+            index = self._indexes[field]
+        except KeyError:
+            raise ValueError(f"'{field}' is not indexed; expected one of {INDEXED_FIELDS}") from None
+        return index.get(value, ())
+
+    def by_stage(self, stage_name: str) -> Tuple[FrozenDict, ...]:
+        return self.find("stage_name", stage_name)
+
+    def by_type(self, action_type: str) -> Tuple[FrozenDict, ...]:
+        return self.find("action_type", action_type)
+
+    def by_endpoint(self, api_endpoint_ref: str) -> Tuple[FrozenDict, ...]:
+        return self.find("api_endpoint_ref", api_endpoint_ref)
+
+    def values(self, field: str) -> Tuple[Any, ...]:
+        """Distinct values of an indexed field, in first-seen order."""
+        return tuple(self._indexes[field])
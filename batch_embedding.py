@@ -0,0 +1,115 @@
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# --- Configuration ---
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "6"))
+EMBEDDING_RETRY_BASE_SECONDS = float(os.getenv("EMBEDDING_RETRY_BASE_SECONDS", "1.0"))
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for provider rate-limit responses (HTTP 429)."""
+    try:
+        from openai import RateLimitError
+        if isinstance(error, RateLimitError):
+            return True
+    except ImportError:
+        pass
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds the provider asked us to wait, if it sent a Retry-After header."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class BatchEmbedder:
+    """
+    Embeds many texts through `embed_documents` in fixed-size batches, with a bounded
+    number of batches in flight and exponential backoff on rate-limit responses.
+    Used by the ingestion scripts instead of one `embed_query` round-trip per document.
+    """
+
+    def __init__(self, embeddings, batch_size: int = EMBEDDING_BATCH_SIZE, concurrency: int = EMBEDDING_CONCURRENCY,
+                 max_retries: int = EMBEDDING_MAX_RETRIES, retry_base_seconds: float = EMBEDDING_RETRY_BASE_SECONDS):
+        """
+        Args:
+            embeddings (Embeddings): The embedding model.
+            batch_size (int): Texts per `embed_documents` call.
+            concurrency (int): Maximum batches in flight.
+            max_retries (int): Retries per batch after a rate-limit response.
+            retry_base_seconds (float): Backoff before the first retry; doubles on each retry.
+        """
+        self.embeddings = embeddings
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.batches = 0
+        self.retries = 0
+        self.seconds = 0.0
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+                # Honour Retry-After if given, else exponential backoff with jitter
+                delay = _retry_after(e) or self.retry_base_seconds * (2 ** attempt) * (0.5 + random.random())
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                print(f"Embedding batch rate-limited, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed `texts`, returning one vector per text in the original order.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+
+        started = time.perf_counter()
+        if len(batches) == 1 or self.concurrency == 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches)), thread_name_prefix="embed-batch") as pool:
+                results = list(pool.map(self._embed_batch, batches))
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.documents += len(texts)
+            self.batches += len(batches)
+            self.seconds += elapsed
+        return [vector for batch in results for vector in batch]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": self.documents,
+            "batches": self.batches,
+            "retries": self.retries,
+            "seconds": round(self.seconds, 3),
+            "docs_per_second": round(self.documents / self.seconds, 1) if self.seconds else 0.0,
+        }
@@ -0,0 +1,88 @@
+"""
+Microbenchmark of action lookups: the previous rebuild-and-scan lookups against
+action_registry.ActionRegistry, for both catalogs (database.py and db/dbdata.py).
+
+Run from the repository root:
+    python -m benchmarks.action_registry --iterations 100000
+"""
+import argparse
+import os
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.reporting import write_report
+import database
+
+# db/ is a folder of scripts rather than a package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db"))
+import dbdata  # noqa: E402
+
+
+def scan_by_id(load: Callable, action_id: str):
+    """The previous get_action_by_id: rebuild the catalog, then scan it."""
+    for action in load():
+        if action.get("action_id") == action_id:
+            return action
+    return None
+
+
+def scan_by_field(load: Callable, field: str, value: Any):
+    return [action for action in load() if action.get(field) == value]
+
+
+def cases(load: Callable, registry) -> List[Tuple[str, int, Callable, Callable]]:
+    """(name, lookups per pass, previous lookup, registry lookup) over present and missing keys."""
+    actions = load()
+    ids = [action["action_id"] for action in actions] + ["missing_action"]
+    stages = list(dict.fromkeys(action["stage_name"] for action in actions))
+    types = list(dict.fromkeys(action["action_type"] for action in actions))
+    return [
+        ("by_id", len(ids),
+         lambda: [scan_by_id(load, action_id) for action_id in ids],
+         lambda: [registry.get(action_id) for action_id in ids]),
+        ("by_stage", len(stages),
+         lambda: [scan_by_field(load, "stage_name", stage) for stage in stages],
+         lambda: [registry.by_stage(stage) for stage in stages]),
+        ("by_type", len(types),
+         lambda: [scan_by_field(load, "action_type", action_type) for action_type in types],
+         lambda: [registry.by_type(action_type) for action_type in types]),
+    ]
+
+
+def measure(func: Callable, lookups: int, iterations: int) -> float:
+    """Lookups per second, best of three runs."""
+    best = min(timeit.repeat(func, number=iterations, repeat=3))
+    return lookups * iterations / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark action lookups with and without the registry.")
+    parser.add_argument("--iterations", type=int, default=20_000, help="Passes over the lookup keys per run")
+    parser.add_argument("--output", type=str, default="benchmarks/results/action_registry.json")
+    args = parser.parse_args()
+
+    catalogs = {
+        "database.py": (database.get_mock_vector_db, database.get_action_registry()),
+        "db/dbdata.py": (dbdata.getObjects, dbdata.get_action_registry()),
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'catalog':<14} {'lookup':<9} {'scan/s':>12} {'registry/s':>14} {'speedup':>9}")
+    for catalog, (load, registry) in catalogs.items():
+        results[catalog] = {}
+        for name, lookups, previous, indexed in cases(load, registry):
+            # The scans are far slower; scale their iterations down to keep runs short
+            scan_rate = measure(previous, lookups, max(1, args.iterations // 100))
+            registry_rate = measure(indexed, lookups, args.iterations)
+            results[catalog][name] = {
+                "scan_lookups_per_second": round(scan_rate, 1),
+                "registry_lookups_per_second": round(registry_rate, 1),
+                "speedup": round(registry_rate / scan_rate, 1),
+            }
+            print(f"{catalog:<14} {name:<9} {scan_rate:>12,.0f} {registry_rate:>14,.0f} {registry_rate / scan_rate:>8.0f}x")
+
+    write_report(args.output, "action_registry", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Concurrency benchmark for the direct-action path of /chat.
+
+Compares the old behaviour (sync `get_action_directly` called from the event loop)
+with `aget_action_directly`, whose vector store calls run on the bounded executor.
+The vector store is replaced by an in-process stand-in holding the uploaded
+workflow records, which blocks for a fixed latency per search to simulate the
+Chroma HTTP round-trip. Exact step lookups are answered by the in-memory
+ActionCatalog without touching the store, so the default prompt is one that
+needs a similarity search; each run checks that the searches actually happened.
+
+Run from the repository root:
+    python -m benchmarks.chat_concurrency --latency-ms 50 --requests 64
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from langchain_core.documents import Document
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.vectorstores import VectorStore
+
+from rag_chain_builder import RAGChainBuilder
+from upload_workflow_to_chroma import action_to_step, build_workflow_records, onboarding_flow, workflow_steps
+
+
+class SlowVectorStore(VectorStore):
+    """
+    Blocking stand-in for the Chroma vector store with the uploaded workflow records
+    and a fixed latency per search. Counts the searches it serves.
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.ids, texts, metadatas = build_workflow_records(workflow_steps, action_to_step, onboarding_flow)
+        self.documents = [Document(page_content=text, metadata=metadata) for text, metadata in zip(texts, metadatas)]
+        self.searches = 0
+        self._lock = threading.Lock()
+
+    def _matches(self, document, filter):
+        if not filter:
+            return True
+        if "$or" in filter:
+            return any(self._matches(document, clause) for clause in filter["$or"])
+        return all(document.metadata.get(key) == value for key, value in filter.items())
+
+    def similarity_search_by_vector(self, embedding, k=4, filter=None, **kwargs):
+        time.sleep(self.latency)
+        with self._lock:
+            self.searches += 1
+        return [doc for doc in self.documents if self._matches(doc, filter)][:k]
+
+    def similarity_search(self, query, k=4, filter=None, **kwargs):
+        return self.similarity_search_by_vector(None, k=k, filter=filter)
+
+    def get(self, include=None, **kwargs):
+        # Read once by ActionCatalog.ensure_loaded; not part of the measured path
+        return {
+            "ids": list(self.ids),
+            "documents": [doc.page_content for doc in self.documents],
+            "metadatas": [doc.metadata for doc in self.documents],
+        }
+
+    def add_texts(self, texts, metadatas=None, **kwargs):
+        raise NotImplementedError("SlowVectorStore is read-only")
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, **kwargs):
+        raise NotImplementedError("SlowVectorStore is read-only")
+
+
+def measure(store, run, latency, total):
+    """
+    Time one run and check it went through the vector store: every request must
+    have made at least one search, so the run can't beat the simulated latency.
+    """
+    before = store.searches
+    elapsed = asyncio.run(run)
+    searches = store.searches - before
+    if searches < total:
+        raise SystemExit(
+            f"Only {searches} vector store searches for {total} requests: the prompt is being "
+            f"answered from memory, choose a --prompt that needs a similarity search"
+        )
+    if latency and elapsed < latency:
+        raise SystemExit(f"Run took {elapsed:.3f}s, less than one simulated search ({latency:.3f}s)")
+    return elapsed
+
+
+async def run_sync_path(builder, prompt, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            # Old server behaviour: a blocking call inside the event loop
+            builder.get_action_directly(prompt)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - started
+
+
+async def run_async_path(builder, prompt, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await builder.aget_action_directly(prompt)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async direct-action lookups.")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Simulated vector store latency per call")
+    parser.add_argument("--requests", type=int, default=64, help="Requests per concurrency level")
+    parser.add_argument("--levels", type=str, default="1,2,4,8,16,32", help="Comma-separated concurrency levels")
+    # No workflow keywords or step names, so it is answered from the top search result
+    parser.add_argument("--prompt", type=str, default="I want to apply for a loan")
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    store = SlowVectorStore(latency)
+    builder = RAGChainBuilder(vector_store=store, llm=FakeListChatModel(responses=["{}"]))
+    levels = [int(level) for level in args.levels.split(",")]
+
+    print(f"{'concurrency':>11} {'sync req/s':>11} {'async req/s':>12} {'speedup':>8}")
+    for concurrency in levels:
+        sync_elapsed = measure(store, run_sync_path(builder, args.prompt, args.requests, concurrency), latency, args.requests)
+        async_elapsed = measure(store, run_async_path(builder, args.prompt, args.requests, concurrency), latency, args.requests)
+        sync_rps = args.requests / sync_elapsed
+        async_rps = args.requests / async_elapsed
+        print(f"{concurrency:>11} {sync_rps:>11.1f} {async_rps:>12.1f} {async_rps / sync_rps:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark of data/data_loader.DataLoader on a synthetic field-mapping CSV.
+
+Compares the previous implementation (whole CSV in one DataFrame, one Document per
+`df.iterrows()` row) with the chunked, vectorized streaming mode, reading from a
+CSV string, a file path and a memory-mapped file. Each mode runs in a fresh
+process so its peak RSS is its own. Before timing, the first rows of every mode
+are checked against the previous implementation's output.
+
+Run from the repository root:
+    python -m benchmarks.data_loader --rows 1000000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.reporting import write_report
+from data.data_loader import DataLoader
+
+MODES = ["iterrows", "stream_string", "stream_path", "stream_mmap"]
+
+
+def write_synthetic_csv(path: str, rows: int, seed: int = 7):
+    """Field-mapping rows in the spreadsheet's format, with some blank descriptions."""
+    rng = np.random.default_rng(seed)
+    index = np.arange(rows)
+    description = pd.Series("Value captured for field ", index=index) + index.astype(str)
+    description[rng.random(rows) < 0.05] = None
+    pd.DataFrame({
+        "API Step": "step_" + (index % 40).astype(str),
+        "Simple Field Name": "field_" + index.astype(str),
+        "Description": description,
+        "Technical Data Point": "payload.section_" + (index % 12).astype(str) + ".value_" + index.astype(str),
+    }).to_csv(path, index=False)
+
+
+def load_iterrows(data_source: str):
+    """The previous load_and_process: one Document per df.iterrows() row."""
+    from io import StringIO
+    df = pd.read_csv(StringIO(data_source))
+    return [DataLoader.build_document(row) for _, row in df.iterrows()]
+
+
+def _loader(mode: str, path: str, chunk_rows: int) -> DataLoader:
+    if mode == "stream_string":
+        with open(path) as f:
+            return DataLoader(f.read(), chunk_rows=chunk_rows)
+    return DataLoader(path=path, memory_map=mode == "stream_mmap", chunk_rows=chunk_rows)
+
+
+def run_mode(mode: str, path: str, chunk_rows: int, results):
+    started = time.perf_counter()
+    if mode == "iterrows":
+        with open(path) as f:
+            count = len(load_iterrows(f.read()))
+    else:
+        # Consume lazily, as the ingestion pipeline does
+        count = sum(1 for _ in _loader(mode, path, chunk_rows).iter_documents())
+    elapsed = time.perf_counter() - started
+    results.put({
+        "mode": mode,
+        "documents": count,
+        "seconds": round(elapsed, 3),
+        "docs_per_second": round(count / elapsed, 1) if elapsed else 0.0,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    })
+
+
+def check_equivalence(path: str, rows: int = 2000):
+    """Streaming output must match the previous implementation row for row."""
+    sample_path = path + ".sample"
+    with open(path) as source, open(sample_path, "w") as f:
+        for _, line in zip(range(rows + 1), source):
+            f.write(line)
+    try:
+        with open(sample_path) as f:
+            expected = [(doc.page_content, str(doc.metadata)) for doc in load_iterrows(f.read())]
+        for mode in MODES[1:]:
+            got = [(doc.page_content, str(doc.metadata)) for doc in _loader(mode, sample_path, 500).iter_documents()]
+            if got != expected:
+                raise AssertionError(f"{mode} output differs from the iterrows implementation")
+    finally:
+        os.remove(sample_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DataLoader CSV processing.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the synthetic CSV")
+    parser.add_argument("--chunk-rows", type=int, default=50_000, help="Rows per chunk in streaming mode")
+    parser.add_argument("--modes", type=str, default=",".join(MODES), help="Comma-separated modes")
+    parser.add_argument("--output", type=str, default="benchmarks/results/data_loader.json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fields.csv")
+        print(f"Writing {args.rows} synthetic rows...")
+        write_synthetic_csv(path, args.rows)
+        print(f"CSV size: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+        check_equivalence(path)
+
+        results = []
+        print(f"{'mode':<14} {'documents':>10} {'seconds':>9} {'docs/sec':>11} {'peak RSS MB':>12}")
+        for mode in args.modes.split(","):
+            # A fresh process per mode, so peak RSS isn't inherited from an earlier mode
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(target=run_mode, args=(mode, path, args.chunk_rows, queue))
+            process.start()
+            result: Dict[str, Any] = queue.get()
+            process.join()
+            results.append(result)
+            print(f"{mode:<14} {result['documents']:>10} {result['seconds']:>9.2f} "
+                  f"{result['docs_per_second']:>11.1f} {result['peak_rss_mb']:>12.1f}")
+
+    baseline = next((result for result in results if result["mode"] == "iterrows"), None)
+    if baseline:
+        for result in results:
+            if result is not baseline and result["seconds"]:
+                print(f"{result['mode']}: {baseline['seconds'] / result['seconds']:.1f}x faster than iterrows")
+
+    write_report(args.output, "data_loader", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
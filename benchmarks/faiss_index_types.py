@@ -0,0 +1,82 @@
+"""
+Recall, latency and memory of the FAISS index types in data/vector_store_manager.py.
+
+Builds every index type over the same synthetic clustered vectors and sweeps its
+search parameter (nprobe for IVF, efSearch for HNSW). Recall@k is measured against
+exact (flat) search, latency per single query, throughput for one batched search,
+and memory as the serialized index size. Use it to pick an index type and search
+setting for a given corpus size.
+
+Run from the repository root:
+    python -m benchmarks.faiss_index_types --vectors 200000 --dimensions 128
+"""
+import argparse
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.reporting import write_report
+from data.vector_store_manager import INDEX_TYPES, build_index, evaluate_index, set_search_params
+
+# Search parameter values swept per index type
+SWEEPS = {
+    "flat": [("-", None)],
+    "ivf_flat": [("nprobe", n) for n in (1, 4, 16, 64)],
+    "ivf_pq": [("nprobe", n) for n in (1, 4, 16, 64)],
+    "hnsw": [("ef_search", n) for n in (16, 32, 64, 128)],
+    "sq8": [("-", None)],
+}
+
+
+def synthetic_vectors(count: int, dimensions: int, clusters: int, seed: int) -> np.ndarray:
+    """Gaussian clusters, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimensions)).astype(np.float32)
+    labels = rng.integers(0, clusters, count)
+    return centers[labels] + 0.35 * rng.standard_normal((count, dimensions)).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FAISS index types on recall, latency and memory.")
+    parser.add_argument("--vectors", type=int, default=200_000, help="Vectors in the corpus")
+    parser.add_argument("--dimensions", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=256, help="Clusters in the synthetic data")
+    parser.add_argument("--types", type=str, default=",".join(INDEX_TYPES), help="Comma-separated index types")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=str, default="benchmarks/results/faiss_index_types.json")
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.vectors + args.queries, args.dimensions, args.clusters, args.seed)
+    vectors, queries = vectors[:args.vectors], vectors[args.vectors:]
+
+    import faiss
+    exact = faiss.IndexFlatL2(args.dimensions)
+    exact.add(vectors)
+    ground_truth = exact.search(queries, args.k)[1]
+
+    results: List[Dict[str, Any]] = []
+    recall_key = f"recall@{args.k}"
+    print(f"{args.vectors} vectors x {args.dimensions} dims, {args.queries} queries, k={args.k}")
+    print(f"{'index':<9} {'param':<13} {'build s':>8} {recall_key:>10} {'p50 ms':>8} {'p95 ms':>8} {'batch qps':>10} {'memory MB':>10}")
+    for index_type in args.types.split(","):
+        started = time.perf_counter()
+        index = build_index(vectors, index_type, seed=args.seed)
+        build_seconds = time.perf_counter() - started
+
+        for name, value in SWEEPS[index_type]:
+            set_search_params(index, **({name: value} if value is not None else {}))
+            metrics = evaluate_index(index, vectors, queries, args.k, ground_truth)
+            param = f"{name}={value}" if value is not None else "-"
+            results.append({"index_type": index_type, "param": param, "build_seconds": round(build_seconds, 3), **metrics})
+            print(f"{index_type:<9} {param:<13} {build_seconds:>8.2f} {metrics[recall_key]:>10.4f} "
+                  f"{metrics['latency_ms_p50']:>8.3f} {metrics['latency_ms_p95']:>8.3f} "
+                  f"{metrics['batch_qps']:>10.1f} {metrics['memory_mb']:>10.2f}")
+
+    write_report(args.output, "faiss_index_types", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
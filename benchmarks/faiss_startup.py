@@ -0,0 +1,151 @@
+"""
+Startup time and memory of data/vector_store_manager.VectorStoreManager with and
+without a persisted index.
+
+Modes:
+    rebuild  no index_dir: embed every document and build the index on each start
+    load     persisted index copied into process memory
+    mmap     persisted index memory-mapped read-only
+
+Each mode starts --workers processes at once (as a multi-worker server would), each
+of which calls create_store and runs a few searches so the vectors are paged in.
+Reports startup seconds, RSS and PSS per worker; PSS divides shared pages between
+the processes mapping them, so its sum is the real memory cost of all workers.
+
+Run from the repository root:
+    python -m benchmarks.faiss_startup --documents 50000 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.reporting import write_report
+
+MODES = ["rebuild", "load", "mmap"]
+
+
+def synthetic_documents(count: int):
+    from langchain_core.documents import Document
+    return [
+        Document(
+            page_content=f"API Step: step_{i % 40}\nField Name: field_{i}\nDescription: value captured for field {i % 997}",
+            metadata={"row": i}
+        )
+        for i in range(count)
+    ]
+
+
+def memory_mb() -> Dict[str, float]:
+    """Current RSS and PSS of this process, from /proc (Linux only)."""
+    values = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("VmRSS:", "RssAnon:", "RssFile:")):
+                key, amount = line.split()[:2]
+                values[key.rstrip(":")] = int(amount) / 1024
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                values["Pss"] = int(line.split()[1]) / 1024
+    return {
+        "rss": round(values.get("VmRSS", 0.0), 1),
+        "rss_anon": round(values.get("RssAnon", 0.0), 1),
+        "rss_file": round(values.get("RssFile", 0.0), 1),
+        "pss": round(values.get("Pss", 0.0), 1),
+    }
+
+
+def worker(mode: str, index_dir: str, documents: int, dimensions: int, barrier, results):
+    from benchmarks.fakes import HashEmbeddings
+    from data.vector_store_manager import VectorStoreManager
+
+    docs = synthetic_documents(documents)
+    embeddings = HashEmbeddings(dimensions=dimensions)
+    baseline = memory_mb()
+
+    started = time.perf_counter()
+    manager = VectorStoreManager(
+        embeddings=embeddings,
+        index_dir=None if mode == "rebuild" else index_dir,
+        mmap=mode == "mmap"
+    )
+    store = manager.create_store(docs)
+    startup = time.perf_counter() - started
+
+    for query in ("field name description", "api step value", "captured for field 42"):
+        store.similarity_search(query, k=5)
+
+    # Measure while every worker is still holding its index
+    barrier.wait()
+    memory = memory_mb()
+    barrier.wait()
+    results.put({
+        "startup_seconds": round(startup, 3),
+        "memory_mb": memory,
+        "memory_delta_mb": {key: round(memory[key] - baseline[key], 1) for key in memory},
+    })
+
+
+def run_mode(mode: str, index_dir: str, args) -> Dict[str, Any]:
+    # spawn, so workers don't inherit the parent's memory
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(mode, index_dir, args.documents, args.dimensions, barrier, results))
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    workers: List[Dict[str, Any]] = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    return {
+        "mode": mode,
+        "workers": workers,
+        "startup_seconds_max": max(w["startup_seconds"] for w in workers),
+        "rss_mb_per_worker": round(sum(w["memory_mb"]["rss"] for w in workers) / len(workers), 1),
+        "pss_mb_total": round(sum(w["memory_mb"]["pss"] for w in workers), 1),
+        "index_pss_mb_total": round(sum(w["memory_delta_mb"]["pss"] for w in workers), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAISS startup with and without a persisted index.")
+    parser.add_argument("--documents", type=int, default=50_000, help="Synthetic documents to index")
+    parser.add_argument("--dimensions", type=int, default=384, help="Embedding dimensions")
+    parser.add_argument("--workers", type=int, default=4, help="Processes starting at once per mode")
+    parser.add_argument("--modes", type=str, default=",".join(MODES), help="Comma-separated modes")
+    parser.add_argument("--output", type=str, default="benchmarks/results/faiss_startup.json")
+    args = parser.parse_args()
+
+    from benchmarks.fakes import HashEmbeddings
+    from data.vector_store_manager import VectorStoreManager
+
+    index_dir = tempfile.mkdtemp(prefix="faiss_startup_")
+    try:
+        print(f"Persisting an index of {args.documents} documents...")
+        VectorStoreManager(embeddings=HashEmbeddings(dimensions=args.dimensions), index_dir=index_dir, mmap=False) \
+            .create_store(synthetic_documents(args.documents))
+        index_mb = os.path.getsize(os.path.join(index_dir, "index.faiss")) / 1024 / 1024
+        print(f"Index file: {index_mb:.1f} MB")
+
+        results = [run_mode(mode, index_dir, args) for mode in args.modes.split(",")]
+    finally:
+        shutil.rmtree(index_dir, ignore_errors=True)
+
+    print(f"{'mode':<8} {'startup s':>10} {'RSS MB/worker':>14} {'PSS MB total':>13} {'index PSS MB total':>19}")
+    for result in results:
+        print(f"{result['mode']:<8} {result['startup_seconds_max']:>10.2f} {result['rss_mb_per_worker']:>14.1f} "
+              f"{result['pss_mb_total']:>13.1f} {result['index_pss_mb_total']:>19.1f}")
+
+    write_report(args.output, "faiss_startup", {**vars(args), "index_file_mb": round(index_mb, 1)}, results)
+
+
+if __name__ == "__main__":
+    main()
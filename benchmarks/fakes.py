@@ -0,0 +1,132 @@
+"""
+Hermetic stand-ins for the external services behind server.app, for benchmarks.
+
+- HashEmbeddings: deterministic bag-of-words embeddings, no network.
+- FakeChroma: in-process onboarding_flow collection seeded from the
+  upload_workflow_to_chroma definitions, served by LocalVectorIndex.
+- FakeChatModel: canned chat model with a configurable per-call latency.
+
+`install_fakes()` injects them into the RAGChainBuilder and VectorDBTools
+singletons; call it before importing `server`.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import time
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import FakeListChatModel
+
+from local_index import LocalVectorIndex
+from upload_workflow_to_chroma import action_to_step, build_workflow_records, onboarding_flow, workflow_steps
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class HashEmbeddings(Embeddings):
+    """
+    Deterministic embeddings: every token is hashed to a fixed random unit vector
+    and a text is the normalized sum of its tokens, so texts sharing words are close.
+    """
+
+    def __init__(self, dimensions: int = 256, latency: float = 0.0):
+        """
+        Args:
+            dimensions (int): Size of the vectors.
+            latency (float): Seconds to block per embedding call.
+        """
+        self.dimensions = dimensions
+        self.latency = latency
+
+    def _token_vector(self, token: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+        return np.random.default_rng(seed).standard_normal(self.dimensions)
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions)
+        for token in _TOKEN.findall(text.lower()):
+            vector += self._token_vector(token)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._embed(text)
+
+
+class FakeChroma(LocalVectorIndex):
+    """
+    In-process onboarding_flow collection with the same records, `get` and
+    similarity search interface as the Chroma store used by the server.
+
+    `latency` simulates the Chroma HTTP round-trip. Chroma always returns the top k;
+    `max_distance` optionally drops results farther than that cosine distance, so
+    off-topic prompts fall through to the RAG chain like an empty collection would.
+    """
+
+    def __init__(self, embeddings: Embeddings, latency: float = 0.0, max_distance: Optional[float] = None):
+        super().__init__(embeddings, refresh_interval=0)
+        self.latency = latency
+        self.max_distance = max_distance
+        ids, documents, metadatas = build_workflow_records(workflow_steps, action_to_step, onboarding_flow)
+        self.load(ids, documents, metadatas, embeddings.embed_documents(documents))
+
+    def similarity_search_by_vector_with_score(self, embedding, k: int = 4, filter=None):
+        if self.latency:
+            time.sleep(self.latency)
+        results = super().similarity_search_by_vector_with_score(embedding, k=k, filter=filter)
+        if self.max_distance is not None:
+            results = [(doc, distance) for doc, distance in results if distance <= self.max_distance]
+        return results
+
+    def get(self, *args, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return super().get(*args, **kwargs)
+
+
+class FakeChatModel(FakeListChatModel):
+    """FakeListChatModel that takes `latency` seconds per call, sync or async."""
+    latency: float = 0.0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return super()._generate(messages, stop, None, **kwargs)
+
+
+def default_llm_responses() -> List[str]:
+    """A workflow step as JSON, like the RAG prompt asks the model to return."""
+    return [json.dumps(workflow_steps["mobile_otp_generation"])]
+
+
+def install_fakes(search_latency: float = 0.0, llm_latency: float = 0.0, embedding_latency: float = 0.0,
+                  max_distance: Optional[float] = None):
+    """
+    Create the RAGChainBuilder and VectorDBTools singletons on top of the fakes.
+    Must run before `server` is imported, since importing it creates the singletons.
+
+    Returns:
+        FakeChroma: The shared fake collection.
+    """
+    from rag_chain_builder import RAGChainBuilder
+    from tools import VectorDBTools
+
+    store = FakeChroma(HashEmbeddings(latency=embedding_latency), latency=search_latency, max_distance=max_distance)
+    RAGChainBuilder(vector_store=store, llm=FakeChatModel(responses=default_llm_responses(), latency=llm_latency))
+    VectorDBTools(vector_store=store)
+    return store
@@ -0,0 +1,122 @@
+"""
+Throughput of form_validation.FormValidator on synthetic /submit payloads.
+
+Builds a deterministic mix of valid and invalid submissions for every action with
+form fields in database.py and db/dbdata.py, then measures submissions/sec for:
+
+    per_request  the same checks, but built from the field definitions on every
+                 submission (regexes come from re's internal cache), as a
+                 validator without the compile step would
+    single       FormValidator.validate, one call per submission
+    batch        FormValidator.validate_many over the whole set
+
+Run from the repository root:
+    python -m benchmarks.form_validation --submissions 50000
+"""
+import argparse
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.reporting import write_report
+from form_validation import ENFORCE_PATTERNS, CompiledField, FormValidator, load_catalog_actions
+
+# Values that satisfy each catalog pattern, and generic values per field type
+VALID_BY_PATTERN = {
+    "^[2-9]\\d{11}$": "234512341234",
+    "^[6-9]\\d{9}$": "9876543210",
+    "^[A-Z]{4}0[A-Z0-9]{6}$": "HDFC0001234",
+    "^[6-9][0-9]{9}$": "9876543210",
+    "^[0-9]{12}$": "234512341234",
+    "^[0-9]{6}$": "560001",
+    "^[0-9]+(\\.[0-9]{1,2})?$": "25000.50",
+    "^[A-Za-z][A-Za-z .'-]*$": "Asha Devi",
+}
+
+
+def valid_value(field: Dict[str, Any]) -> Any:
+    properties = field.get("properties") or {}
+    component = (field.get("component_type") or "").lower()
+    if properties.get("validation_pattern") in VALID_BY_PATTERN:
+        return VALID_BY_PATTERN[properties["validation_pattern"]]
+    if properties.get("input_type") == "number" or "number" in component:
+        return "1234567890"
+    if "date" in component:
+        return "1990-04-12"
+    if "checkbox" in component:
+        return True
+    return "Sample value"
+
+
+def build_submissions(actions, count: int, invalid_ratio: float, seed: int) -> List[Tuple[str, Dict[str, Any]]]:
+    rng = random.Random(seed)
+    forms = [(action["action_id"], action["ui_definition"]["form_fields"])
+             for action in actions if (action.get("ui_definition") or {}).get("form_fields")]
+    submissions = []
+    for _ in range(count):
+        action_id, fields = rng.choice(forms)
+        data = {field["field_id"]: valid_value(field) for field in fields}
+        if rng.random() < invalid_ratio:
+            # Drop one field or replace it with a value no pattern or type check accepts
+            key = rng.choice(list(data))
+            if rng.random() < 0.5:
+                del data[key]
+            else:
+                data[key] = "??"
+        submissions.append((action_id, data))
+    return submissions
+
+
+def per_request_validate(forms: Dict[str, Any], action_id: str, data: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Builds every field's checks from its raw definition, then applies them."""
+    errors = []
+    for field in forms.get(action_id, ()):
+        compiled = CompiledField(field, enforce_pattern=ENFORCE_PATTERNS)
+        message = compiled.check(data.get(compiled.key))
+        if message:
+            errors.append((compiled.key, message))
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /submit form validation throughput.")
+    parser.add_argument("--submissions", type=int, default=50_000)
+    parser.add_argument("--invalid-ratio", type=float, default=0.3, help="Share of submissions with a bad field")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=str, default="benchmarks/results/form_validation.json")
+    args = parser.parse_args()
+
+    actions = load_catalog_actions()
+    submissions = build_submissions(actions, args.submissions, args.invalid_ratio, args.seed)
+
+    started = time.perf_counter()
+    validator = FormValidator(actions)
+    compile_seconds = time.perf_counter() - started
+    raw_forms = {action["action_id"]: action["ui_definition"]["form_fields"]
+                 for action in actions if (action.get("ui_definition") or {}).get("form_fields")}
+
+    modes = {
+        "per_request": lambda: [per_request_validate(raw_forms, action_id, data) for action_id, data in submissions],
+        "single": lambda: [validator.validate(action_id, data) for action_id, data in submissions],
+        "batch": lambda: validator.validate_many(submissions),
+    }
+    results = {"compile_seconds": round(compile_seconds, 6), "stats": validator.stats(), "modes": {}}
+    print(f"Compiled {validator.stats()['fields']} fields for {validator.stats()['actions']} actions in {compile_seconds * 1000:.2f} ms")
+    print(f"{'mode':<12} {'submissions/s':>14} {'failed':>8}")
+    for name, run in modes.items():
+        started = time.perf_counter()
+        outcome = run()
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for errors in outcome if errors)
+        results["modes"][name] = {
+            "seconds": round(elapsed, 4),
+            "submissions_per_second": round(len(submissions) / elapsed, 1),
+            "failed": failed,
+        }
+        print(f"{name:<12} {len(submissions) / elapsed:>14,.0f} {failed:>8}")
+
+    write_report(args.output, "form_validation", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Load test of server.app with mixed /chat and /submit traffic.
+
+The app runs in-process against the hermetic fakes in benchmarks.fakes (fake
+Chroma collection, deterministic embeddings, fake chat model with configurable
+latency) and is driven through httpx's ASGI transport, so no network services are
+needed. For each concurrency level, reports requests/s and p50/p95/p99 latency,
+overall and per endpoint, and writes them to a JSON file. Pass the file of a
+previous run as --baseline to print the change against it.
+
+Run from the repository root:
+    python -m benchmarks.load_test --levels 1,8,32 --requests 400 --llm-latency-ms 300
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.fakes import install_fakes
+from benchmarks.reporting import percentiles, write_report
+
+# Prompts for each /chat resolution branch
+CHAT_PROMPTS = [
+    "verify mobile otp",
+    "I need to do aadhaar biometric verification",
+    "what is the onboarding process",
+    "what are the steps in the workflow",
+    "how do I create a lending group",
+    "enter bank account details",
+    "can you tell me a joke",
+    "what is the weather like today",
+]
+
+SUBMIT_REQUESTS = [
+    {"action_id": "mobile_otp_generation", "data": [{"key": "mobile", "value": "9876543210"}]},
+    {"action_id": "validate_otp", "data": [{"key": "otp", "value": "123456"}]},
+    {"action_id": "aadhar_biometric", "data": [{"key": "aadhaar_number", "value": "123412341234"}]},
+    {"action_id": "unknown_action", "data": [{"key": "note", "value": "test"}]},
+]
+
+
+def build_schedule(total: int, submit_ratio: float, seed: int) -> List[Dict[str, Any]]:
+    """Deterministic mix of /chat and /submit requests."""
+    rng = random.Random(seed)
+    schedule = []
+    for _ in range(total):
+        if rng.random() < submit_ratio:
+            schedule.append({"endpoint": "/submit", "json": rng.choice(SUBMIT_REQUESTS)})
+        else:
+            schedule.append({"endpoint": "/chat", "json": {"type": "PROMPT", "prompt": rng.choice(CHAT_PROMPTS)}})
+    return schedule
+
+
+async def run_level(client: httpx.AsyncClient, schedule: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    """Send every scheduled request with `concurrency` workers and summarize the results."""
+    queue = iter(schedule)
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+
+    async def worker():
+        for item in queue:
+            endpoint = item["endpoint"]
+            started = time.perf_counter()
+            try:
+                response = await client.post(endpoint, json=item["json"])
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.setdefault(endpoint, []).append(time.perf_counter() - started)
+            if failed:
+                errors[endpoint] = errors.get(endpoint, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "concurrency": concurrency,
+        "requests": len(all_latencies),
+        "errors": sum(errors.values()),
+        "elapsed_seconds": round(elapsed, 4),
+        "rps": round(len(all_latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": percentiles(all_latencies),
+        "by_endpoint": {
+            endpoint: {
+                "requests": len(values),
+                "errors": errors.get(endpoint, 0),
+                "latency_ms": percentiles(values),
+            }
+            for endpoint, values in sorted(latencies.items())
+        },
+    }
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    # Importing server creates the singletons; the fakes must be in place first
+    install_fakes(
+        search_latency=args.search_latency_ms / 1000,
+        llm_latency=args.llm_latency_ms / 1000,
+        embedding_latency=args.embedding_latency_ms / 1000,
+        max_distance=args.max_distance
+    )
+    from server import app
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+            if args.warmup:
+                await run_level(client, build_schedule(args.warmup, args.submit_ratio, args.seed + 1), 1)
+            for concurrency in args.levels:
+                schedule = build_schedule(args.requests, args.submit_ratio, args.seed)
+                results.append(await run_level(client, schedule, concurrency))
+    return results
+
+
+def print_results(results: List[Dict[str, Any]], baseline: Dict[int, Dict[str, Any]]):
+    print(f"{'concurrency':>11} {'requests':>8} {'errors':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for result in results:
+        latency = result["latency_ms"]
+        line = (
+            f"{result['concurrency']:>11} {result['requests']:>8} {result['errors']:>6} {result['rps']:>9.1f} "
+            f"{latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f}"
+        )
+        previous = baseline.get(result["concurrency"])
+        if previous:
+            rps_change = (result["rps"] / previous["rps"] - 1) * 100 if previous["rps"] else 0.0
+            p95_change = (latency["p95"] / previous["latency_ms"]["p95"] - 1) * 100 if previous["latency_ms"]["p95"] else 0.0
+            line += f"   vs baseline: req/s {rps_change:+.1f}%, p95 {p95_change:+.1f}%"
+        print(line)
+        for endpoint, summary in result["by_endpoint"].items():
+            print(
+                f"{endpoint:>11} {summary['requests']:>8} {summary['errors']:>6} {'':>9} "
+                f"{summary['latency_ms']['p50']:>9.2f} {summary['latency_ms']['p95']:>9.2f} {summary['latency_ms']['p99']:>9.2f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /chat and /submit against hermetic fakes.")
+    parser.add_argument("--levels", type=str, default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=400, help="Requests per concurrency level")
+    parser.add_argument("--submit-ratio", type=float, default=0.3, help="Share of requests sent to /submit")
+    parser.add_argument("--warmup", type=int, default=20, help="Requests sent before measuring")
+    parser.add_argument("--search-latency-ms", type=float, default=20.0, help="Fake Chroma latency per call")
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0, help="Fake embedding latency per call")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="Fake chat model latency per call")
+    parser.add_argument("--max-distance", type=float, default=0.8,
+                        help="Drop search results beyond this cosine distance so off-topic prompts reach the LLM")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=str, default="benchmarks/results/load_test.json")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON file of a previous run to compare against")
+    args = parser.parse_args()
+    args.levels = [int(level) for level in args.levels.split(",")]
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {result["concurrency"]: result for result in json.load(f)["results"]}
+
+    results = asyncio.run(run(args))
+    print_results(results, baseline)
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    write_report(args.output, "load_test", config, results)
+
+
+if __name__ == "__main__":
+    main()
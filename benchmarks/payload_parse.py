@@ -0,0 +1,74 @@
+"""
+Microbenchmark of per-request CPU time for returning a workflow step from /chat.
+
+old: json.loads(full_action) on every hit, then FastAPI-style serialization of a
+     ChatResponse (jsonable_encoder + JSONResponse rendering).
+new: PayloadCache.parse (hash + dict lookup) and the pre-serialized body spliced
+     into the response bytes.
+
+Run from the repository root:
+    python -m benchmarks.payload_parse --iterations 20000
+"""
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from langchain_core.language_models import FakeListChatModel
+
+from benchmarks.chat_concurrency import SlowVectorStore
+from payload_cache import PayloadCache, get_json_body
+from rag_chain_builder import RAGChainBuilder
+from tools import VectorDBTools
+from upload_workflow_to_chroma import onboarding_flow, workflow_steps
+
+# Importing server creates the singletons; give them in-process stand-ins first
+_store = SlowVectorStore(0)
+RAGChainBuilder(vector_store=_store, llm=FakeListChatModel(responses=["{}"]))
+VectorDBTools(vector_store=_store)
+
+from server import ChatResponse, _chat_response_body  # noqa: E402
+
+
+def old_path(raw: str, session_id: str) -> bytes:
+    action = json.loads(raw)
+    response = ChatResponse(session_id=session_id, response=action, ui_tags=[])
+    return JSONResponse(content=jsonable_encoder(response)).body
+
+
+def new_path(cache: PayloadCache, raw: str, session_id: str) -> bytes:
+    action = cache.parse(raw)
+    return _chat_response_body(session_id, get_json_body(action))
+
+
+def measure(func, iterations: int) -> float:
+    """CPU microseconds per call."""
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-request parse/serialize CPU time.")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    session_id = "5f3c3276-e380-4537-968e-3848bba09c21"
+    payloads = {step_id: json.dumps(step) for step_id, step in workflow_steps.items()}
+    payloads["onboarding_flow"] = json.dumps(onboarding_flow)
+    cache = PayloadCache()
+
+    print(f"{'payload':<24} {'bytes':>6} {'old us/req':>11} {'new us/req':>11} {'speedup':>8}")
+    for name, raw in payloads.items():
+        # The two paths must produce equivalent responses
+        assert json.loads(old_path(raw, session_id)) == json.loads(new_path(cache, raw, session_id))
+
+        old_us = measure(lambda: old_path(raw, session_id), args.iterations)
+        new_us = measure(lambda: new_path(cache, raw, session_id), args.iterations)
+        print(f"{name:<24} {len(raw):>6} {old_us:>11.2f} {new_us:>11.2f} {old_us / new_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
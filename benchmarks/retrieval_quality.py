@@ -0,0 +1,254 @@
+"""
+Retrieval quality and latency benchmark across the vector backends used in this repo.
+
+Indexes the action catalog (database.get_mock_vector_db and db/dbdata.getObjects),
+as ingestion_pipeline.action_document formats it for the populators, into each backend with the same deterministic, offline embeddings
+(benchmarks.fakes.HashEmbeddings), then runs a labelled query set through each
+backend's search path. Reports recall@k, MRR and per-query latency percentiles.
+
+Backends:
+    chroma         langchain Chroma on an in-process chromadb client (same search path as the server)
+    elasticsearch  ElasticsearchStore on the shared client from clients.py; skipped if unreachable
+    weaviate       Weaviate near-vector search on a local instance; skipped if unreachable
+    faiss          FAISS store built by data/vector_store_manager.VectorStoreManager
+    local          LocalVectorIndex, the in-process serving mirror
+
+Run from the repository root:
+    python -m benchmarks.retrieval_quality --backends chroma,faiss,local --repeat 20
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+from langchain_core.documents import Document
+
+from benchmarks.fakes import HashEmbeddings
+from benchmarks.reporting import percentiles, write_report
+from database import get_mock_vector_db
+from ingestion_pipeline import action_document
+
+# db/ is a folder of scripts rather than a package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db"))
+from dbdata import getObjects  # noqa: E402
+
+# (query, expected action_ids) - any of the listed ids counts as a hit
+LABELLED_QUERIES: List[Tuple[str, List[str]]] = [
+    ("I want to log in to the system", ["JLG_S0_A1_LOGIN"]),
+    ("enter my employee id and password", ["JLG_S0_A1_LOGIN"]),
+    ("mark my attendance using my current location", ["JLG_S0_A3_MARK_ATTENDANCE_API"]),
+    ("capture the customer's aadhar number for ekyc", ["JLG_S1_A1_CAPTURE_AADHAAR"]),
+    ("generate a customer id from the aadhar details", ["JLG_S1_A2_GENERATE_CUSTOMER_ID_API"]),
+    ("verify the customer's mobile number with an otp", ["JLG_S1_A3_CAPTURE_MOBILE_OTP"]),
+    ("submit the L1 details and customer photo", ["JLG_S1_A4_SUBMIT_L1_DETAILS_API"]),
+    ("add a household member who is the nominee", ["JLG_S2_A1_CAPTURE_HOUSEHOLD_MEMBER"]),
+    ("check whether the customer is eligible", ["JLG_S2_A2_ELIGIBILITY_CHECK_API"]),
+    ("enter the bank IFSC code", ["JLG_S3_A1_CAPTURE_IFSC"]),
+    ("fetch the bank branch details", ["JLG_S3_A2_GET_BANK_DETAILS_API"]),
+    ("capture the bank account number and proof of account", ["JLG_S3_A3_CAPTURE_BANK_ACCOUNT"]),
+    ("submit bank details to complete onboarding", ["JLG_S3_A4_SUBMIT_BANK_DETAILS_API"]),
+    ("onboard a new customer with PAN and aadhaar", ["onboarding-step-001"]),
+    ("add the customer's basic details", ["onboarding-step-002"]),
+    ("enter the customer's nominee details", ["onboarding-step-003"]),
+    ("what does the customer earn", ["onboarding-step-004"]),
+    ("customer household details", ["onboarding-step-005"]),
+    # Steps 006 and 007 share the same description
+    ("update the customer's current address", ["onboarding-step-006", "onboarding-step-007"]),
+    ("customer bank details", ["onboarding-step-008", "JLG_S3_A3_CAPTURE_BANK_ACCOUNT"]),
+]
+
+
+class BackendUnavailable(Exception):
+    """Raised when a backend's client library or server isn't available."""
+
+
+def load_documents() -> List[Document]:
+    """The catalog's documents exactly as the populators index them."""
+    return (
+        [action_document(action, "actions") for action in get_mock_vector_db()]
+        + [action_document(action, "dbdata") for action in getObjects()]
+    )
+
+
+# Each builder indexes the documents and returns (search, close); search(query, k)
+# returns the action_ids of the top k results, best first.
+SearchFn = Callable[[str, int], List[str]]
+
+
+def _action_ids(documents) -> List[str]:
+    return [doc.metadata.get("action_id") for doc in documents]
+
+
+def build_chroma(documents, embeddings) -> Tuple[SearchFn, Callable]:
+    import chromadb
+    from langchain_chroma import Chroma
+
+    store = Chroma.from_documents(
+        documents,
+        embeddings,
+        client=chromadb.EphemeralClient(),
+        collection_name=f"retrieval_benchmark_{uuid.uuid4().hex[:8]}",
+        collection_metadata={"hnsw:space": "cosine"}
+    )
+    return (lambda query, k: _action_ids(store.similarity_search(query, k=k))), store.delete_collection
+
+
+def build_elasticsearch(documents, embeddings) -> Tuple[SearchFn, Callable]:
+    try:
+        from langchain_community.vectorstores import ElasticsearchStore
+        from clients import clients
+        es_client = clients.elasticsearch()
+        if not es_client.ping():
+            raise BackendUnavailable("Elasticsearch is not reachable")
+    except ImportError as e:
+        raise BackendUnavailable(str(e))
+
+    index_name = f"retrieval_benchmark_{uuid.uuid4().hex[:8]}"
+    store = ElasticsearchStore.from_documents(documents, embeddings, es_connection=es_client, index_name=index_name)
+    return (
+        (lambda query, k: _action_ids(store.similarity_search(query, k=k))),
+        lambda: es_client.indices.delete(index=index_name, ignore_unavailable=True)
+    )
+
+
+def build_weaviate(documents, embeddings) -> Tuple[SearchFn, Callable]:
+    try:
+        from weaviate.classes.config import Configure, DataType, Property
+        from clients import clients
+        client = clients.weaviate()
+    except ImportError as e:
+        raise BackendUnavailable(str(e))
+    except Exception as e:
+        raise BackendUnavailable(f"Weaviate is not reachable: {e}")
+
+    name = f"RetrievalBenchmark{uuid.uuid4().hex[:8]}"
+    collection = client.collections.create(
+        name,
+        vectorizer_config=Configure.Vectorizer.none(),
+        properties=[
+            Property(name="action_id", data_type=DataType.TEXT),
+            Property(name="content", data_type=DataType.TEXT),
+        ]
+    )
+    vectors = embeddings.embed_documents([doc.page_content for doc in documents])
+    with collection.batch.dynamic() as batch:
+        for doc, vector in zip(documents, vectors):
+            batch.add_object(properties={"action_id": doc.metadata["action_id"], "content": doc.page_content}, vector=vector)
+
+    def search(query, k):
+        response = collection.query.near_vector(near_vector=embeddings.embed_query(query), limit=k)
+        return [obj.properties["action_id"] for obj in response.objects]
+
+    return search, (lambda: client.collections.delete(name))
+
+
+def build_faiss(documents, embeddings) -> Tuple[SearchFn, Callable]:
+    try:
+        from data.vector_store_manager import VectorStoreManager
+        store = VectorStoreManager(embeddings=embeddings).create_store(documents)
+    except ImportError as e:
+        raise BackendUnavailable(str(e))
+    return (lambda query, k: _action_ids(store.similarity_search(query, k=k))), (lambda: None)
+
+
+def build_local(documents, embeddings) -> Tuple[SearchFn, Callable]:
+    from local_index import LocalVectorIndex
+
+    index = LocalVectorIndex(embeddings, refresh_interval=0)
+    index.load(
+        [str(i) for i in range(len(documents))],
+        [doc.page_content for doc in documents],
+        [doc.metadata for doc in documents],
+        embeddings.embed_documents([doc.page_content for doc in documents])
+    )
+    return (lambda query, k: _action_ids(index.similarity_search(query, k=k))), (lambda: None)
+
+
+BACKENDS = {
+    "chroma": build_chroma,
+    "elasticsearch": build_elasticsearch,
+    "weaviate": build_weaviate,
+    "faiss": build_faiss,
+    "local": build_local,
+}
+
+
+def evaluate(search: SearchFn, queries, ks: List[int], repeat: int) -> Dict:
+    """Recall@k and MRR over the top max(ks) results, and latency over `repeat` runs per query."""
+    depth = max(ks)
+    hits = {k: 0 for k in ks}
+    reciprocal_ranks = []
+    latencies = []
+    misses = []
+
+    for query, expected in queries:
+        ranked = list(dict.fromkeys(search(query, depth)))  # de-duplicate, keep order
+        rank = next((position for position, action_id in enumerate(ranked, 1) if action_id in expected), None)
+        for k in ks:
+            if rank is not None and rank <= k:
+                hits[k] += 1
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+        if rank != 1:
+            misses.append({"query": query, "expected": expected, "got": ranked[:3]})
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            search(query, depth)
+            latencies.append(time.perf_counter() - started)
+
+    return {
+        "queries": len(queries),
+        "recall": {f"@{k}": round(hits[k] / len(queries), 4) for k in ks},
+        "mrr": round(sum(reciprocal_ranks) / len(queries), 4),
+        "latency_ms": percentiles(latencies),
+        "not_ranked_first": misses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare retrieval quality and latency across vector backends.")
+    parser.add_argument("--backends", type=str, default=",".join(BACKENDS), help="Comma-separated backends")
+    parser.add_argument("--k", type=str, default="1,3,5", help="Comma-separated cut-offs for recall@k")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed searches per query")
+    parser.add_argument("--dimensions", type=int, default=256, help="Embedding dimensions")
+    parser.add_argument("--output", type=str, default="benchmarks/results/retrieval_quality.json")
+    parser.add_argument("--verbose", action="store_true", help="Print queries not ranked first")
+    args = parser.parse_args()
+    ks = [int(k) for k in args.k.split(",")]
+
+    documents = load_documents()
+    embeddings = HashEmbeddings(dimensions=args.dimensions)
+    results = {}
+
+    print(f"{len(documents)} documents, {len(LABELLED_QUERIES)} labelled queries")
+    header = " ".join(f"{'R@' + str(k):>6}" for k in ks)
+    print(f"{'backend':<14} {header} {'MRR':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name in args.backends.split(","):
+        try:
+            search, close = BACKENDS[name](documents, embeddings)
+        except BackendUnavailable as e:
+            print(f"{name:<14} skipped: {e}")
+            results[name] = {"skipped": str(e)}
+            continue
+
+        try:
+            search(LABELLED_QUERIES[0][0], max(ks))  # warm-up
+            result = evaluate(search, LABELLED_QUERIES, ks, args.repeat)
+        finally:
+            close()
+
+        results[name] = result
+        recall = " ".join(f"{result['recall']['@' + str(k)]:>6.2f}" for k in ks)
+        latency = result["latency_ms"]
+        print(f"{name:<14} {recall} {result['mrr']:>6.3f} {latency['p50']:>8.3f} {latency['p95']:>8.3f} {latency['p99']:>8.3f}")
+        if args.verbose:
+            for miss in result["not_ranked_first"]:
+                print(f"{'':<14} {miss['query']!r}: expected {miss['expected']}, got {miss['got']}")
+
+    write_report(args.output, "retrieval_quality", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+import os
+import time
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# --- Configuration ---
+CHROMA_HOST = os.getenv("CHROMA_HOST", "3.6.132.24")
+CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
+ELASTICSEARCH_URL = os.getenv("ELASTICSEARCH_URL", "http://localhost:9200")
+WEAVIATE_HOST = os.getenv("WEAVIATE_HOST", "localhost")
+WEAVIATE_PORT = int(os.getenv("WEAVIATE_PORT", "8080"))
+WEAVIATE_GRPC_PORT = int(os.getenv("WEAVIATE_GRPC_PORT", "50051"))
+
+# Keep-alive pool shared by every OpenAI chat and embedding call in the process
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "32"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "16"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "10"))
+
+ELASTICSEARCH_CONNECTIONS = int(os.getenv("ELASTICSEARCH_CONNECTIONS", "10"))
+ELASTICSEARCH_TIMEOUT = float(os.getenv("ELASTICSEARCH_TIMEOUT", "30"))
+
+
+class PoolMetrics:
+    """
+    Utilisation counters for one HTTP pool. A slot is held from the moment a request
+    is sent until its response body is closed, which is exactly how long httpx keeps
+    a pooled connection checked out.
+    """
+
+    def __init__(self, name: str, max_connections: int):
+        self.name = name
+        self.max_connections = max_connections
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.requests = 0
+        self.waited = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def acquired(self, wait_seconds: float):
+        with self._lock:
+            self.requests += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            if wait_seconds > 0.001:
+                self.waited += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def released(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "in_use": self.in_use,
+            "utilisation": self.in_use / self.max_connections if self.max_connections else 0.0,
+            "peak_in_use": self.peak_in_use,
+            "requests": self.requests,
+            "requests_waited": self.waited,
+            "wait_seconds_avg": self.wait_seconds_total / self.requests if self.requests else 0.0,
+            "wait_seconds_max": round(self.wait_seconds_max, 4),
+        }
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response body that frees its pool slot once it is closed."""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+def _release_once(metrics: PoolMetrics, semaphore):
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            semaphore.release()
+            metrics.released()
+    return release
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """
+    Connection-pooling transport that gates requests on a slot per connection so the
+    time spent waiting for a free connection can be measured.
+    """
+
+    def __init__(self, metrics: PoolMetrics, **kwargs):
+        super().__init__(**kwargs)
+        self.metrics = metrics
+        self._slots = threading.BoundedSemaphore(metrics.max_connections)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=HTTP_POOL_TIMEOUT):
+            raise httpx.PoolTimeout(f"No free connection in pool '{self.metrics.name}'", request=request)
+        self.metrics.acquired(time.perf_counter() - started)
+        release = _release_once(self.metrics, self._slots)
+        try:
+            response = super().handle_request(request)
+        except BaseException:
+            release()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+
+class AsyncInstrumentedTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, metrics: PoolMetrics, **kwargs):
+        super().__init__(**kwargs)
+        self.metrics = metrics
+        # An asyncio.Semaphore belongs to the loop it is first used on, so each
+        # event loop gets its own, created on its first request
+        self._slots_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    def _slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._slots_by_loop.get(loop)
+        if slots is None:
+            slots = self._slots_by_loop[loop] = asyncio.Semaphore(self.metrics.max_connections)
+        return slots
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        slots = self._slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=HTTP_POOL_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise httpx.PoolTimeout(f"No free connection in pool '{self.metrics.name}'", request=request)
+        self.metrics.acquired(time.perf_counter() - started)
+        release = _release_once(self.metrics, slots)
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_AsyncReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+
+class ClientRegistry:
+    """
+    A Singleton holding the process-wide network clients: one Chroma HTTP client per
+    host/port on its own instrumented keep-alive pool, one keep-alive httpx pool
+    (sync and async) for OpenAI, and one
+    Elasticsearch and one Weaviate client. Every module gets its clients from here instead of opening
+    its own connections.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(ClientRegistry, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        # The hasattr check prevents re-initialization on subsequent calls to get the instance
+        if not hasattr(self, 'is_initialized'):
+            self._lock = threading.Lock()
+            self._chroma_clients: Dict[tuple, Any] = {}
+            self._http_clients: Dict[str, httpx.Client] = {}
+            self._async_http_clients: Dict[str, httpx.AsyncClient] = {}
+            self._pool_metrics: Dict[str, PoolMetrics] = {}
+            self._elasticsearch = None
+            self._weaviate = None
+            self.is_initialized = True
+
+    def chroma(self, host: str = CHROMA_HOST, port: int = CHROMA_PORT):
+        """
+        Returns the shared chromadb.HttpClient for a host and port.
+
+        Its keep-alive pool gets the same connection limits as the OpenAI pool through
+        chromadb's own settings. chromadb builds its httpx client internally and has no
+        setting for a timeout or a custom transport, so Chroma requests use its default
+        timeout and don't appear in pool_stats().
+        """
+        key = (host, port)
+        with self._lock:
+            if key not in self._chroma_clients:
+                import chromadb
+                from chromadb.config import Settings
+                client = chromadb.HttpClient(host=host, port=port, settings=Settings(
+                    chroma_http_max_connections=HTTP_POOL_MAX_CONNECTIONS,
+                    chroma_http_max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+                    chroma_http_keepalive_secs=HTTP_KEEPALIVE_EXPIRY
+                ))
+                self._chroma_clients[key] = client
+                print(f"Chroma client connected to {host}:{port}")
+            return self._chroma_clients[key]
+
+    def _metrics(self, name: str) -> PoolMetrics:
+        if name not in self._pool_metrics:
+            self._pool_metrics[name] = PoolMetrics(name, HTTP_POOL_MAX_CONNECTIONS)
+        return self._pool_metrics[name]
+
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        )
+
+    @staticmethod
+    def _timeout() -> httpx.Timeout:
+        return httpx.Timeout(
+            HTTP_READ_TIMEOUT,
+            connect=HTTP_CONNECT_TIMEOUT,
+            pool=HTTP_POOL_TIMEOUT
+        )
+
+    def http_client(self, name: str = "openai") -> httpx.Client:
+        """
+        Returns the shared sync keep-alive pool with the given name.
+        """
+        with self._lock:
+            if name not in self._http_clients:
+                transport = InstrumentedTransport(self._metrics(name), limits=self._limits())
+                self._http_clients[name] = httpx.Client(transport=transport, timeout=self._timeout())
+            return self._http_clients[name]
+
+    def async_http_client(self, name: str = "openai") -> httpx.AsyncClient:
+        """
+        Returns the shared async keep-alive pool with the given name. Sync and async
+        clients with the same name report into the same metrics.
+        """
+        with self._lock:
+            if name not in self._async_http_clients:
+                transport = AsyncInstrumentedTransport(self._metrics(name), limits=self._limits())
+                self._async_http_clients[name] = httpx.AsyncClient(transport=transport, timeout=self._timeout())
+            return self._async_http_clients[name]
+
+    def openai_http_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments that make ChatOpenAI / OpenAIEmbeddings use the shared pool."""
+        return {
+            "http_client": self.http_client("openai"),
+            "http_async_client": self.async_http_client("openai"),
+            "timeout": self._timeout(),
+        }
+
+    def elasticsearch(self):
+        """
+        Returns the shared Elasticsearch client for ELASTICSEARCH_URL.
+        """
+        with self._lock:
+            if self._elasticsearch is None:
+                from elasticsearch import Elasticsearch
+                self._elasticsearch = Elasticsearch(
+                    ELASTICSEARCH_URL,
+                    connections_per_node=ELASTICSEARCH_CONNECTIONS,
+                    request_timeout=ELASTICSEARCH_TIMEOUT,
+                    http_compress=True
+                )
+                print(f"Elasticsearch client connected to {ELASTICSEARCH_URL}")
+            return self._elasticsearch
+
+    def weaviate(self):
+        """
+        Returns the shared Weaviate client for WEAVIATE_HOST, connected over HTTP and gRPC.
+        """
+        with self._lock:
+            if self._weaviate is None:
+                import weaviate
+                self._weaviate = weaviate.connect_to_local(
+                    host=WEAVIATE_HOST,
+                    port=WEAVIATE_PORT,
+                    grpc_port=WEAVIATE_GRPC_PORT
+                )
+                print(f"Weaviate client connected to {WEAVIATE_HOST}:{WEAVIATE_PORT}")
+            return self._weaviate
+
+    def pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Utilisation and wait-time counters for every shared HTTP pool."""
+        return {name: metrics.stats() for name, metrics in self._pool_metrics.items()}
+
+    def close(self):
+        """Close the sync pools, Chroma and Weaviate clients. Async pools are closed with aclose()."""
+        with self._lock:
+            for client in self._http_clients.values():
+                client.close()
+            self._http_clients.clear()
+            # chromadb clients have no close(); drop them so the next use reconnects
+            self._chroma_clients.clear()
+            if self._weaviate is not None:
+                self._weaviate.close()
+                self._weaviate = None
+
+    async def aclose(self):
+        with self._lock:
+            clients = list(self._async_http_clients.values())
+            self._async_http_clients.clear()
+        for client in clients:
+            await client.aclose()
+
+
+# Shared registry for every module that talks to Chroma, OpenAI, Elasticsearch or Weaviate
+clients = ClientRegistry()
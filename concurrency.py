@@ -0,0 +1,212 @@
+import os
+import time
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Upper bound on threads used for sync-only dependencies (Chroma HTTP client,
+# sync embedding calls). Keeping this bounded stops a burst of requests from
+# spawning an unbounded number of threads against the vector store.
+BLOCKING_POOL_SIZE = int(os.getenv("BLOCKING_POOL_SIZE", "16"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the shared, bounded thread pool used for blocking calls.
+    The pool is created lazily on first use.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=BLOCKING_POOL_SIZE,
+            thread_name_prefix="blocking-io"
+        )
+        print(f"Blocking executor initialized with {BLOCKING_POOL_SIZE} workers")
+    return _executor
+
+
+def install_default_executor(loop: Optional[asyncio.AbstractEventLoop] = None):
+    """
+    Makes the bounded pool the default executor of the event loop, so that
+    library code calling loop.run_in_executor(None, ...) (e.g. LangChain's
+    async retriever fallbacks) is bounded as well.
+    """
+    loop = loop or asyncio.get_running_loop()
+    loop.set_default_executor(get_executor())
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Runs a blocking callable on the bounded executor without blocking the event loop.
+    Context variables of the caller are propagated to the worker thread.
+
+    Args:
+        func (Callable): The sync function to run.
+        *args: Positional arguments for the function.
+        **kwargs: Keyword arguments for the function.
+
+    Returns:
+        Any: The return value of the function.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), call)
+
+
+def run_sync(awaitable: Awaitable[Any]) -> Any:
+    """
+    Runs a coroutine to completion from sync code and returns its result. If the
+    calling thread already runs an event loop, the coroutine gets its own loop on a
+    separate thread, and the caller blocks like any other sync call.
+
+    Args:
+        awaitable (Awaitable): The coroutine to run.
+
+    Returns:
+        Any: The coroutine's result.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(awaitable)
+    # Not the bounded pool: the coroutine may itself wait on it through run_blocking
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-sync") as pool:
+        return pool.submit(contextvars.copy_context().run, asyncio.run, awaitable).result()
+
+
+class SpeculationStats:
+    """Counters for speculative execution of a primary path and a fallback."""
+
+    def __init__(self):
+        self.runs = 0
+        self.primary_wins = 0
+        self.fallback_used = 0
+        self.fallback_cancelled = 0
+        self.latency_saved_seconds = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "primary_wins": self.primary_wins,
+            "fallback_used": self.fallback_used,
+            "fallback_cancelled": self.fallback_cancelled,
+            "latency_saved_seconds": round(self.latency_saved_seconds, 3),
+        }
+
+
+async def speculate(
+    primary: Callable[[], Awaitable[Any]],
+    fallback: Callable[[], Awaitable[Any]],
+    delay: float = 0.0,
+    stats: Optional[SpeculationStats] = None,
+) -> Tuple[Any, bool]:
+    """
+    Run `primary` and, after `delay` seconds, `fallback` concurrently.
+
+    If `primary` returns a truthy result, the fallback is cancelled (or never started
+    if it is still inside its delay) and the primary result is returned. Otherwise the
+    fallback's result is awaited and returned. The latency saved is the time the
+    fallback had already been running when the primary came back empty.
+
+    Args:
+        primary (Callable): Factory for the cheap path, returning a falsy value on a miss.
+        fallback (Callable): Factory for the expensive path.
+        delay (float): Seconds to wait before starting the fallback, to limit its cost.
+        stats (SpeculationStats, optional): Counters to update.
+
+    Returns:
+        Tuple[Any, bool]: The result and whether it came from the fallback.
+    """
+    fallback_started_at = None
+
+    async def delayed_fallback():
+        nonlocal fallback_started_at
+        if delay > 0:
+            await asyncio.sleep(delay)
+        fallback_started_at = time.perf_counter()
+        return await fallback()
+
+    primary_task = asyncio.ensure_future(primary())
+    fallback_task = asyncio.ensure_future(delayed_fallback())
+    if stats is not None:
+        stats.runs += 1
+
+    try:
+        result = await primary_task
+    except BaseException:
+        fallback_task.cancel()
+        raise
+
+    if result:
+        fallback_task.cancel()
+        if stats is not None:
+            stats.primary_wins += 1
+            if fallback_started_at is not None:
+                stats.fallback_cancelled += 1
+        return result, False
+
+    primary_done_at = time.perf_counter()
+    fallback_result = await fallback_task
+    if stats is not None:
+        stats.fallback_used += 1
+        if fallback_started_at is not None:
+            stats.latency_saved_seconds += max(0.0, primary_done_at - fallback_started_at)
+    return fallback_result, True
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller starts the
+    computation and every caller that arrives while it is in flight awaits the same
+    result instead of starting a duplicate. Nothing is cached once it completes.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Any, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def in_flight(self, key: Any) -> bool:
+        """Whether a call for `key` is running, i.e. do(key, ...) would join it."""
+        return key in self._in_flight
+
+    async def do(self, key: Any, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `func` for `key`, or join the in-flight run for the same key.
+
+        Args:
+            key (Any): Hashable key identifying identical work.
+            func (Callable): Factory for the computation.
+
+        Returns:
+            Any: The computation's result (shared by all coalesced callers).
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # Shield the shared task so one caller disconnecting doesn't cancel it for the rest
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Any, task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.calls + self.coalesced
+        return {
+            "requests": requests,
+            "executions": self.calls,
+            "coalesced": self.coalesced,
+            "coalesced_rate": self.coalesced / requests if requests else 0.0,
+            "in_flight": len(self._in_flight),
+        }
@@ -1,24 +1,115 @@
 import pandas as pd
 from io import StringIO
-from typing import List
+from typing import Iterator, List, Optional
 from langchain_core.documents import Document
 
+# Rows parsed and converted per chunk in streaming mode
+DEFAULT_CHUNK_ROWS = 50_000
+
+# (label, column) pairs that make up a document's text, in order
+CONTENT_FIELDS = [
+    ("API Step", "API Step"),
+    ("Field Name", "Simple Field Name"),
+    ("Description", "Description"),
+    ("Technical Data Point", "Technical Data Point"),
+]
+
 class DataLoader:
     """
     Handles loading and processing data from a source (e.g., CSV)
     and converting it into a list of LangChain Document objects.
     """
-    def __init__(self, data_source: str):
+    def __init__(self, data_source: Optional[str] = None, path: Optional[str] = None,
+                 memory_map: bool = False, chunk_rows: int = DEFAULT_CHUNK_ROWS):
         """
         Initializes the DataLoader with the source data.
 
         Args:
-            data_source (str): A string containing the raw CSV data.
-                               In a real application, this could be a file path.
+            data_source (str, optional): A string containing the raw CSV data.
+            path (str, optional): Path of a CSV file to read instead of `data_source`.
+            memory_map (bool): Memory-map the file at `path` instead of reading it
+                through buffered I/O.
+            chunk_rows (int): Rows per chunk when streaming.
         """
+        if (data_source is None) == (path is None):
+            raise ValueError("Pass exactly one of data_source or path")
         self.data_source = data_source
+        self.path = path
+        self.memory_map = memory_map
+        self.chunk_rows = chunk_rows
         print("DataLoader initialized.")
 
+    def _read_csv(self, **kwargs):
+        if self.path is not None:
+            return pd.read_csv(self.path, memory_map=self.memory_map, **kwargs)
+        return pd.read_csv(StringIO(self.data_source), **kwargs)
+
+    @staticmethod
+    def _as_rows(chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applies the upcast iterrows() makes: each row is a Series of the frame's
+        common dtype, so in an all-numeric frame with a float column every int
+        cell becomes a float and formats as "1.0". Frames with any non-numeric
+        (or bool) column are object rows, where cells keep their own type.
+        """
+        dtypes = list(chunk.dtypes)
+        numeric = all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) for dtype in dtypes)
+        if numeric and any(pd.api.types.is_float_dtype(dtype) for dtype in dtypes):
+            return chunk.astype(float)
+        return chunk
+
+    @staticmethod
+    def _column_text(chunk: pd.DataFrame, column: str) -> pd.Series:
+        # Same text as formatting the cell in an f-string: missing cells read "nan",
+        # missing columns "N/A"
+        if column not in chunk.columns:
+            return pd.Series("N/A", index=chunk.index, dtype=object)
+        return chunk[column].astype(str).fillna("nan")
+
+    def iter_documents(self) -> Iterator[Document]:
+        """
+        Streams the CSV in chunks of `chunk_rows` rows, building each chunk's
+        `page_content` with vectorized string operations and yielding Documents
+        lazily, so memory is bounded by the chunk size rather than the file size.
+
+        Yields:
+            Document: One document per row, identical to `build_document(row)` on
+            the rows of `df.iterrows()`. Column dtypes are inferred per chunk, so a
+            numeric column whose missing values only occur in some chunks reads
+            "1" in the others, where a whole-file read would give "1.0".
+        """
+        for chunk in self._read_csv(chunksize=self.chunk_rows):
+            chunk = self._as_rows(chunk)
+            content = None
+            for label, column in CONTENT_FIELDS:
+                part = f"{label}: " + self._column_text(chunk, column)
+                content = part if content is None else content + "\n" + part
+            api_steps = chunk["API Step"].tolist() if "API Step" in chunk.columns else ["N/A"] * len(chunk)
+            for text, api_step in zip(content.tolist(), api_steps):
+                yield Document(page_content=text, metadata={"source_api_step": api_step})
+
+    @staticmethod
+    def build_document(row) -> Document:
+        """
+        Converts one CSV row (a pandas Series or dict) into a Document.
+
+        Args:
+            row: The row, keyed by column name.
+
+        Returns:
+            Document: The row's text chunk, with its API step in metadata.
+        """
+        # Combine relevant columns into a single text chunk for embedding
+        content = (
+            f"API Step: {row.get('API Step', 'N/A')}\n"
+            f"Field Name: {row.get('Simple Field Name', 'N/A')}\n"
+            f"Description: {row.get('Description', 'N/A')}\n"
+            f"Technical Data Point: {row.get('Technical Data Point', 'N/A')}"
+        )
+        # Store the source API step in metadata for reference
+        metadata = {"source_api_step": row.get('API Step', 'N/A')}
+        return Document(page_content=content, metadata=metadata)
+
     def load_and_process(self) -> List[Document]:
         """
         Loads data from the source, processes each row, and converts
@@ -28,21 +119,6 @@ class DataLoader:
             List[Document]: A list of documents ready for embedding.
         """
         print("Loading and processing data...")
-        df = pd.read_csv(StringIO(self.data_source))
-        
-        documents = []
-        for index, row in df.iterrows():
-            # Combine relevant columns into a single text chunk for embedding
-            content = (
-                f"API Step: {row.get('API Step', 'N/A')}\n"
-                f"Field Name: {row.get('Simple Field Name', 'N/A')}\n"
-                f"Description: {row.get('Description', 'N/A')}\n"
-                f"Technical Data Point: {row.get('Technical Data Point', 'N/A')}"
-            )
-            # Store the source API step in metadata for reference
-            metadata = {"source_api_step": row.get('API Step', 'N/A')}
-            doc = Document(page_content=content, metadata=metadata)
-            documents.append(doc)
-            
+        documents = list(self.iter_documents())
         print(f"Processed {len(documents)} documents.")
         return documents
@@ -1,25 +1,285 @@
-from typing import List
+import os
+import json
+import math
+import time
+import pickle
+import hashlib
+from typing import Dict, List, Optional
+import numpy as np
 from langchain_core.documents import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.embeddings import OllamaEmbeddings
 from langchain_community.vectorstores import FAISS
 
+# Files written to a persisted index directory
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "index.pkl"
+MANIFEST_FILE = "manifest.json"
+
+# flat: exact search. The others are approximate and trade recall for speed/memory:
+#   ivf_flat  inverted lists over k-means cells, full vectors; tune nprobe
+#   ivf_pq    inverted lists with product-quantized codes (~pq_m bytes/vector); tune nprobe
+#   hnsw      graph index over full vectors, no training; tune ef_search
+#   sq8       8-bit scalar quantization, exhaustive search at 1 byte/dimension
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw", "sq8")
+
+# k-means needs this many training points per centroid to give stable cells
+MIN_POINTS_PER_CENTROID = 39
+
+
+def default_nlist(count: int) -> int:
+    """IVF cells for `count` vectors: ~4*sqrt(n), capped so each cell can be trained."""
+    return max(1, min(int(4 * math.sqrt(count)), count // MIN_POINTS_PER_CENTROID))
+
+
+def default_pq_m(dimensions: int) -> int:
+    """PQ sub-quantizers: the largest divisor of `dimensions` giving >= 8 dimensions each."""
+    for m in range(max(1, dimensions // 8), 0, -1):
+        if dimensions % m == 0:
+            return m
+    return 1
+
+
+def build_index(vectors: np.ndarray, index_type: str = "flat", nlist: Optional[int] = None,
+                pq_m: Optional[int] = None, pq_nbits: int = 8, hnsw_m: int = 32,
+                ef_construction: int = 200, train_size: int = 100_000, seed: int = 0):
+    """
+    Builds, trains and fills a FAISS index (L2 metric, like FAISS.from_documents).
+
+    Args:
+        vectors (np.ndarray): float32 matrix, one row per document.
+        index_type (str): One of INDEX_TYPES.
+        nlist (int, optional): IVF cells; defaults to `default_nlist`.
+        pq_m (int, optional): PQ sub-quantizers; must divide the dimensions.
+        pq_nbits (int): Bits per PQ code.
+        hnsw_m (int): HNSW neighbours per node.
+        ef_construction (int): HNSW build-time search depth.
+        train_size (int): Most vectors sampled for training.
+        seed (int): Seed for the training sample.
+
+    Returns:
+        faiss.Index: The filled index.
+    """
+    import faiss
+
+    count, dimensions = vectors.shape
+    if index_type == "flat":
+        description = "Flat"
+    elif index_type == "ivf_flat":
+        description = f"IVF{nlist or default_nlist(count)},Flat"
+    elif index_type == "ivf_pq":
+        if count < 2 ** pq_nbits:
+            raise ValueError(f"ivf_pq needs at least {2 ** pq_nbits} vectors to train {pq_nbits}-bit codes, got {count}")
+        description = f"IVF{nlist or default_nlist(count)},PQ{pq_m or default_pq_m(dimensions)}x{pq_nbits}"
+    elif index_type == "hnsw":
+        description = f"HNSW{hnsw_m},Flat"
+    elif index_type == "sq8":
+        description = "SQ8"
+    else:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+
+    index = faiss.index_factory(dimensions, description, faiss.METRIC_L2)
+    if index_type == "hnsw":
+        index.hnsw.efConstruction = ef_construction
+    if not index.is_trained:
+        sample = vectors
+        if count > train_size:
+            sample = vectors[np.random.default_rng(seed).choice(count, train_size, replace=False)]
+        index.train(sample)
+    index.add(vectors)
+    return index
+
+
+def set_search_params(index, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """Sets IVF nprobe / HNSW efSearch on an index; parameters that don't apply are ignored."""
+    import faiss
+
+    if nprobe is not None:
+        try:
+            faiss.extract_index_ivf(index).nprobe = nprobe
+        except RuntimeError:
+            pass  # not an IVF index
+    if ef_search is not None and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search
+
+
+def index_memory_bytes(index) -> int:
+    """Size of the index's serialized form, which is what it occupies in memory or on disk."""
+    import faiss
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def evaluate_index(index, vectors: np.ndarray, queries: np.ndarray, k: int = 10,
+                   ground_truth: Optional[np.ndarray] = None) -> Dict[str, float]:
+    """
+    Recall@k of `index` against exact search over `vectors`, single-query latency,
+    batch throughput and index memory.
+
+    Args:
+        index (faiss.Index): The index to evaluate, with search params already set.
+        vectors (np.ndarray): The vectors the index was built from.
+        queries (np.ndarray): float32 query matrix.
+        k (int): Neighbours per query.
+        ground_truth (np.ndarray, optional): Exact neighbour ids, to reuse across calls.
+
+    Returns:
+        dict: recall, latency percentiles (ms), queries/sec and memory (MB).
+    """
+    import faiss
+
+    if ground_truth is None:
+        exact = faiss.IndexFlatL2(vectors.shape[1])
+        exact.add(vectors)
+        ground_truth = exact.search(queries, k)[1]
+
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query.reshape(1, -1), k)
+        latencies.append(time.perf_counter() - started)
+    started = time.perf_counter()
+    found = index.search(queries, k)[1]
+    batch_seconds = time.perf_counter() - started
+
+    hits = sum(len(set(row) & set(truth)) for row, truth in zip(found, ground_truth))
+    values = np.asarray(latencies) * 1000
+    return {
+        f"recall@{k}": round(hits / (len(queries) * k), 4),
+        "latency_ms_p50": round(float(np.percentile(values, 50)), 4),
+        "latency_ms_p95": round(float(np.percentile(values, 95)), 4),
+        "batch_qps": round(len(queries) / batch_seconds, 1) if batch_seconds else 0.0,
+        "memory_mb": round(index_memory_bytes(index) / 1024 / 1024, 2),
+    }
+
 class VectorStoreManager:
     """
     Manages the creation and retrieval of a vector store using FAISS.
     """
-    def __init__(self, embedding_model_name: str = "nomic-embed-text"):
+    def __init__(self, embedding_model_name: str = "nomic-embed-text", embeddings=None,
+                 index_dir: Optional[str] = None, mmap: bool = True, index_type: str = "flat",
+                 index_params: Optional[dict] = None, nprobe: Optional[int] = None,
+                 ef_search: Optional[int] = None):
         """
         Initializes the VectorStoreManager with a specified Ollama embedding model.
 
         Args:
             embedding_model_name (str): The name of the embedding model to use.
+            embeddings (Embeddings, optional): Embedding model to use instead of Ollama.
+            index_dir (str, optional): Directory to persist the index in. When set,
+                `create_store` reloads the saved index instead of re-embedding, as long
+                as its manifest matches the documents and embedding model.
+            mmap (bool): Memory-map the saved vectors read-only instead of copying them
+                into process memory, so worker processes share one copy through the page cache.
+            index_type (str): One of INDEX_TYPES; "flat" is exact search.
+            index_params (dict, optional): Build parameters passed to `build_index`
+                (nlist, pq_m, pq_nbits, hnsw_m, ef_construction, train_size).
+            nprobe (int, optional): IVF cells visited per query.
+            ef_search (int, optional): HNSW search depth.
         """
-        self.embeddings = OllamaEmbeddings(model=embedding_model_name)
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+        self.embedding_model_name = embedding_model_name
+        self.embeddings = embeddings if embeddings is not None else OllamaEmbeddings(model=embedding_model_name)
+        self.index_dir = index_dir
+        self.mmap = mmap
+        self.index_type = index_type
+        self.index_params = index_params or {}
+        self.nprobe = nprobe
+        self.ef_search = ef_search
         print(f"VectorStoreManager initialized with model: {embedding_model_name}")
 
+    def build_manifest(self, documents: List[Document]) -> dict:
+        """
+        Describes what an index was built from: the embedding model and a digest of
+        every document's text and metadata, in order.
+
+        Args:
+            documents (List[Document]): The documents the index holds.
+
+        Returns:
+            dict: The manifest.
+        """
+        digest = hashlib.sha256()
+        for doc in documents:
+            payload = json.dumps({"text": doc.page_content, "metadata": doc.metadata}, sort_keys=True, default=str)
+            digest.update(hashlib.sha256(payload.encode("utf-8")).digest())
+        return {
+            "embedding_model": self.embedding_model_name,
+            "index_type": self.index_type,
+            "index_params": self.index_params,
+            "document_count": len(documents),
+            "documents_sha256": digest.hexdigest(),
+        }
+
+    def read_manifest(self) -> Optional[dict]:
+        """Returns the saved manifest, or None if there is no complete saved index."""
+        if not self.index_dir:
+            return None
+        paths = [os.path.join(self.index_dir, name) for name in (INDEX_FILE, DOCSTORE_FILE, MANIFEST_FILE)]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        with open(paths[2]) as f:
+            return json.load(f)
+
+    def save_store(self, vector_store: FAISS, manifest: dict):
+        """
+        Writes the index, its docstore and the manifest to `index_dir`. The manifest
+        is written last, so an interrupted save is never mistaken for a complete one.
+        """
+        import faiss
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        manifest_path = os.path.join(self.index_dir, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        faiss.write_index(vector_store.index, os.path.join(self.index_dir, INDEX_FILE))
+        with open(os.path.join(self.index_dir, DOCSTORE_FILE), "wb") as f:
+            pickle.dump((vector_store.docstore, vector_store.index_to_docstore_id), f)
+        with open(manifest_path, "w") as f:
+            json.dump({**manifest, "saved_at": time.time(), "faiss_version": faiss.__version__}, f, indent=2)
+        print(f"Saved FAISS index to '{self.index_dir}'")
+
+    def load_store(self) -> FAISS:
+        """
+        Loads the saved index. With `mmap`, the vectors stay in the file and are paged
+        in on demand; the index is then read-only.
+
+        Returns:
+            FAISS: The loaded vector store object.
+        """
+        import faiss
+
+        # IO_FLAG_MMAP_IFC maps both flat codes (Flat, HNSW storage, SQ) and IVF lists;
+        # IO_FLAG_MMAP alone still copies flat codes, and combining the two fails for IVF
+        flags = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY if self.mmap else 0
+        index = faiss.read_index(os.path.join(self.index_dir, INDEX_FILE), flags)
+        # Only ever loads the docstore this manager pickled itself in save_store
+        with open(os.path.join(self.index_dir, DOCSTORE_FILE), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        set_search_params(index, self.nprobe, self.ef_search)
+        print(f"Loaded FAISS index from '{self.index_dir}' ({index.ntotal} vectors{', memory-mapped' if self.mmap else ''})")
+        return FAISS(self.embeddings, index, docstore, index_to_docstore_id)
+
+    def _build_store(self, documents: List[Document]) -> FAISS:
+        if self.index_type == "flat":
+            return FAISS.from_documents(documents, self.embeddings)
+
+        texts = [doc.page_content for doc in documents]
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        started = time.perf_counter()
+        index = build_index(vectors, self.index_type, **self.index_params)
+        set_search_params(index, self.nprobe, self.ef_search)
+        print(f"Built {self.index_type} index over {len(documents)} vectors in {time.perf_counter() - started:.2f}s")
+
+        ids = [str(i) for i in range(len(documents))]
+        docstore = InMemoryDocstore(dict(zip(ids, documents)))
+        return FAISS(self.embeddings, index, docstore, dict(enumerate(ids)))
+
     def create_store(self, documents: List[Document]):
         """
-        Creates a FAISS vector store from the provided documents.
+        Creates a FAISS vector store from the provided documents. With `index_dir`,
+        the saved index is reused when its manifest matches, and otherwise rebuilt
+        and saved.
 
         Args:
             documents (List[Document]): A list of documents to embed and store.
@@ -27,7 +287,21 @@ class VectorStoreManager:
         Returns:
             FAISS: The created vector store object.
         """
+        manifest = None
+        if self.index_dir:
+            manifest = self.build_manifest(documents)
+            saved = self.read_manifest()
+            if saved and all(saved.get(key) == value for key, value in manifest.items()):
+                return self.load_store()
+            print("Saved FAISS index is missing or out of date, rebuilding")
+
         print("Creating FAISS vector store... (This may take a moment)")
-        vector_store = FAISS.from_documents(documents, self.embeddings)
+        vector_store = self._build_store(documents)
         print("Vector store created successfully.")
+
+        if manifest is not None:
+            self.save_store(vector_store, manifest)
+            # Serve from the saved copy, so every process shares the same mapped vectors
+            if self.mmap:
+                return self.load_store()
         return vector_store
@@ -1,5 +1,9 @@
+from functools import lru_cache
 from typing import Dict, Any, Optional
 
+from action_registry import ActionRegistry
+from frozen import thaw
+
 def get_mock_vector_db():
     """Mocks a Vector DB containing our 'smart action' documents."""
     
@@ -361,11 +365,19 @@ def get_mock_vector_db():
         }
     ]
 
+@lru_cache(maxsize=None)
+def get_action_registry() -> ActionRegistry:
+    """
+    Returns the registry of the mock database's actions, built on first use and
+    shared by every caller afterwards.
+    """
+    return ActionRegistry(get_mock_vector_db(), name="database.py")
+
 def get_action_by_id(action_id: str) -> Optional[Dict[str, Any]]:
     """
     Retrieves a single action document by its action_id from the mock database.
+    Returns a plain dict of lists that the caller may modify; read-only callers
+    can use get_action_registry().get() to skip the copy.
     """
-    for action in get_mock_vector_db():
-        if action.get("action_id") == action_id:
-            return action
-    return None
\ No newline at end of file
+    action = get_action_registry().get(action_id)
+    return thaw(action) if action is not None else None
\ No newline at end of file
@@ -1,3 +1,6 @@
+from functools import lru_cache
+
+
 def getObjects():
     return   [
         {
@@ -16,9 +19,9 @@ def getObjects():
                         "field_id": "mobile_number",
                         "component_type": "text_input",
                         "properties": {
-                            "label": "PAN Number",
+                            "label": "Mobile Number",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[6-9][0-9]{9}$",
                             "validation_message": "Invalid mobile format"
                         }
                     },
@@ -26,9 +29,9 @@ def getObjects():
                         "field_id": "adhaar_number",
                         "component_type": "text_input",
                         "properties": {
-                            "label": "PAN Number",
+                            "label": "Aadhaar Number",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[0-9]{12}$",
                             "validation_message": "Invalid AADHAAR format"
                         }
                     }
@@ -64,7 +67,7 @@ def getObjects():
                         "properties": {
                             "label": "First Name",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid first format"
                         }
                     },
@@ -74,7 +77,7 @@ def getObjects():
                         "properties": {
                             "label": "Second Name",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid second name format"
                         }
                     },
@@ -84,7 +87,7 @@ def getObjects():
                         "properties": {
                             "label": "Pincode",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[0-9]{6}$",
                             "validation_message": "Invalid pincode format"
                         }
                     }
@@ -122,7 +125,7 @@ def getObjects():
                         "properties": {
                             "label": "Nominee First Name",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid nominee first format"
                         }
                     },
@@ -132,7 +135,7 @@ def getObjects():
                         "properties": {
                             "label": "Nominee Second Name",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid nominee second name format"
                         }
                     },
@@ -140,10 +143,10 @@ def getObjects():
                         "field_id": "relationship",
                         "component_type": "text_input",
                         "properties": {
-                            "label": "Pincode",
+                            "label": "Relationship",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
-                            "validation_message": "Invalid pincode format"
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
+                            "validation_message": "Invalid relationship format"
                         }
                     }
                 ],
@@ -179,7 +182,7 @@ def getObjects():
                         "properties": {
                             "label": "Income type",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid income type format"
                         }
                     },
@@ -189,7 +192,7 @@ def getObjects():
                         "properties": {
                             "label": "amount",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[0-9]+(\\.[0-9]{1,2})?$",
                             "validation_message": "Invalid amount format"
                         }
                     }
@@ -226,7 +229,7 @@ def getObjects():
                         "properties": {
                             "label": "Household First Name",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid household first format"
                         }
                     },
@@ -236,7 +239,7 @@ def getObjects():
                         "properties": {
                             "label": "Household Second Name",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid household second name format"
                         }
                     },
@@ -244,9 +247,9 @@ def getObjects():
                         "field_id": "relationship",
                         "component_type": "text_input",
                         "properties": {
-                            "label": "Pincode",
+                            "label": "Relationship",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid relationship format"
                         }
                     }
@@ -282,9 +285,7 @@ def getObjects():
                         "component_type": "text_input",
                         "properties": {
                             "label": "",
-                            "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
-                            "validation_message": "Invalid household first format"
+                            "required": True
                         }
                     },
                     {
@@ -292,9 +293,7 @@ def getObjects():
                         "component_type": "text_input",
                         "properties": {
                             "label": "Address Line 1",
-                            "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
-                            "validation_message": "Invalid address line 1 format"
+                            "required": True
                         }
                     },
                     {
@@ -302,9 +301,7 @@ def getObjects():
                         "component_type": "text_input",
                         "properties": {
                             "label": "Address Line 2",
-                            "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
-                            "validation_message": "Invalid address line 2 format"
+                            "required": True
                         }
                     },
                     {
@@ -312,9 +309,7 @@ def getObjects():
                         "component_type": "text_input",
                         "properties": {
                             "label": "Address Line 1",
-                            "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
-                            "validation_message": "Invalid address line 3 format"
+                            "required": True
                         }
                     },
                     {
@@ -323,7 +318,7 @@ def getObjects():
                         "properties": {
                             "label": "City",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid city format"
                         }
                     },
@@ -333,7 +328,7 @@ def getObjects():
                         "properties": {
                             "label": "State",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid state format"
                         }
                     }
@@ -369,9 +364,7 @@ def getObjects():
                         "component_type": "text_input",
                         "properties": {
                             "label": "",
-                            "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
-                            "validation_message": "Invalid household first format"
+                            "required": True
                         }
                     },
                     {
@@ -379,9 +372,7 @@ def getObjects():
                         "component_type": "text_input",
                         "properties": {
                             "label": "Address Line 1",
-                            "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
-                            "validation_message": "Invalid address line 1 format"
+                            "required": True
                         }
                     },
                     {
@@ -389,9 +380,7 @@ def getObjects():
                         "component_type": "text_input",
                         "properties": {
                             "label": "Address Line 2",
-                            "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
-                            "validation_message": "Invalid address line 2 format"
+                            "required": True
                         }
                     },
                     {
@@ -399,9 +388,7 @@ def getObjects():
                         "component_type": "text_input",
                         "properties": {
                             "label": "Address Line 1",
-                            "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
-                            "validation_message": "Invalid address line 3 format"
+                            "required": True
                         }
                     },
                     {
@@ -410,7 +397,7 @@ def getObjects():
                         "properties": {
                             "label": "City",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid city format"
                         }
                     },
@@ -420,7 +407,7 @@ def getObjects():
                         "properties": {
                             "label": "State",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid state format"
                         }
                     }
@@ -457,9 +444,7 @@ def getObjects():
                         "component_type": "text_input",
                         "properties": {
                             "label": "",
-                            "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
-                            "validation_message": "Invalid household first format"
+                            "required": True
                         }
                     },
                     {
@@ -467,9 +452,7 @@ def getObjects():
                         "component_type": "text_input",
                         "properties": {
                             "label": "Address Line 1",
-                            "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
-                            "validation_message": "Invalid address line 1 format"
+                            "required": True
                         }
                     },
                     {
@@ -477,9 +460,7 @@ def getObjects():
                         "component_type": "text_input",
                         "properties": {
                             "label": "Address Line 2",
-                            "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
-                            "validation_message": "Invalid address line 2 format"
+                            "required": True
                         }
                     },
                     {
@@ -487,9 +468,7 @@ def getObjects():
                         "component_type": "text_input",
                         "properties": {
                             "label": "Address Line 1",
-                            "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
-                            "validation_message": "Invalid address line 3 format"
+                            "required": True
                         }
                     },
                     {
@@ -498,7 +477,7 @@ def getObjects():
                         "properties": {
                             "label": "City",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid city format"
                         }
                     },
@@ -508,7 +487,7 @@ def getObjects():
                         "properties": {
                             "label": "State",
                             "required": True,
-                            "validation_pattern": "[A-Z]{5}[0-9]{4}[A-Z]{1}",
+                            "validation_pattern": "^[A-Za-z][A-Za-z .'-]*$",
                             "validation_message": "Invalid state format"
                         }
                     }
@@ -527,4 +506,24 @@ def getObjects():
                 }
             ]
         },
-]
\ No newline at end of file
+]
+
+
+@lru_cache(maxsize=None)
+def get_action_registry():
+    """
+    Returns the registry of these actions, built on first use and shared by every
+    caller afterwards. Needs the repository root on sys.path.
+    """
+    from action_registry import ActionRegistry
+    return ActionRegistry(getObjects(), name="db/dbdata.py")
+
+
+def get_action_by_id(action_id):
+    """
+    Returns a mutable copy (plain dicts and lists) of the action with this
+    action_id, or None. Read-only callers can use get_action_registry().get().
+    """
+    from frozen import thaw
+    action = get_action_registry().get(action_id)
+    return thaw(action) if action is not None else None
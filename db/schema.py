@@ -5,7 +5,7 @@ def get_weaviate_schema():
             {
                 "class": "ActionStep",
                 "description": "A step in the user onboarding or workflow",
-                "vectorizer": "text2vec-openai",  # or "none" if you're embedding manually
+                "vectorizer": "none",  # vectors are computed by the loader and sent with each object
                 "properties": [
                     {
                         "name": "action_id",
@@ -17,7 +17,7 @@ def get_weaviate_schema():
                     },
                     {
                         "name": "description_for_llm",
-                        "dataType": ["text"]  # this will be vectorized
+                        "dataType": ["text"]
                     },
                     {
                         "name": "action_type",
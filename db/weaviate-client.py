@@ -1,28 +1,6 @@
-import weaviate
-import dbdata
-import schema
-import json
+# Older entry point, kept so existing invocations still work. The batch loader
+# lives in weaviate_client.py.
+from weaviate_client import main
 
-
-client = weaviate.Client("http://localhost:8080")  # or your cloud URL
-
-client.schema.delete_all()  # (optional) clear old schema
-
-client.schema.create(schema.get_weaviate_schema())
-
-action_docs = dbdata.getObjects()
-for doc in action_docs:
-    client.data_object.create(
-        data_object={
-            "action_id": doc["action_id"],
-            "stage_name": doc["stage_name"],
-            "description_for_llm": doc["description_for_llm"],
-            "action_type": doc["action_type"],
-            "preconditions": doc["preconditions"],
-            "next_action_id_success": doc["next_action_id_success"],
-            "next_action_id_failure": doc["next_action_id_failure"],
-            "ui_definition": json.dumps(doc["ui_definition"]),
-            "api_call_details": json.dumps(doc["api_call_details"])
-        },
-        class_name="ActionStep"
-    )
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,133 @@
-from weaviate import WeaviateClient, AuthApiKey
-import dbdata
-from . import schema # Corrected import for schema
+"""
+Load the db/dbdata.py action catalog into Weaviate's ActionStep collection.
+
+Vectors are computed here in batches (batch_embedding.BatchEmbedder) and sent with
+the objects through Weaviate's batch API, so the server doesn't vectorize anything.
+Each object's UUID is derived from its action_id, so re-running the loader updates
+existing objects in place instead of wiping the schema or creating duplicates.
+
+Run from the repository root:
+    python db/weaviate_client.py --batch-size 100 --workers 2
+"""
+import os
+import sys
 import json
+import time
+import argparse
+
+# db/ is a folder of scripts; the shared modules live in the repository root
+DB_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(DB_DIR)
+for path in (DB_DIR, REPO_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import dbdata  # noqa: E402
+import schema  # noqa: E402
+from batch_embedding import BatchEmbedder  # noqa: E402
+from clients import clients  # noqa: E402
+from ingestion_pipeline import action_document  # noqa: E402
+
+CLASS_NAME = "ActionStep"
+WEAVIATE_BATCH_SIZE = int(os.getenv("WEAVIATE_BATCH_SIZE", "100"))
+WEAVIATE_BATCH_WORKERS = int(os.getenv("WEAVIATE_BATCH_WORKERS", "2"))
+
+
+def action_properties(doc):
+    """ActionStep properties for one action, with nested definitions serialized as JSON."""
+    return {
+        "action_id": doc["action_id"],
+        "stage_name": doc["stage_name"],
+        "description_for_llm": doc["description_for_llm"],
+        "action_type": doc["action_type"],
+        "preconditions": doc["preconditions"],
+        "next_action_id_success": doc["next_action_id_success"],
+        "next_action_id_failure": doc["next_action_id_failure"],
+        "ui_definition": json.dumps(doc["ui_definition"]),
+        "api_call_details": json.dumps(doc["api_call_details"])
+    }
+
+
+def ensure_collection(client):
+    """Create the ActionStep collection from schema.py if it doesn't exist yet."""
+    if not client.collections.exists(CLASS_NAME):
+        class_schema = next(c for c in schema.get_weaviate_schema()["classes"] if c["class"] == CLASS_NAME)
+        client.collections.create_from_dict(class_schema)
+        print(f"Created collection '{CLASS_NAME}'")
+    return client.collections.get(CLASS_NAME)
+
+
+def import_actions(client, actions, embedder, batch_size=WEAVIATE_BATCH_SIZE, workers=WEAVIATE_BATCH_WORKERS,
+                   source="dbdata"):
+    """
+    Upsert actions into the ActionStep collection with precomputed vectors.
 
+    Args:
+        client (WeaviateClient): The Weaviate client.
+        actions (list): Action definitions in the dbdata format.
+        embedder (BatchEmbedder): Embeds the action texts.
+        batch_size (int): Objects per batch request.
+        workers (int): Batch requests in flight at once.
+        source (str): Catalog the actions come from, as passed to action_document.
 
-client = WeaviateClient.connect_to_local(
-    port=8080,
-    grpc_port=50051,  # Optional, skip if not using gRPC
-    secure=False
-)
-client.schema.delete_all()  # (optional) clear old schema
-
-client.schema.create(schema.get_weaviate_schema())
-
-action_docs = dbdata.getObjects()
-for doc in action_docs:
-    client.data_object.create(
-        data_object={
-            "action_id": doc["action_id"],
-            "stage_name": doc["stage_name"],
-            "description_for_llm": doc["description_for_llm"],
-            "action_type": doc["action_type"],
-            "preconditions": doc["preconditions"],
-            "next_action_id_success": doc["next_action_id_success"],
-            "next_action_id_failure": doc["next_action_id_failure"],
-            "ui_definition": json.dumps(doc["ui_definition"]),
-            "api_call_details": json.dumps(doc["api_call_details"])
-        },
-        class_name="ActionStep"
+    Returns:
+        dict: Counts, timings, objects/sec and the failed objects' errors.
+    """
+    from weaviate.util import generate_uuid5
+
+    collection = ensure_collection(client)
+
+    started = time.perf_counter()
+    vectors = embedder.embed([action_document(action, source).page_content for action in actions])
+    embed_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with collection.batch.fixed_size(batch_size=batch_size, concurrent_requests=workers) as batch:
+        for action, vector in zip(actions, vectors):
+            batch.add_object(
+                properties=action_properties(action),
+                vector=vector,
+                uuid=generate_uuid5(action["action_id"])
+            )
+    import_seconds = time.perf_counter() - started
+
+    failed = collection.batch.failed_objects
+    return {
+        "objects": len(actions),
+        "imported": len(actions) - len(failed),
+        "failed": len(failed),
+        "embed_seconds": round(embed_seconds, 3),
+        "import_seconds": round(import_seconds, 3),
+        "objects_per_second": round(len(actions) / import_seconds, 1) if import_seconds else 0.0,
+        "errors": [f"{(obj.object_.properties or {}).get('action_id')}: {obj.message}" for obj in failed],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-import the dbdata action catalog into Weaviate.")
+    parser.add_argument("--batch-size", type=int, default=WEAVIATE_BATCH_SIZE, help="Objects per batch request")
+    parser.add_argument("--workers", type=int, default=WEAVIATE_BATCH_WORKERS, help="Batch requests in flight")
+    parser.add_argument("--embedding-model", type=str, default="text-embedding-3-small")
+    args = parser.parse_args()
+
+    from embedding_cache import get_cached_embeddings
+    embedder = BatchEmbedder(get_cached_embeddings(args.embedding_model))
+
+    try:
+        report = import_actions(clients.weaviate(), dbdata.getObjects(), embedder, args.batch_size, args.workers)
+    finally:
+        clients.close()
+
+    print(
+        f"Imported {report['imported']}/{report['objects']} objects into '{CLASS_NAME}' in "
+        f"{report['import_seconds']}s ({report['objects_per_second']} objects/sec); "
+        f"embedding took {report['embed_seconds']}s"
     )
+    if report["failed"]:
+        print(f"{report['failed']} objects failed:")
+        for error in report["errors"]:
+            print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
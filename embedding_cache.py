@@ -0,0 +1,314 @@
+import os
+import re
+import time
+import array
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+
+from concurrency import run_blocking
+
+# Load environment variables
+load_dotenv()
+
+# --- Configuration ---
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+EMBEDDING_CACHE_TTL = float(os.getenv("EMBEDDING_CACHE_TTL", "86400"))
+# Set EMBEDDING_CACHE_PATH to an empty string to disable the on-disk tier
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+EMBEDDING_CACHE_DISK_MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_DISK_MAX_ROWS", "200000"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for cache keys: Unicode NFKC, collapsed whitespace, case-folded.
+    "Start  Onboarding " and "start onboarding" share one cache entry.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().casefold()
+
+
+class _MemoryTier:
+    """Thread-safe LRU of vectors with a per-entry time-to-live."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            vector, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return vector
+
+    def put(self, key: str, vector: List[float]):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (vector, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _DiskTier:
+    """
+    SQLite-backed vector store keyed by (model, normalized text hash). Vectors are
+    stored as float32 blobs. Rows beyond `max_rows` are pruned least-recently-used first.
+    """
+
+    def __init__(self, path: str, max_rows: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.commit()
+        self._inserts_since_prune = 0
+
+    def get_many(self, model: str, keys: List[str]) -> Dict[str, List[float]]:
+        if not keys:
+            return {}
+        found = {}
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT vector FROM embeddings WHERE model = ? AND text_hash = ?",
+                    (model, key)
+                ).fetchone()
+                if row is not None:
+                    found[key] = array.array("f", row[0]).tolist()
+            if found:
+                self._conn.executemany(
+                    "UPDATE embeddings SET accessed_at = ? WHERE model = ? AND text_hash = ?",
+                    [(time.time(), model, key) for key in found]
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, model: str, items: Dict[str, List[float]]):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, accessed_at) VALUES (?, ?, ?, ?)",
+                [(model, key, array.array("f", vector).tobytes(), now) for key, vector in items.items()]
+            )
+            self._inserts_since_prune += len(items)
+            if self._inserts_since_prune >= 1000:
+                self._prune()
+            self._conn.commit()
+
+    def _prune(self):
+        self._inserts_since_prune = 0
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = count - self.max_rows
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,)
+            )
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper with two cache tiers in front of the real embedding model:
+    an in-memory LRU with size and TTL limits, and an optional on-disk SQLite store
+    keyed by (model, normalized text) that survives restarts.
+
+    On a miss the original text is embedded; the vector is then shared by every
+    text with the same normalized form.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model_name: str,
+        max_size: int = EMBEDDING_CACHE_SIZE,
+        ttl_seconds: float = EMBEDDING_CACHE_TTL,
+        disk_path: Optional[str] = EMBEDDING_CACHE_PATH,
+        disk_max_rows: int = EMBEDDING_CACHE_DISK_MAX_ROWS,
+    ):
+        """
+        Args:
+            underlying (Embeddings): The embedding model to call on a cache miss.
+            model_name (str): Model identifier; part of every cache key.
+            max_size (int): Maximum number of vectors kept in memory.
+            ttl_seconds (float): How long a vector stays in the memory tier.
+            disk_path (str, optional): SQLite file for the persistent tier, or None/"" to disable it.
+            disk_max_rows (int): Maximum number of vectors kept on disk.
+        """
+        self.underlying = underlying
+        self.model_name = model_name
+        self._memory = _MemoryTier(max_size, ttl_seconds)
+        self._disk = _DiskTier(disk_path, disk_max_rows) if disk_path else None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a list of texts, calling the underlying model once for all misses.
+        """
+        keys = [self._key(text) for text in texts]
+        vectors: Dict[str, List[float]] = {}
+        memory_hits = 0
+
+        for key in keys:
+            if key in vectors:
+                continue
+            vector = self._memory.get(key)
+            if vector is not None:
+                vectors[key] = vector
+                memory_hits += 1
+
+        pending = list(dict.fromkeys(key for key in keys if key not in vectors))
+        disk_found = self._disk.get_many(self.model_name, pending) if self._disk else {}
+        for key, vector in disk_found.items():
+            vectors[key] = vector
+            self._memory.put(key, vector)
+
+        # Embed each missing normalized text once, using its first original spelling
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+        if missing:
+            embedded = self.underlying.embed_documents(list(missing.values()))
+            new_vectors = dict(zip(missing.keys(), embedded))
+            for key, vector in new_vectors.items():
+                vectors[key] = vector
+                self._memory.put(key, vector)
+            if self._disk:
+                self._disk.put_many(self.model_name, new_vectors)
+
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.disk_hits += len(disk_found)
+            self.misses += len(missing)
+
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a single query, consulting the memory tier, then disk, then the model.
+        """
+        key = self._key(text)
+        vector = self._memory.get(key)
+        if vector is not None:
+            with self._lock:
+                self.memory_hits += 1
+            return vector
+
+        if self._disk:
+            vector = self._disk.get_many(self.model_name, [key]).get(key)
+            if vector is not None:
+                self._memory.put(key, vector)
+                with self._lock:
+                    self.disk_hits += 1
+                return vector
+
+        vector = self.underlying.embed_query(text)
+        self._memory.put(key, vector)
+        if self._disk:
+            self._disk.put_many(self.model_name, {key: vector})
+        with self._lock:
+            self.misses += 1
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await run_blocking(self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await run_blocking(self.embed_query, text)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters for this model's cache."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "model": self.model_name,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+
+_shared_embeddings: Dict[str, CachedEmbeddings] = {}
+_shared_lock = threading.Lock()
+
+
+def get_cached_embeddings(model: str = "text-embedding-3-small", provider: str = "openai") -> CachedEmbeddings:
+    """
+    Returns the process-wide cached embeddings for a model, creating it on first use.
+
+    Args:
+        model (str): The embedding model name.
+        provider (str): "openai" or "ollama".
+
+    Returns:
+        CachedEmbeddings: The shared caching wrapper for that model.
+    """
+    cache_key = f"{provider}:{model}"
+    with _shared_lock:
+        if cache_key not in _shared_embeddings:
+            if provider == "openai":
+                from langchain_openai import OpenAIEmbeddings
+                from clients import clients
+                underlying = OpenAIEmbeddings(
+                    openai_api_key=os.getenv("OPENAI_API_KEY"),
+                    model=model,
+                    **clients.openai_http_kwargs()
+                )
+            elif provider == "ollama":
+                from langchain_community.embeddings import OllamaEmbeddings
+                underlying = OllamaEmbeddings(model=model)
+            else:
+                raise ValueError(f"Unknown embedding provider: {provider}")
+            _shared_embeddings[cache_key] = CachedEmbeddings(underlying, model_name=cache_key)
+            print(f"Embedding cache initialized for {cache_key}")
+        return _shared_embeddings[cache_key]
+
+
+def embedding_cache_stats() -> List[Dict[str, float]]:
+    """Hit/miss counters for every shared embedding cache in this process."""
+    return [embeddings.stats() for embeddings in _shared_embeddings.values()]
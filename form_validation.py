@@ -0,0 +1,222 @@
+import os
+import re
+import sys
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+REQUIRED_MESSAGE = "This field is required"
+
+# Regex enforcement can be turned off while a catalog's patterns are unreliable;
+# required and type checks still apply
+ENFORCE_PATTERNS = os.getenv("FORM_VALIDATION_PATTERNS", "true").lower() in ("1", "true", "yes")
+
+# An error is (field key, message), the shape of server.ErrorItem
+FieldError = Tuple[str, str]
+
+_NUMBER = re.compile(r"-?\d+(\.\d+)?")
+_TRUE_STRINGS = ("true", "1", "yes", "on")
+_BOOLEAN_STRINGS = _TRUE_STRINGS + ("false", "0", "no", "off")
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip()) or value == [] or value == {}
+
+
+def _as_text(value: Any) -> Optional[str]:
+    """Scalars as they'd be typed into the form; None for values no text field accepts."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    return None
+
+
+# Type checks: return an error message, or None if the value is acceptable
+
+def _check_text(value: Any) -> Optional[str]:
+    return None if _as_text(value) is not None else "Expected a text value"
+
+
+def _check_number(value: Any) -> Optional[str]:
+    text = _as_text(value)
+    return None if text is not None and _NUMBER.fullmatch(text.strip()) else "Expected a number"
+
+
+def _check_date(value: Any) -> Optional[str]:
+    try:
+        date.fromisoformat(value)
+        return None
+    except (TypeError, ValueError):
+        return "Expected a date in YYYY-MM-DD format"
+
+
+def _check_boolean(value: Any) -> Optional[str]:
+    if isinstance(value, bool) or (isinstance(value, str) and value.strip().lower() in _BOOLEAN_STRINGS):
+        return None
+    return "Expected true or false"
+
+
+def _type_check(field: Dict[str, Any]) -> Optional[Callable[[Any], Optional[str]]]:
+    """The type check implied by a form field's input_type or component_type."""
+    input_type = (field.get("properties") or {}).get("input_type")
+    component = (field.get("component_type") or "").lower()
+    if input_type == "number" or "number" in component:
+        return _check_number
+    if "date" in component:
+        return _check_date
+    if "checkbox" in component:
+        return _check_boolean
+    if "file" in component:
+        return None  # an upload reference; only presence is checked
+    return _check_text
+
+
+class CompiledField:
+    """One form field's checks, compiled once: required flag, type check and regex."""
+
+    __slots__ = ("key", "required", "type_check", "pattern", "pattern_message", "is_checkbox")
+
+    def __init__(self, field: Dict[str, Any], enforce_pattern: bool = True):
+        properties = field.get("properties") or {}
+        self.key = field["field_id"]
+        self.required = bool(properties.get("required"))
+        self.type_check = _type_check(field)
+        self.is_checkbox = self.type_check is _check_boolean
+        pattern = properties.get("validation_pattern") if enforce_pattern else None
+        # Search semantics, like RegExp.test in the frontend: anchored patterns must
+        # match the whole value, unanchored ones anywhere in it
+        self.pattern = re.compile(pattern) if pattern else None
+        self.pattern_message = properties.get("validation_message") or f"Invalid {properties.get('label') or self.key}"
+
+    def check(self, value: Any) -> Optional[str]:
+        """Returns the field's error message, or None if the value is valid."""
+        if _is_empty(value):
+            return REQUIRED_MESSAGE if self.required else None
+        if self.type_check is not None:
+            error = self.type_check(value)
+            if error:
+                return error
+        # A required checkbox (e.g. consent) must be ticked
+        if self.is_checkbox and self.required and not (value is True or str(value).strip().lower() in _TRUE_STRINGS):
+            return REQUIRED_MESSAGE
+        if self.pattern is not None and not self.pattern.search(_as_text(value) or ""):
+            return self.pattern_message
+        return None
+
+
+def _form_errors(fields: Iterable[CompiledField], data: Dict[str, Any]) -> List[FieldError]:
+    errors = []
+    for field in fields:
+        message = field.check(data.get(field.key))
+        if message:
+            errors.append((field.key, message))
+    return errors
+
+
+class FormValidator:
+    """
+    Validates /submit payloads against the form_fields declared for each action.
+
+    Every action's fields are compiled once (CompiledField: regex, type check,
+    required flag), so validating a submission is a single pass over that action's
+    fields with no parsing or regex compilation. Submissions for actions without
+    declared form fields pass unchecked.
+    """
+
+    def __init__(self, actions: Iterable[Dict[str, Any]] = ()):
+        """
+        Args:
+            actions (Iterable[dict]): Action definitions with `ui_definition.form_fields`.
+        """
+        self._forms: Dict[str, Tuple[CompiledField, ...]] = {}
+        self._lock = threading.Lock()
+        self.validated = 0
+        self.failed = 0
+        self.add_actions(actions)
+
+    def add_actions(self, actions: Iterable[Dict[str, Any]], replace: bool = False):
+        """
+        Compile the form fields of `actions`.
+
+        Args:
+            actions (Iterable[dict]): Action definitions with `ui_definition.form_fields`.
+            replace (bool): Replace earlier forms with the same action_id instead of raising.
+
+        Raises:
+            ValueError: If an action_id already has a form (or appears twice) and replace is False.
+        """
+        forms = [
+            (action["action_id"], [field for field in (action.get("ui_definition") or {}).get("form_fields") or ()
+                                   if field.get("field_id")])
+            for action in actions
+        ]
+        compiled: Dict[str, Tuple[CompiledField, ...]] = {}
+        for action_id, fields in forms:
+            if not fields:
+                continue
+            if not replace and (action_id in self._forms or action_id in compiled):
+                raise ValueError(f"Form for action_id '{action_id}' is defined more than once")
+            compiled[action_id] = tuple(CompiledField(field, enforce_pattern=ENFORCE_PATTERNS) for field in fields)
+        self._forms.update(compiled)
+
+    def has_form(self, action_id: str) -> bool:
+        return action_id in self._forms
+
+    def validate(self, action_id: str, data: Dict[str, Any]) -> List[FieldError]:
+        """
+        Validate one submission.
+
+        Args:
+            action_id (str): The action the form belongs to.
+            data (dict): Submitted values by field key.
+
+        Returns:
+            List[FieldError]: (key, message) per invalid field, in form order; empty if valid.
+        """
+        errors = _form_errors(self._forms.get(action_id, ()), data)
+        with self._lock:
+            self.validated += 1
+            self.failed += bool(errors)
+        return errors
+
+    def validate_many(self, submissions: Iterable[Tuple[str, Dict[str, Any]]]) -> List[List[FieldError]]:
+        """
+        Validate many (action_id, data) submissions, returning their errors in order.
+        """
+        forms = self._forms
+        results = []
+        failed = 0
+        for action_id, data in submissions:
+            errors = _form_errors(forms.get(action_id, ()), data)
+            failed += bool(errors)
+            results.append(errors)
+        with self._lock:
+            self.validated += len(results)
+            self.failed += failed
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "actions": len(self._forms),
+            "fields": sum(len(fields) for fields in self._forms.values()),
+            "validated": self.validated,
+            "failed": self.failed,
+        }
+
+
+def load_catalog_actions() -> List[Dict[str, Any]]:
+    """Every action in database.py and db/dbdata.py, from their shared registries."""
+    from database import get_action_registry
+
+    # db/ is a folder of scripts rather than a package
+    db_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "db")
+    if db_dir not in sys.path:
+        sys.path.insert(0, db_dir)
+    import dbdata
+
+    return list(get_action_registry()) + list(dbdata.get_action_registry())
+
+
+# Shared validator, compiled from both catalogs when first imported
+form_validator = FormValidator(load_catalog_actions())
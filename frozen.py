@@ -0,0 +1,45 @@
+from typing import Any
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict for data shared between requests. It is still a dict, so
+    json.dumps, pydantic and FastAPI serialize it as usual, but any attempt to
+    mutate it raises TypeError. Payloads from payload_cache.PayloadCache carry
+    their compact JSON serialization in `json_body`.
+    """
+    __slots__ = ("json_body",)
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Frozen payloads are read-only; use thaw() to get a mutable copy")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts to FrozenDict and lists to tuples."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Recursively convert a frozen payload back into plain, mutable dicts and lists."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
@@ -0,0 +1,184 @@
+import json
+import hashlib
+from typing import Any, Dict, List, Optional, Set
+
+# Metadata field holding the hash of a record's document text and metadata
+HASH_FIELD = "content_hash"
+
+# Metadata field naming the catalog a record came from (actions, dbdata, workflow,
+# csv). ingestion_pipeline only deletes stale records of the sources it wrote, so
+# records other tools put in the same collection or index are left alone.
+SOURCE_FIELD = "source"
+
+
+def embedding_model(embeddings) -> str:
+    """
+    Identifier of an embedding model, e.g. "ollama:nomic-embed-text" for the shared
+    cached embeddings. Accepts a BatchEmbedder too.
+    """
+    embeddings = getattr(embeddings, "embeddings", embeddings)
+    return getattr(embeddings, "model_name", None) or getattr(embeddings, "model", None) or type(embeddings).__name__
+
+
+def content_hash(document: str, metadata: Optional[Dict[str, Any]], model: Optional[str] = None) -> str:
+    """
+    Stable hash of a record's text and metadata (excluding the hash field itself)
+    and the embedding model, so switching models re-embeds unchanged records.
+    """
+    metadata = {key: value for key, value in (metadata or {}).items() if key != HASH_FIELD}
+    payload = json.dumps({"document": document, "metadata": metadata, "model": model}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SyncReport:
+    """Outcome of one incremental sync."""
+
+    def __init__(self, target: str):
+        self.target = target
+        self.added: List[str] = []
+        self.updated: List[str] = []
+        self.deleted: List[str] = []
+        self.unchanged = 0
+
+    @property
+    def embedding_calls_avoided(self) -> int:
+        # Every unchanged record would have been re-embedded by a full rebuild
+        return self.unchanged
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.deleted)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "target": self.target,
+            "added": len(self.added),
+            "updated": len(self.updated),
+            "deleted": len(self.deleted),
+            "unchanged": self.unchanged,
+            "embedding_calls_avoided": self.embedding_calls_avoided,
+        }
+
+    def print_summary(self):
+        print(
+            f"Sync of '{self.target}': {len(self.added)} added, {len(self.updated)} updated, "
+            f"{len(self.deleted)} deleted, {self.unchanged} unchanged; "
+            f"{self.embedding_calls_avoided} embedding calls avoided"
+        )
+
+
+def record_sources(metadatas) -> Set[str]:
+    """The SOURCE_FIELD values among `metadatas`: the sources a caller owns."""
+    return {metadata[SOURCE_FIELD] for metadata in metadatas if metadata and metadata.get(SOURCE_FIELD)}
+
+
+class SyncPlan:
+    """
+    Diff between the desired records and the hashes a backend already stores.
+    `upserts` holds the positions (in the desired lists) of new or changed records.
+
+    Only records of the caller's own sources (the SOURCE_FIELD values of the
+    desired records) are deleted when missing from the desired set; other tools'
+    records in the same collection or index, and untagged ones, are left alone.
+    """
+
+    def __init__(self, ids, documents, metadatas, existing_hashes: Dict[str, Optional[str]], target: str,
+                 existing_sources: Optional[Dict[str, Optional[str]]] = None, model: Optional[str] = None):
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = []
+        self.upserts: List[int] = []
+        self.report = SyncReport(target)
+
+        metadatas = list(metadatas)
+        for position, (record_id, document, metadata) in enumerate(zip(self.ids, self.documents, metadatas)):
+            digest = content_hash(document, metadata, model)
+            self.metadatas.append({**(metadata or {}), HASH_FIELD: digest})
+            if record_id not in existing_hashes:
+                self.report.added.append(record_id)
+                self.upserts.append(position)
+            elif existing_hashes[record_id] != digest:
+                self.report.updated.append(record_id)
+                self.upserts.append(position)
+            else:
+                self.report.unchanged += 1
+
+        wanted = set(self.ids)
+        owned = record_sources(metadatas)
+        existing_sources = existing_sources or {}
+        self.report.deleted = [
+            record_id for record_id in existing_hashes
+            if record_id not in wanted and existing_sources.get(record_id) in owned
+        ]
+
+    def upsert_ids(self) -> List[str]:
+        return [self.ids[i] for i in self.upserts]
+
+    def upsert_documents(self) -> List[str]:
+        return [self.documents[i] for i in self.upserts]
+
+    def upsert_metadatas(self) -> List[Dict[str, Any]]:
+        return [self.metadatas[i] for i in self.upserts]
+
+
+def sync_chroma_collection(collection, ids, documents, metadatas, embedder) -> SyncReport:
+    """
+    Bring a Chroma collection in line with the given records: embed and upsert only
+    new or changed records, and delete records of the same sources that are no
+    longer present.
+
+    Args:
+        collection: A chromadb Collection.
+        ids, documents, metadatas: The desired records.
+        embedder (BatchEmbedder): Used to embed the records that changed.
+
+    Returns:
+        SyncReport: What was added, updated, deleted and left unchanged.
+    """
+    existing = collection.get(include=["metadatas"])
+    existing_metadatas = list(zip(existing["ids"], existing.get("metadatas") or [None] * len(existing["ids"])))
+    existing_hashes = {record_id: (metadata or {}).get(HASH_FIELD) for record_id, metadata in existing_metadatas}
+    existing_sources = {record_id: (metadata or {}).get(SOURCE_FIELD) for record_id, metadata in existing_metadatas}
+    plan = SyncPlan(ids, documents, metadatas, existing_hashes, collection.name, existing_sources,
+                    embedding_model(embedder))
+
+    if plan.upserts:
+        collection.upsert(
+            ids=plan.upsert_ids(),
+            embeddings=embedder.embed(plan.upsert_documents()),
+            documents=plan.upsert_documents(),
+            metadatas=plan.upsert_metadatas()
+        )
+    if plan.report.deleted:
+        collection.delete(ids=plan.report.deleted)
+    return plan.report
+
+
+def sync_elasticsearch_index(vector_store, ids, documents, metadatas, embedder) -> SyncReport:
+    """
+    Bring an ElasticsearchStore index in line with the given records, using the
+    record ids as document `_id`s. Same semantics as `sync_chroma_collection`.
+    """
+    from elasticsearch.helpers import scan
+
+    client, index_name = vector_store.client, vector_store.index_name
+    existing_hashes, existing_sources = {}, {}
+    if client.indices.exists(index=index_name):
+        fields = [f"metadata.{HASH_FIELD}", f"metadata.{SOURCE_FIELD}"]
+        for hit in scan(client, index=index_name, query={"query": {"match_all": {}}}, _source=fields):
+            metadata = hit.get("_source", {}).get("metadata", {})
+            existing_hashes[hit["_id"]] = metadata.get(HASH_FIELD)
+            existing_sources[hit["_id"]] = metadata.get(SOURCE_FIELD)
+    plan = SyncPlan(ids, documents, metadatas, existing_hashes, index_name, existing_sources,
+                    embedding_model(embedder))
+
+    if plan.upserts:
+        vectors = embedder.embed(plan.upsert_documents())
+        vector_store.add_embeddings(
+            text_embeddings=list(zip(plan.upsert_documents(), vectors)),
+            metadatas=plan.upsert_metadatas(),
+            ids=plan.upsert_ids()
+        )
+    if plan.report.deleted:
+        vector_store.delete(ids=plan.report.deleted)
+    return plan.report
@@ -0,0 +1,454 @@
+import os
+import re
+import time
+import argparse
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from incremental_sync import HASH_FIELD, SOURCE_FIELD, content_hash, embedding_model, record_sources
+
+# Load environment variables
+load_dotenv()
+
+# --- Configuration ---
+# Names the serving code reads; each points at a versioned index/collection
+ES_ACTIONS_ALIAS = os.getenv("ES_ACTIONS_INDEX_ALIAS", "loan_actions_index")
+# Index searched before the alias existed; read until the first alias is created
+ES_LEGACY_ACTIONS_INDEX = os.getenv("ES_LEGACY_ACTIONS_INDEX", "loan_actions_index_v5")
+CHROMA_ALIAS_COLLECTION = os.getenv("CHROMA_ALIAS_COLLECTION", "collection_aliases")
+# How often serving processes re-read a Chroma pointer
+CHROMA_ALIAS_REFRESH_SECONDS = float(os.getenv("CHROMA_ALIAS_REFRESH_SECONDS", "30"))
+# Versions kept per alias: the live one plus the previous one for rollback
+INDEX_VERSIONS_TO_KEEP = int(os.getenv("INDEX_VERSIONS_TO_KEEP", "2"))
+
+
+class IndexValidationError(Exception):
+    """Raised when a freshly built index fails its count or smoke-query check."""
+
+
+def new_version_name(alias: str) -> str:
+    """Versioned index/collection name for `alias`, ordered by build time."""
+    return f"{alias}_v{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+
+
+def _is_version(name: str, alias: str) -> bool:
+    """Whether `name` was made by new_version_name(alias); hand-named indices like *_v5 are not."""
+    return re.fullmatch(re.escape(alias) + r"_v\d{20}", name) is not None
+
+
+def _validate(name: str, count: int, expected_count: int, smoke_results: List[Optional[str]], expected_action_id: Optional[str]):
+    if count != expected_count:
+        raise IndexValidationError(f"'{name}' has {count} documents, expected {expected_count}")
+    if not smoke_results:
+        raise IndexValidationError(f"Smoke query on '{name}' returned no results")
+    if expected_action_id and smoke_results[0] != expected_action_id:
+        raise IndexValidationError(
+            f"Smoke query on '{name}' returned '{smoke_results[0]}', expected '{expected_action_id}'"
+        )
+
+
+# --- Elasticsearch: versioned indices behind an alias ---
+
+def es_versions(client, alias: str) -> List[str]:
+    """Versioned indices of `alias`, oldest first."""
+    return sorted(name for name in client.indices.get(index=f"{alias}_v*", expand_wildcards="open")
+                  if _is_version(name, alias))
+
+
+def es_alias_target(client, alias: str) -> Optional[str]:
+    """The index `alias` currently points at, or None."""
+    if not client.indices.exists_alias(name=alias):
+        return None
+    targets = sorted(client.indices.get_alias(name=alias).keys())
+    return targets[-1] if targets else None
+
+
+def es_read_index(client, alias: str = ES_ACTIONS_ALIAS, legacy: str = ES_LEGACY_ACTIONS_INDEX) -> str:
+    """
+    The index name readers should search: `alias` once it exists, otherwise the
+    legacy index it replaces (if that exists), so search keeps working until the
+    first blue/green build or `index_aliases.py adopt` creates the alias.
+    """
+    if es_alias_target(client, alias) is not None or not legacy or not client.indices.exists(index=legacy):
+        return alias
+    print(f"Alias '{alias}' does not exist yet, reading legacy index '{legacy}'")
+    return legacy
+
+
+def es_swap_alias(client, alias: str, index_name: str):
+    """Atomically point `alias` at `index_name`, detaching it from every other index."""
+    actions = [{"remove": {"index": target, "alias": alias}} for target in
+               (client.indices.get_alias(name=alias).keys() if client.indices.exists_alias(name=alias) else [])
+               if target != index_name]
+    actions.append({"add": {"index": index_name, "alias": alias, "is_write_index": True}})
+    client.indices.update_aliases(actions=actions)
+    print(f"Alias '{alias}' now points at '{index_name}'")
+
+
+def es_rollback(client, alias: str) -> str:
+    """Point `alias` back at the version built before the live one."""
+    current = es_alias_target(client, alias)
+    older = [name for name in es_versions(client, alias) if current is None or name < current]
+    if not older:
+        raise ValueError(f"No previous version of '{alias}' to roll back to")
+    es_swap_alias(client, alias, older[-1])
+    return older[-1]
+
+
+def es_prune(client, alias: str, keep: int = INDEX_VERSIONS_TO_KEEP):
+    """Delete all but the newest `keep` versions, never the live one."""
+    current = es_alias_target(client, alias)
+    for name in es_versions(client, alias)[:-keep or None]:
+        if name != current:
+            client.indices.delete(index=name)
+            print(f"Deleted old index version '{name}'")
+
+
+def _es_carry_over(client, alias: str, index_name: str, ids, sources) -> int:
+    """
+    Copy the live index's records of other sources into `index_name`, so a rebuild of
+    some sources doesn't drop the records other tools wrote behind the same alias.
+
+    Returns:
+        int: The number of records copied.
+    """
+    if not client.indices.exists_alias(name=alias) and not client.indices.exists(index=alias):
+        return 0
+    query = {"bool": {"must_not": [
+        {"terms": {f"metadata.{SOURCE_FIELD}.keyword": sorted(sources)}},
+        {"ids": {"values": list(ids)}},
+    ]}}
+    result = client.reindex(source={"index": alias, "query": query}, dest={"index": index_name},
+                            refresh=True, wait_for_completion=True)
+    if result.get("failures"):
+        raise IndexValidationError(f"Copying other sources' records into '{index_name}' failed: {result['failures'][:3]}")
+    carried = result.get("created", 0) + result.get("updated", 0)
+    if carried:
+        print(f"Carried over {carried} records of other sources from '{alias}'")
+    return carried
+
+
+def es_blue_green_reindex(client, alias: str, ids, documents, metadatas, embeddings, embedder,
+                          smoke_query: str, expected_action_id: Optional[str] = None,
+                          keep: int = INDEX_VERSIONS_TO_KEEP) -> str:
+    """
+    Build a new versioned index next to the live one, validate it, then switch the
+    alias to it. Searches keep hitting the previous version until the switch, and the
+    previous version is kept for rollback. Records of other sources (SOURCE_FIELD
+    values not among `metadatas`) are copied over from the live index unchanged.
+
+    Args:
+        client (Elasticsearch): The Elasticsearch client.
+        alias (str): The alias the serving code reads.
+        ids, documents, metadatas: The records to index.
+        embeddings (Embeddings): Model the ElasticsearchStore embeds queries with.
+        embedder (BatchEmbedder): Used to embed the documents.
+        smoke_query (str): Query that must return a result from the new index.
+        expected_action_id (str, optional): action_id the smoke query must rank first.
+        keep (int): Versions to keep after the switch.
+
+    Returns:
+        str: The name of the new live index.
+    """
+    from langchain_community.vectorstores import ElasticsearchStore
+
+    index_name = new_version_name(alias)
+    metadatas = [{**(metadata or {}), HASH_FIELD: content_hash(document, metadata, embedding_model(embedder))}
+                 for document, metadata in zip(documents, metadatas)]
+    store = ElasticsearchStore(es_connection=client, index_name=index_name, embedding=embeddings)
+    try:
+        print(f"Building index '{index_name}' with {len(documents)} documents...")
+        store.add_embeddings(
+            text_embeddings=list(zip(documents, embedder.embed(documents))),
+            metadatas=metadatas,
+            ids=list(ids)
+        )
+        carried = _es_carry_over(client, alias, index_name, ids, record_sources(metadatas))
+        client.indices.refresh(index=index_name)
+        count = client.count(index=index_name)["count"]
+        smoke = [doc.metadata.get("action_id") for doc in store.similarity_search(smoke_query, k=1)]
+        _validate(index_name, count, len(documents) + carried, smoke, expected_action_id)
+    except Exception:
+        client.indices.delete(index=index_name, ignore_unavailable=True)
+        raise
+
+    es_swap_alias(client, alias, index_name)
+    es_prune(client, alias, keep)
+    return index_name
+
+
+# --- Chroma: versioned collections behind a pointer ---
+# Chroma has no aliases, so the live version of each alias is recorded in the
+# metadata of a small pointer collection: {alias: target, "<alias>.previous": target}.
+
+def _pointer_collection(client, create: bool = False):
+    """The pointer collection, or None if it doesn't exist and `create` is False."""
+    if create:
+        return client.get_or_create_collection(CHROMA_ALIAS_COLLECTION)
+    from chromadb.errors import NotFoundError
+    try:
+        return client.get_collection(CHROMA_ALIAS_COLLECTION)
+    except (NotFoundError, ValueError):
+        return None
+
+
+def chroma_pointers(client) -> Dict[str, str]:
+    """Every alias pointer; empty until the first chroma_swap creates the pointer collection."""
+    collection = _pointer_collection(client)
+    return dict(collection.metadata or {}) if collection is not None else {}
+
+
+def chroma_resolve(client, alias: str) -> str:
+    """The collection `alias` points at; the alias itself if no pointer is set."""
+    return chroma_pointers(client).get(alias, alias)
+
+
+def chroma_versions(client, alias: str) -> List[str]:
+    """Versioned collections of `alias`, oldest first."""
+    names = [getattr(collection, "name", collection) for collection in client.list_collections()]
+    return sorted(name for name in names if _is_version(name, alias))
+
+
+def chroma_swap(client, alias: str, target: str):
+    """Point `alias` at `target`, remembering the previous target for rollback."""
+    pointers = chroma_pointers(client)
+    previous = pointers.get(alias)
+    if previous and previous != target:
+        pointers[f"{alias}.previous"] = previous
+    pointers[alias] = target
+    # modify() replaces the metadata as a whole, so all pointers are written in one call
+    _pointer_collection(client, create=True).modify(metadata=pointers)
+    print(f"Chroma alias '{alias}' now points at '{target}'")
+
+
+def chroma_rollback(client, alias: str) -> str:
+    """Point `alias` back at its previous target."""
+    previous = chroma_pointers(client).get(f"{alias}.previous")
+    if not previous:
+        raise ValueError(f"No previous version of '{alias}' to roll back to")
+    chroma_swap(client, alias, previous)
+    return previous
+
+
+def chroma_prune(client, alias: str, keep: int = INDEX_VERSIONS_TO_KEEP):
+    """Delete all but the newest `keep` versions, never the live or previous one."""
+    pointers = chroma_pointers(client)
+    protected = {pointers.get(alias), pointers.get(f"{alias}.previous")}
+    for name in chroma_versions(client, alias)[:-keep or None]:
+        if name not in protected:
+            client.delete_collection(name)
+            print(f"Deleted old collection version '{name}'")
+
+
+def _chroma_carry_over(client, alias: str, collection, ids, sources, batch_size: int = 500) -> int:
+    """
+    Copy the live collection's records of other sources into `collection`, embeddings
+    included. Same rule as `_es_carry_over`.
+
+    Returns:
+        int: The number of records copied.
+    """
+    from chromadb.errors import NotFoundError
+
+    target = chroma_resolve(client, alias)
+    try:
+        live = client.get_collection(target)
+    except (NotFoundError, ValueError):
+        return 0
+    existing = live.get(include=["embeddings", "documents", "metadatas"])
+    wanted = set(ids)
+    keep = [
+        position for position, (record_id, metadata) in enumerate(zip(existing["ids"], existing["metadatas"]))
+        if record_id not in wanted and (metadata or {}).get(SOURCE_FIELD) not in sources
+    ]
+    for start in range(0, len(keep), batch_size):
+        chunk = keep[start:start + batch_size]
+        collection.add(
+            ids=[existing["ids"][position] for position in chunk],
+            embeddings=[existing["embeddings"][position] for position in chunk],
+            documents=[existing["documents"][position] for position in chunk],
+            metadatas=[existing["metadatas"][position] for position in chunk]
+        )
+    if keep:
+        print(f"Carried over {len(keep)} records of other sources from '{target}'")
+    return len(keep)
+
+
+def chroma_blue_green_upload(client, alias: str, ids, documents, metadatas, embedder,
+                             smoke_query: str, expected_action_id: Optional[str] = None,
+                             keep: int = INDEX_VERSIONS_TO_KEEP) -> str:
+    """
+    Build a new versioned collection, validate its count and a smoke query, then
+    switch the alias pointer to it. Same contract as `es_blue_green_reindex`,
+    including the carry-over of other sources' records.
+
+    Returns:
+        str: The name of the new live collection.
+    """
+    ids, documents, metadatas = list(ids), list(documents), list(metadatas)
+    name = new_version_name(alias)
+    collection = client.create_collection(name=name, metadata={"hnsw:space": "cosine"})
+    try:
+        print(f"Building collection '{name}' with {len(documents)} documents...")
+        collection.add(
+            ids=list(ids),
+            embeddings=embedder.embed(documents),
+            documents=list(documents),
+            metadatas=[{**(metadata or {}), HASH_FIELD: content_hash(document, metadata, embedding_model(embedder))}
+                       for document, metadata in zip(documents, metadatas)]
+        )
+        carried = _chroma_carry_over(client, alias, collection, ids, record_sources(metadatas))
+        results = collection.query(query_embeddings=embedder.embed([smoke_query]), n_results=1)
+        smoke = [metadata.get("action_id") for metadata in (results.get("metadatas") or [[]])[0]]
+        _validate(name, collection.count(), len(documents) + carried, smoke, expected_action_id)
+    except Exception:
+        client.delete_collection(name)
+        raise
+
+    chroma_swap(client, alias, name)
+    chroma_prune(client, alias, keep)
+    return name
+
+
+class AliasedChroma:
+    """
+    Serving-side Chroma vector store that follows an alias pointer. The pointer is
+    re-read at most every `refresh_interval` seconds; when it changes, searches move
+    to the new collection and the `on_switch` callbacks run.
+    """
+
+    def __init__(self, client, alias: str, embeddings, refresh_interval: float = CHROMA_ALIAS_REFRESH_SECONDS):
+        """
+        Args:
+            client: The chromadb client.
+            alias (str): Alias (or plain collection name) to serve.
+            embeddings (Embeddings): Model used to embed queries.
+            refresh_interval (float): Seconds between pointer checks.
+        """
+        self.client = client
+        self.alias = alias
+        self.embeddings = embeddings
+        self.refresh_interval = refresh_interval
+        self.target = None
+        self._store = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._on_switch: List[Callable[[str], None]] = []
+
+    def on_switch(self, callback: Callable[[str], None]):
+        self._on_switch.append(callback)
+
+    def _current(self):
+        with self._lock:
+            now = time.monotonic()
+            due = self._store is None or now - self._checked_at >= self.refresh_interval
+            if due:
+                # Claim this refresh so concurrent searches keep using the current store
+                self._checked_at = now
+            store, current_target = self._store, self.target
+        if not due:
+            return store
+
+        # Chroma round-trips happen outside the lock
+        try:
+            target = chroma_resolve(self.client, self.alias)
+        except Exception as e:
+            print(f"Error resolving Chroma alias '{self.alias}': {e}")
+            target = current_target or self.alias
+        if target == current_target:
+            return store
+
+        from langchain_chroma import Chroma
+        new_store = Chroma(client=self.client, collection_name=target, embedding_function=self.embeddings)
+        switched = None
+        with self._lock:
+            if target != self.target:
+                if self.target is not None:
+                    switched = target
+                    print(f"Chroma alias '{self.alias}' switched from '{self.target}' to '{target}'")
+                self._store, self.target = new_store, target
+            store = self._store
+
+        # Callbacks may search through this store again, so run them outside the lock
+        if switched:
+            for callback in self._on_switch:
+                try:
+                    callback(switched)
+                except Exception as e:
+                    print(f"Error in alias switch callback: {e}")
+        return store
+
+    def similarity_search(self, query: str, k: int = 4, filter=None, **kwargs):
+        return self._current().similarity_search(query, k=k, filter=filter, **kwargs)
+
+    def similarity_search_by_vector(self, embedding, k: int = 4, filter=None, **kwargs):
+        return self._current().similarity_search_by_vector(embedding, k=k, filter=filter, **kwargs)
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter=None, **kwargs):
+        return self._current().similarity_search_with_score(query, k=k, filter=filter, **kwargs)
+
+    def get(self, *args, **kwargs):
+        return self._current().get(*args, **kwargs)
+
+
+_aliased_stores: Dict[str, AliasedChroma] = {}
+_aliased_stores_lock = threading.Lock()
+
+
+def aliased_chroma(client, alias: str, embeddings) -> AliasedChroma:
+    """
+    Returns the shared AliasedChroma for `alias`. When the alias moves to a new
+    collection, cached RAG answers for it are dropped and the action catalog is
+    reloaded from the new collection.
+    """
+    with _aliased_stores_lock:
+        store = _aliased_stores.get(alias)
+        if store is None:
+            from action_catalog import action_catalog
+            from semantic_cache import semantic_cache
+
+            store = AliasedChroma(client, alias, embeddings)
+            store.on_switch(lambda target: semantic_cache.invalidate(alias))
+            store.on_switch(lambda target: action_catalog.load_from_vector_store(store))
+            _aliased_stores[alias] = store
+        return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or roll back blue/green index aliases.")
+    parser.add_argument("command", choices=["status", "rollback", "adopt"],
+                        help="adopt: point a missing Elasticsearch alias at an existing index (--index)")
+    parser.add_argument("--backend", choices=["chroma", "elasticsearch"], default="chroma")
+    parser.add_argument("--index", type=str, default=ES_LEGACY_ACTIONS_INDEX,
+                        help="Existing index the alias adopts (Elasticsearch only)")
+    parser.add_argument("--alias", type=str, default=None,
+                        help=f"Alias to act on (default: onboarding_flow for Chroma, {ES_ACTIONS_ALIAS} for Elasticsearch)")
+    args = parser.parse_args()
+
+    from clients import clients
+    if args.backend == "chroma":
+        client, alias = clients.chroma(), args.alias or "onboarding_flow"
+        if args.command == "adopt":
+            parser.error("adopt is only needed for Elasticsearch; a Chroma alias without a pointer reads the collection of the same name")
+        if args.command == "rollback":
+            chroma_rollback(client, alias)
+        pointers = chroma_pointers(client)
+        print(f"'{alias}' -> {pointers.get(alias, alias)} (previous: {pointers.get(alias + '.previous')})")
+        print(f"Versions: {chroma_versions(client, alias)}")
+    else:
+        client, alias = clients.elasticsearch(), args.alias or ES_ACTIONS_ALIAS
+        if args.command == "rollback":
+            es_rollback(client, alias)
+        elif args.command == "adopt":
+            if es_alias_target(client, alias) is not None:
+                parser.error(f"Alias '{alias}' already exists")
+            es_swap_alias(client, alias, args.index)
+        print(f"'{alias}' -> {es_alias_target(client, alias)}")
+        print(f"Versions: {es_versions(client, alias)}")
+
+
+if __name__ == "__main__":
+    main()
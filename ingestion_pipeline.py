@@ -0,0 +1,495 @@
+"""
+One ingestion pipeline for every catalog source and vector backend.
+
+Stages are generators, so only one batch of records is in memory at a time:
+
+    sources  ->  document builders  ->  batches  ->  BatchEmbedder  ->  writers
+
+Each batch is embedded once and handed to every selected writer, so writing to
+Chroma, Elasticsearch, Weaviate and FAISS costs a single embedding pass.
+
+Run from the repository root:
+    python ingestion_pipeline.py --sources actions,dbdata --targets chroma,elasticsearch
+    python ingestion_pipeline.py --sources csv --csv fields.csv --targets faiss --faiss-path faiss_index
+"""
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+
+from batch_embedding import BatchEmbedder, EMBEDDING_BATCH_SIZE
+from incremental_sync import HASH_FIELD, SOURCE_FIELD, content_hash, embedding_model
+from index_aliases import (
+    ES_ACTIONS_ALIAS,
+    IndexValidationError,
+    chroma_prune,
+    chroma_resolve,
+    chroma_swap,
+    es_alias_target,
+    es_prune,
+    es_swap_alias,
+    new_version_name,
+)
+
+# Load environment variables
+load_dotenv()
+
+# --- Configuration ---
+CSV_CHUNK_ROWS = int(os.getenv("INGESTION_CSV_CHUNK_ROWS", "10000"))
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+# --- Sources: each yields raw records ---
+
+def read_mock_actions() -> Iterator[Dict[str, Any]]:
+    """Actions from database.get_mock_vector_db, via its shared registry."""
+    from database import get_action_registry
+    yield from get_action_registry()
+
+
+def read_dbdata_actions() -> Iterator[Dict[str, Any]]:
+    """Actions from db/dbdata.getObjects."""
+    # db/ is a folder of scripts rather than a package
+    db_dir = os.path.join(REPO_ROOT, "db")
+    if db_dir not in sys.path:
+        sys.path.insert(0, db_dir)
+    from dbdata import get_action_registry
+    yield from get_action_registry()
+
+
+# --- Document builders: raw records -> Documents with a stable id ---
+
+def action_document(action: Dict[str, Any], source: str) -> Document:
+    """
+    Document for one action. populate_vector_db builds its documents here too, so
+    both populators produce identical text, metadata and content hashes.
+
+    Args:
+        action (dict): The action definition.
+        source (str): Catalog the action came from, stored under SOURCE_FIELD.
+    """
+    text_content = f"""
+        # Action ID: {action['action_id']}
+        # Stage: {action['stage_name']}
+        Description: {action['description_for_llm']}
+        # Action Type: {action['action_type']}
+        """
+    return Document(
+        id=action["action_id"],
+        page_content=text_content,
+        metadata={
+            "action_id": action["action_id"],
+            "action_type": action["action_type"],
+            "full_action": json.dumps(action),
+            SOURCE_FIELD: source
+        }
+    )
+
+
+def action_documents(actions: Iterable[Dict[str, Any]], source: str) -> Iterator[Document]:
+    for action in actions:
+        yield action_document(action, source)
+
+
+def csv_documents(path: str, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[Document]:
+    """Rows of a field-catalog CSV, streamed in chunks by data/data_loader.DataLoader."""
+    from data.data_loader import DataLoader
+    for position, document in enumerate(DataLoader(path=path, memory_map=True, chunk_rows=chunk_rows).iter_documents()):
+        document.id = f"csv_row_{position}"
+        document.metadata[SOURCE_FIELD] = "csv"
+        yield document
+
+
+def workflow_documents() -> Iterator[Document]:
+    """Workflow steps, action mappings and the overview from upload_workflow_to_chroma."""
+    from upload_workflow_to_chroma import action_to_step, build_workflow_records, onboarding_flow, workflow_steps
+    ids, documents, metadatas = build_workflow_records(workflow_steps, action_to_step, onboarding_flow)
+    for record_id, text, metadata in zip(ids, documents, metadatas):
+        yield Document(id=record_id, page_content=text, metadata=metadata)
+
+
+def build_source(name: str, csv_path: Optional[str] = None) -> Iterator[Document]:
+    """Documents for a named source: actions, dbdata, workflow or csv."""
+    if name == "actions":
+        return action_documents(read_mock_actions(), "actions")
+    if name == "dbdata":
+        return action_documents(read_dbdata_actions(), "dbdata")
+    if name == "workflow":
+        return workflow_documents()
+    if name == "csv":
+        if not csv_path:
+            raise ValueError("The csv source needs a CSV path")
+        return csv_documents(csv_path)
+    raise ValueError(f"Unknown source '{name}'")
+
+
+# --- Batching and embedding ---
+
+def batched(documents: Iterable[Document], size: int) -> Iterator[List[Document]]:
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def embedded_batches(batches: Iterable[List[Document]], embedder: BatchEmbedder) -> Iterator["EmbeddedBatch"]:
+    for batch in batches:
+        yield EmbeddedBatch(batch, embedder.embed([document.page_content for document in batch]), embedding_model(embedder))
+
+
+class EmbeddedBatch:
+    """A batch of documents with their vectors, in the shape the writers take."""
+
+    __slots__ = ("ids", "documents", "metadatas", "vectors")
+
+    def __init__(self, documents: List[Document], vectors: List[List[float]], model: Optional[str] = None):
+        self.ids = [document.id for document in documents]
+        self.documents = [document.page_content for document in documents]
+        # The content hash lets incremental_sync skip these records on its next run
+        self.metadatas = [
+            {**document.metadata, HASH_FIELD: content_hash(document.page_content, document.metadata, model)}
+            for document in documents
+        ]
+        self.vectors = vectors
+
+    def sources(self) -> set:
+        """The SOURCE_FIELD values in this batch."""
+        return {metadata[SOURCE_FIELD] for metadata in self.metadatas if metadata.get(SOURCE_FIELD)}
+
+
+# --- Writers: open(), write(batch) per embedded batch, close() -> stats ---
+
+class _Writer:
+    name = "writer"
+
+    def __init__(self):
+        self.written = 0
+        self.seconds = 0.0
+
+    def open(self):
+        pass
+
+    def write(self, batch: EmbeddedBatch):
+        started = time.perf_counter()
+        self._write(batch)
+        self.seconds += time.perf_counter() - started
+        self.written += len(batch.ids)
+
+    def _write(self, batch: EmbeddedBatch):
+        raise NotImplementedError
+
+    def close(self) -> Dict[str, Any]:
+        return self.stats()
+
+    def abort(self):
+        """Called instead of close() when the run fails. Must be safe to call more than once."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"written": self.written, "seconds": round(self.seconds, 3)}
+
+
+class ChromaWriter(_Writer):
+    """
+    Writes to the collection a Chroma alias points at, then deletes records of the
+    run's sources that it didn't produce; records without one of those sources
+    (e.g. another tool's) are never deleted. With blue_green, writes to a new
+    collection version and switches the alias to it once every record is in, so
+    the new version holds only this run's records.
+    """
+    name = "chroma"
+
+    def __init__(self, client, alias: str = "onboarding_flow", blue_green: bool = False):
+        super().__init__()
+        self.client = client
+        self.alias = alias
+        self.blue_green = blue_green
+        self.collection = None
+        self.seen_ids = set()
+        self.sources = set()
+
+    def open(self):
+        name = new_version_name(self.alias) if self.blue_green else chroma_resolve(self.client, self.alias)
+        self.collection = self.client.get_or_create_collection(name=name, metadata={"hnsw:space": "cosine"})
+
+    def _write(self, batch):
+        self.collection.upsert(ids=batch.ids, embeddings=batch.vectors, documents=batch.documents, metadatas=batch.metadatas)
+        self.seen_ids.update(batch.ids)
+        self.sources.update(batch.sources())
+
+    def close(self):
+        if self.blue_green:
+            count = self.collection.count()
+            if count != len(self.seen_ids):
+                self.abort()
+                raise IndexValidationError(f"'{self.collection.name}' has {count} documents, expected {len(self.seen_ids)}")
+            chroma_swap(self.client, self.alias, self.collection.name)
+            chroma_prune(self.client, self.alias)
+            return self.stats()
+
+        stale = []
+        if self.sources:
+            owned = self.collection.get(where={SOURCE_FIELD: {"$in": sorted(self.sources)}}, include=[])["ids"]
+            stale = [record_id for record_id in owned if record_id not in self.seen_ids]
+        if stale:
+            self.collection.delete(ids=stale)
+        return {**self.stats(), "deleted": len(stale)}
+
+    def abort(self):
+        if self.blue_green and self.collection is not None:
+            name, self.collection = self.collection.name, None
+            self.client.delete_collection(name)
+
+
+class ElasticsearchWriter(_Writer):
+    """
+    Writes through an Elasticsearch alias, then deletes records of the run's sources
+    that it didn't produce, like ChromaWriter.
+    With blue_green (or when the alias doesn't exist yet), writes to a new index
+    version and swaps the alias to it once every record is in.
+    """
+    name = "elasticsearch"
+
+    def __init__(self, client, embeddings, alias: str = ES_ACTIONS_ALIAS, blue_green: bool = False):
+        super().__init__()
+        self.client = client
+        self.embeddings = embeddings
+        self.alias = alias
+        self.blue_green = blue_green
+        self.index_name = None
+        self.store = None
+        self.seen_ids = set()
+        self.sources = set()
+
+    def open(self):
+        from langchain_community.vectorstores import ElasticsearchStore
+        if es_alias_target(self.client, self.alias) is None:
+            self.blue_green = True
+        self.index_name = new_version_name(self.alias) if self.blue_green else self.alias
+        self.store = ElasticsearchStore(es_connection=self.client, index_name=self.index_name, embedding=self.embeddings)
+
+    def _write(self, batch):
+        self.store.add_embeddings(
+            text_embeddings=list(zip(batch.documents, batch.vectors)),
+            metadatas=batch.metadatas,
+            ids=batch.ids,
+            refresh_indices=False
+        )
+        self.seen_ids.update(batch.ids)
+        self.sources.update(batch.sources())
+
+    def close(self):
+        self.client.indices.refresh(index=self.index_name)
+        if self.blue_green:
+            count = self.client.count(index=self.index_name)["count"]
+            if count != len(self.seen_ids):
+                self.abort()
+                raise IndexValidationError(f"'{self.index_name}' has {count} documents, expected {len(self.seen_ids)}")
+            es_swap_alias(self.client, self.alias, self.index_name)
+            es_prune(self.client, self.alias)
+            return self.stats()
+
+        from elasticsearch.helpers import scan
+        stale = []
+        if self.sources:
+            owned = {"query": {"terms": {f"metadata.{SOURCE_FIELD}.keyword": sorted(self.sources)}}}
+            stale = [hit["_id"] for hit in scan(self.client, index=self.index_name, query=owned, _source=False)
+                     if hit["_id"] not in self.seen_ids]
+        if stale:
+            self.store.delete(ids=stale)
+        return {**self.stats(), "deleted": len(stale)}
+
+    def abort(self):
+        if self.blue_green and self.index_name:
+            index_name, self.index_name = self.index_name, None
+            self.client.indices.delete(index=index_name, ignore_unavailable=True)
+
+
+class WeaviateWriter(_Writer):
+    """
+    Writes to a Weaviate collection through the batch API with our own vectors.
+    Object UUIDs are derived from the record ids, so re-runs update in place.
+    """
+    name = "weaviate"
+
+    def __init__(self, client, collection_name: str = "ActionStep", batch_size: int = EMBEDDING_BATCH_SIZE):
+        super().__init__()
+        self.client = client
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.collection = None
+        self.failed = 0
+
+    def open(self):
+        from weaviate.classes.config import Configure
+        if not self.client.collections.exists(self.collection_name):
+            self.client.collections.create(self.collection_name, vectorizer_config=Configure.Vectorizer.none())
+        self.collection = self.client.collections.get(self.collection_name)
+
+    def _write(self, batch):
+        from weaviate.util import generate_uuid5
+        with self.collection.batch.fixed_size(batch_size=self.batch_size) as weaviate_batch:
+            for record_id, document, metadata, vector in zip(batch.ids, batch.documents, batch.metadatas, batch.vectors):
+                properties = {key: value if isinstance(value, (str, int, float, bool)) or value is None else json.dumps(value)
+                              for key, value in metadata.items()}
+                properties["content"] = document
+                weaviate_batch.add_object(properties=properties, vector=vector, uuid=generate_uuid5(record_id))
+        self.failed += len(self.collection.batch.failed_objects)
+
+    def stats(self):
+        return {**super().stats(), "failed": self.failed}
+
+
+class FaissWriter(_Writer):
+    """Builds a LangChain FAISS store from the embedded batches and saves it to disk."""
+    name = "faiss"
+
+    def __init__(self, embeddings, path: str):
+        super().__init__()
+        self.embeddings = embeddings
+        self.path = path
+        self.store = None
+
+    def _write(self, batch):
+        from langchain_community.vectorstores import FAISS
+        text_embeddings = list(zip(batch.documents, batch.vectors))
+        if self.store is None:
+            self.store = FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=batch.metadatas, ids=batch.ids)
+        else:
+            self.store.add_embeddings(text_embeddings, metadatas=batch.metadatas, ids=batch.ids)
+
+    def close(self):
+        if self.store is not None:
+            self.store.save_local(self.path)
+            print(f"Saved FAISS index to '{self.path}'")
+        return self.stats()
+
+
+# --- Pipeline ---
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def run_pipeline(documents: Iterable[Document], writers: List[_Writer], embedder: BatchEmbedder,
+                 batch_size: int = EMBEDDING_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Embed `documents` batch by batch and write every batch to each writer.
+
+    Args:
+        documents (Iterable[Document]): Documents with ids, typically a generator.
+        writers (List[_Writer]): Backends to write to.
+        embedder (BatchEmbedder): Embeds each batch once for all writers.
+        batch_size (int): Documents per batch.
+
+    Returns:
+        dict: Documents processed, throughput, peak RSS and per-writer stats.
+    """
+    started = time.perf_counter()
+    opened = []
+    total = 0
+    try:
+        for writer in writers:
+            writer.open()
+            opened.append(writer)
+        for batch in embedded_batches(batched(documents, batch_size), embedder):
+            for writer in writers:
+                writer.write(batch)
+            total += len(batch.ids)
+        writer_stats = {writer.name: writer.close() for writer in writers}
+    except Exception:
+        for writer in opened:
+            try:
+                writer.abort()
+            except Exception as e:
+                # Keep the original error; a failed cleanup is only reported
+                print(f"Error aborting {writer.name} writer: {e}")
+        raise
+
+    elapsed = time.perf_counter() - started
+    return {
+        "documents": total,
+        "seconds": round(elapsed, 3),
+        "docs_per_second": round(total / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "embedding": embedder.stats(),
+        "writers": writer_stats,
+    }
+
+
+def build_writers(targets: List[str], embeddings, args) -> List[_Writer]:
+    from clients import clients
+    writers = []
+    for target in targets:
+        if target == "chroma":
+            writers.append(ChromaWriter(clients.chroma(), alias=args.chroma_alias, blue_green=args.blue_green))
+        elif target == "elasticsearch":
+            writers.append(ElasticsearchWriter(clients.elasticsearch(), embeddings, alias=args.es_alias, blue_green=args.blue_green))
+        elif target == "weaviate":
+            writers.append(WeaviateWriter(clients.weaviate(), collection_name=args.weaviate_collection, batch_size=args.batch_size))
+        elif target == "faiss":
+            writers.append(FaissWriter(embeddings, args.faiss_path))
+        else:
+            raise ValueError(f"Unknown target '{target}'")
+    return writers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed catalog sources once and write them to any set of vector backends.")
+    parser.add_argument("--sources", type=str, default="actions,dbdata",
+                        help="Comma-separated sources: actions, dbdata, workflow, csv")
+    parser.add_argument("--targets", type=str, required=True,
+                        help="Comma-separated backends: chroma, elasticsearch, weaviate, faiss")
+    parser.add_argument("--csv", type=str, default=None, help="Path of the CSV read by the csv source")
+    parser.add_argument("--embedding-model", type=str, default="text-embedding-3-small")
+    parser.add_argument("--embedding-provider", type=str, default="openai", choices=["openai", "ollama"])
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE, help="Documents per batch")
+    parser.add_argument("--blue-green", action="store_true",
+                        help="Write Chroma and Elasticsearch to a new version and swap the alias when done")
+    parser.add_argument("--chroma-alias", type=str, default="onboarding_flow")
+    parser.add_argument("--es-alias", type=str, default=ES_ACTIONS_ALIAS)
+    parser.add_argument("--weaviate-collection", type=str, default="ActionStep")
+    parser.add_argument("--faiss-path", type=str, default="faiss_index")
+    args = parser.parse_args()
+
+    targets = args.targets.split(",")
+    sources = args.sources.split(",")
+    if args.blue_green and "chroma" in targets and args.chroma_alias == "onboarding_flow" and "workflow" not in sources:
+        # A blue/green build replaces the whole collection behind the alias
+        parser.error("--blue-green on the onboarding_flow alias would drop the workflow records; add the workflow source")
+
+    from embedding_cache import get_cached_embeddings
+    embeddings = get_cached_embeddings(args.embedding_model, provider=args.embedding_provider)
+
+    def documents():
+        for source in sources:
+            yield from build_source(source, args.csv)
+
+    writers = build_writers(targets, embeddings, args)
+    try:
+        report = run_pipeline(documents(), writers, BatchEmbedder(embeddings, batch_size=args.batch_size), args.batch_size)
+    finally:
+        from clients import clients
+        clients.close()
+
+    print(
+        f"Ingested {report['documents']} documents in {report['seconds']}s "
+        f"({report['docs_per_second']} docs/sec, peak RSS {report['peak_rss_mb']} MB)"
+    )
+    for name, stats in report["writers"].items():
+        print(f"  {name}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
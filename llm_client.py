@@ -13,6 +13,7 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, END
+from clients import clients
 
 # --- 1. OpenAI Integration as a Class ---
 
@@ -30,9 +31,10 @@ class LLMManager:
             model_name (str): The name of the model to use from OpenAI (e.g., 'gpt-3.5-turbo', 'gpt-4').
         """
         print(f"---LLMManager: Initializing model '{model_name}'---")
-        # Initialize OpenAI model with API key from environment
+        # Initialize OpenAI model with API key from environment, on the shared HTTP pool
         self.llm = ChatOpenAI(
             model=model_name,
             temperature=0,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            **clients.openai_http_kwargs()
         )
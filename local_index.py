@@ -0,0 +1,271 @@
+import os
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+
+# Load environment variables
+load_dotenv()
+
+# --- Configuration ---
+# "chroma" searches the remote collection on every request; "local" serves searches
+# from an in-process mirror that is synced from Chroma.
+VECTOR_SEARCH_BACKEND = os.getenv("VECTOR_SEARCH_BACKEND", "chroma")
+LOCAL_INDEX_REFRESH_SECONDS = float(os.getenv("LOCAL_INDEX_REFRESH_SECONDS", "300"))
+
+_COMPARISONS = {
+    "$eq": lambda value, target: value == target,
+    "$ne": lambda value, target: value != target,
+    "$gt": lambda value, target: value is not None and value > target,
+    "$gte": lambda value, target: value is not None and value >= target,
+    "$lt": lambda value, target: value is not None and value < target,
+    "$lte": lambda value, target: value is not None and value <= target,
+    "$in": lambda value, target: value in target,
+    "$nin": lambda value, target: value not in target,
+}
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """
+    Evaluate a Chroma `where` filter against one metadata dict. Supports `$and`,
+    `$or`, `{"key": value}` equality and the `$eq/$ne/$gt/$gte/$lt/$lte/$in/$nin`
+    operators.
+    """
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for operator, target in condition.items():
+                if operator not in _COMPARISONS:
+                    raise ValueError(f"Unsupported where operator: {operator}")
+                if not _COMPARISONS[operator](value, target):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class _Snapshot:
+    """Immutable view of the index contents; replaced wholesale on every sync."""
+    __slots__ = ("ids", "documents", "metadatas", "matrix")
+
+    def __init__(self, ids, documents, metadatas, matrix):
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.matrix = matrix
+
+
+class LocalVectorIndex:
+    """
+    In-process serving index mirroring a Chroma collection.
+
+    Embeddings are held in a NumPy matrix of L2-normalized rows, so cosine top-k is
+    one matrix-vector product. Exposes the subset of the LangChain Chroma interface
+    used by RAGChainBuilder, VectorDBTools and ActionCatalog (`similarity_search`,
+    `similarity_search_by_vector`, `get`), including Chroma's `where` filter syntax.
+    Chroma remains the source of truth: the mirror is synced at startup and then
+    every `refresh_interval` seconds.
+    """
+
+    def __init__(self, embeddings, source=None, refresh_interval: float = LOCAL_INDEX_REFRESH_SECONDS):
+        """
+        Args:
+            embeddings (Embeddings): Model used to embed query strings.
+            source (VectorStore, optional): Store to mirror; must support Chroma-style
+                `get(include=[...])`.
+            refresh_interval (float): Seconds between background syncs; 0 disables them.
+        """
+        self.embeddings = embeddings
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self._snapshot = _Snapshot([], [], [], np.zeros((0, 0), dtype=np.float32))
+        self._stop = threading.Event()
+        self._refresh_thread = None
+        self.last_sync_error = None
+        self.last_synced_at = None
+
+    def __len__(self):
+        return len(self._snapshot.ids)
+
+    def load(self, ids, documents, metadatas, embeddings):
+        """Replace the index contents with the given records."""
+        if len(embeddings) != len(ids):
+            raise ValueError(f"Expected {len(ids)} embeddings, got {len(embeddings)}")
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1) if len(ids) else np.zeros((0, 0), dtype=np.float32)
+        if len(matrix):
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix = matrix / norms
+        self._snapshot = _Snapshot(
+            list(ids),
+            list(documents) if documents is not None else [None] * len(ids),
+            [metadata or {} for metadata in (metadatas if metadatas is not None else [None] * len(ids))],
+            matrix
+        )
+
+    def sync(self) -> bool:
+        """
+        Pull every record with its embedding from the source store.
+
+        Returns:
+            bool: True if the sync succeeded.
+        """
+        if self.source is None:
+            return False
+        try:
+            results = self.source.get(include=["embeddings", "documents", "metadatas"])
+            embeddings = results.get("embeddings")
+            self.load(
+                results["ids"],
+                results.get("documents"),
+                results.get("metadatas"),
+                embeddings if embeddings is not None else []
+            )
+            self.last_sync_error = None
+            self.last_synced_at = time.time()
+            print(f"Local vector index synced {len(self)} documents")
+            return True
+        except Exception as e:
+            self.last_sync_error = str(e)
+            print(f"Error syncing local vector index: {e}")
+            return False
+
+    def start_refresh(self):
+        """Sync now and keep re-syncing on a daemon thread every `refresh_interval` seconds."""
+        self.sync()
+        if self.refresh_interval <= 0 or self._refresh_thread is not None:
+            return
+
+        def refresh_loop():
+            while not self._stop.wait(self.refresh_interval):
+                self.sync()
+
+        self._refresh_thread = threading.Thread(target=refresh_loop, name="local-index-refresh", daemon=True)
+        self._refresh_thread.start()
+
+    def stop_refresh(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self),
+            "last_synced_at": self.last_synced_at,
+            "last_sync_error": self.last_sync_error,
+        }
+
+    def _mask(self, snapshot: _Snapshot, where: Optional[Dict[str, Any]]) -> np.ndarray:
+        if not where:
+            return np.ones(len(snapshot.ids), dtype=bool)
+        return np.fromiter(
+            (matches_where(metadata, where) for metadata in snapshot.metadatas),
+            dtype=bool,
+            count=len(snapshot.ids)
+        )
+
+    def similarity_search_by_vector_with_score(self, embedding, k: int = 4, filter: Optional[Dict[str, Any]] = None):
+        """
+        Cosine top-k over the records matching `filter`.
+
+        Returns:
+            List[Tuple[Document, float]]: Documents with their cosine distance (1 - similarity),
+            closest first, matching Chroma's cosine space.
+        """
+        snapshot = self._snapshot
+        if not snapshot.ids or k <= 0:
+            return []
+
+        candidates = np.flatnonzero(self._mask(snapshot, filter))
+        if not len(candidates):
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        scores = snapshot.matrix[candidates] @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (
+                Document(
+                    id=snapshot.ids[candidates[i]],
+                    page_content=snapshot.documents[candidates[i]] or "",
+                    metadata=dict(snapshot.metadatas[candidates[i]])
+                ),
+                float(1.0 - scores[i])
+            )
+            for i in top
+        ]
+
+    def similarity_search_by_vector(self, embedding, k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k=k, filter=filter)]
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs) -> List[Document]:
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k=k, filter=filter)
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None, **kwargs) -> Dict[str, Any]:
+        """
+        Chroma-style `get`: records matching `ids` and `where`, without ranking.
+        """
+        snapshot = self._snapshot
+        include = include or ["documents", "metadatas"]
+        wanted_ids = set(ids) if ids is not None else None
+
+        selected = [
+            i for i in np.flatnonzero(self._mask(snapshot, where))
+            if wanted_ids is None or snapshot.ids[i] in wanted_ids
+        ]
+        selected = selected[offset or 0:]
+        if limit is not None:
+            selected = selected[:limit]
+
+        results = {"ids": [snapshot.ids[i] for i in selected]}
+        if "documents" in include:
+            results["documents"] = [snapshot.documents[i] for i in selected]
+        if "metadatas" in include:
+            results["metadatas"] = [dict(snapshot.metadatas[i]) for i in selected]
+        if "embeddings" in include:
+            results["embeddings"] = snapshot.matrix[np.asarray(selected, dtype=int)]
+        return results
+
+
+_local_indexes: Dict[str, LocalVectorIndex] = {}
+_local_indexes_lock = threading.Lock()
+
+
+def select_vector_store(source_store, embeddings, collection_name: str = "onboarding_flow"):
+    """
+    Returns the store that should serve searches for a collection: `source_store` itself,
+    or a LocalVectorIndex mirroring it when VECTOR_SEARCH_BACKEND is "local". The mirror
+    is shared per collection, so every caller reads the same copy.
+    """
+    if VECTOR_SEARCH_BACKEND != "local":
+        return source_store
+
+    with _local_indexes_lock:
+        local_index = _local_indexes.get(collection_name)
+        if local_index is None:
+            local_index = LocalVectorIndex(embeddings, source=source_store)
+            local_index.start_refresh()
+            _local_indexes[collection_name] = local_index
+            print(f"Serving vector searches for '{collection_name}' from the local index")
+        return local_index
+
+
+def local_index_stats() -> Dict[str, Dict[str, Any]]:
+    """Sync state of every local mirror in this process."""
+    return {name: local_index.stats() for name, local_index in _local_indexes.items()}
@@ -0,0 +1,210 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+# Stages timed on the serving path
+EMBEDDING = "embedding"
+SIMILARITY_SEARCH = "similarity_search"
+VECTOR_GET = "get"
+LLM = "llm"
+OUTPUT_PARSING = "output_parsing"
+SERIALIZATION = "serialization"
+VALIDATION = "validation"
+
+# Label values used when a stage runs outside a request (scripts, background syncs)
+NO_ENDPOINT = "none"
+NO_BRANCH = "none"
+
+_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_SECONDS = Histogram(
+    "onboarding_agent_stage_seconds",
+    "Time spent in one stage of request handling",
+    ["stage", "endpoint", "branch"],
+    buckets=_LATENCY_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "onboarding_agent_stage_errors_total",
+    "Stage calls that raised an exception",
+    ["stage", "endpoint", "branch"],
+)
+REQUEST_SECONDS = Histogram(
+    "onboarding_agent_request_seconds",
+    "End-to-end request latency",
+    ["endpoint", "branch", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+
+class RequestTimings:
+    """
+    Stage timings collected while one request is handled. Stages are buffered until
+    the request finishes, because the branch that resolved it is only known then;
+    anything recorded after that is observed immediately.
+    """
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.branch: Optional[str] = None
+        self.started = time.perf_counter()
+        self.stages: List[Tuple[str, float, bool]] = []
+        self.finished = False
+
+    def record(self, stage: str, seconds: float, failed: bool = False):
+        if self.finished:
+            _observe(stage, seconds, failed, self.endpoint, self.branch or NO_BRANCH)
+        else:
+            self.stages.append((stage, seconds, failed))
+
+    def finish(self, status: str = "ok"):
+        if self.finished:
+            return
+        self.finished = True
+        branch = self.branch or NO_BRANCH
+        for stage, seconds, failed in self.stages:
+            _observe(stage, seconds, failed, self.endpoint, branch)
+        REQUEST_SECONDS.labels(self.endpoint, branch, status).observe(time.perf_counter() - self.started)
+
+
+def _observe(stage: str, seconds: float, failed: bool, endpoint: str, branch: str):
+    STAGE_SECONDS.labels(stage, endpoint, branch).observe(seconds)
+    if failed:
+        STAGE_ERRORS.labels(stage, endpoint, branch).inc()
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def get_request_timings() -> Optional[RequestTimings]:
+    """Returns the timings of the current request, if one is active."""
+    return _current_timings.get()
+
+
+def record_stage(stage: str, seconds: float, failed: bool = False):
+    """Attribute `seconds` to `stage` for the current request, or observe it unlabelled."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.record(stage, seconds, failed)
+    else:
+        _observe(stage, seconds, failed, NO_ENDPOINT, NO_BRANCH)
+
+
+@contextmanager
+def timed(stage: str):
+    """Time the enclosed block as one call of `stage`."""
+    started = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - started, failed)
+
+
+def set_branch(branch: str):
+    """Tag the current request with the branch that resolved it."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.branch = branch
+
+
+@contextmanager
+def request_scope(endpoint: str):
+    """
+    Collect stage timings for one request. The scope does not observe anything on
+    exit; call `finish()` on the yielded timings once the response is complete.
+    Work handed to the bounded executor sees the same timings, since run_blocking
+    copies the caller's context.
+    """
+    timings = RequestTimings(endpoint)
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+class LLMTimingCallback(BaseCallbackHandler):
+    """Records the duration of every chat model call as the `llm` stage."""
+    run_inline = True
+
+    def __init__(self):
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            record_stage(LLM, time.perf_counter() - started)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs: Any):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            record_stage(LLM, time.perf_counter() - started, failed=True)
+
+
+class StatsCollector:
+    """
+    Exports the numeric fields of existing `stats()` dicts (caches, pools, local
+    index, ...) as gauges at scrape time. Nested dicts become a `name` label; lists
+    of dicts use their `model` field, or their position, as the label.
+    """
+
+    def __init__(self, sources: Dict[str, Callable[[], Any]], prefix: str = "onboarding_agent"):
+        self.sources = sources
+        self.prefix = prefix
+
+    def describe(self):
+        # Metric names depend on the stats at scrape time; don't collect at registration
+        return []
+
+    def _flatten(self, value: Any, label: Optional[str], out: Dict[str, List[Tuple[Optional[str], float]]], key: str = ""):
+        if isinstance(value, (bool, int, float)):
+            out.setdefault(key, []).append((label, float(value)))
+        elif isinstance(value, dict):
+            for name, item in value.items():
+                if isinstance(item, (dict, list)) and not key:
+                    self._flatten(item, str(name), out)
+                else:
+                    self._flatten(item, label, out, f"{key}_{name}" if key else str(name))
+        elif isinstance(value, list):
+            for position, item in enumerate(value):
+                item_label = item.get("model") if isinstance(item, dict) else None
+                self._flatten(item, str(item_label or position), out, key)
+
+    def collect(self):
+        for source, get_stats in self.sources.items():
+            try:
+                values: Dict[str, List[Tuple[Optional[str], float]]] = {}
+                self._flatten(get_stats(), None, values)
+            except Exception as e:
+                print(f"Error collecting {source} stats: {e}")
+                continue
+            for key, samples in values.items():
+                family = GaugeMetricFamily(f"{self.prefix}_{source}_{key}", f"{source} {key}", labels=["name"])
+                for label, number in samples:
+                    family.add_metric([label or ""], number)
+                yield family
+
+
+def register_stats(sources: Dict[str, Callable[[], Any]]):
+    """Expose the given stats() callables on /metrics."""
+    REGISTRY.register(StatsCollector(sources))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Returns the Prometheus exposition body and its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
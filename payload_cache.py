@@ -0,0 +1,80 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+from frozen import FrozenDict, freeze
+from metrics import OUTPUT_PARSING, timed
+
+# Load environment variables
+load_dotenv()
+
+PAYLOAD_CACHE_SIZE = int(os.getenv("PAYLOAD_CACHE_SIZE", "1024"))
+
+
+def dump_json(value: Any) -> bytes:
+    """Serialize like FastAPI's JSONResponse (compact separators, UTF-8)."""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def get_json_body(value: Any) -> Optional[bytes]:
+    """Returns the pre-serialized JSON body of a cached payload, or None."""
+    return getattr(value, "json_body", None)
+
+
+class PayloadCache:
+    """
+    Content-addressed cache of parsed `full_action` metadata strings.
+
+    Maps a hash of the raw JSON string to its parsed, immutable representation
+    plus a pre-serialized response body, so the /chat hot path parses and
+    serializes each workflow step once instead of on every request.
+    """
+
+    def __init__(self, max_size: int = PAYLOAD_CACHE_SIZE):
+        """
+        Args:
+            max_size (int): Maximum number of distinct payloads kept.
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, FrozenDict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, raw: str) -> Any:
+        """
+        Parse a full_action JSON string, returning the cached result if the same
+        content was seen before. Raises json.JSONDecodeError like json.loads.
+        """
+        digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            payload = self._entries.get(digest)
+            if payload is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return payload
+
+        with timed(OUTPUT_PARSING):
+            parsed = json.loads(raw)
+            payload = freeze(parsed)
+            if isinstance(payload, FrozenDict):
+                payload.json_body = dump_json(parsed)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[digest] = payload
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return payload
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+# Shared cache for workflow step payloads
+payload_cache = PayloadCache()
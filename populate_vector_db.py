@@ -1,36 +1,43 @@
 import os
-import json
+import argparse
 from dotenv import load_dotenv
-from langchain_openai import OpenAIEmbeddings
+from embedding_cache import get_cached_embeddings
 from langchain_community.vectorstores import ElasticsearchStore
-from langchain_core.documents import Document
 from database import get_mock_vector_db
-from elasticsearch import Elasticsearch
+from clients import clients
+from batch_embedding import BatchEmbedder
+from incremental_sync import sync_elasticsearch_index
+from index_aliases import ES_ACTIONS_ALIAS, es_alias_target, es_blue_green_reindex
+from ingestion_pipeline import action_document
 
 # Load environment variables
 load_dotenv()
 
-def populate_vector_db():
-    """Populate the Elasticsearch vector database with actions from database.py"""
-    
-    # Initialize embeddings
-    embeddings = OpenAIEmbeddings(
-        openai_api_key=os.getenv("OPENAI_API_KEY"),
-        model="nomic-embed-text"
-    )
+def populate_vector_db(incremental: bool = True):
+    """
+    Populate the Elasticsearch vector database with actions from database.py.
+
+    Args:
+        incremental (bool): Sync by content hash, re-embedding only new or changed
+            actions and deleting removed ones. If False (or the alias doesn't exist
+            yet), a new index version is built, validated and swapped in behind the
+            alias, so searches never see a half-built index.
+    """
     
-    # Initialize Elasticsearch client to delete existing index
-    es_client = Elasticsearch([{"host": "localhost", "port": 9200, "scheme": "http"}])
-    index_name = "loan_actions_index_v5"  # Changed version to avoid conflicts
+    # Initialize embeddings (cached, so unchanged documents aren't re-embedded)
+    embeddings = get_cached_embeddings("nomic-embed-text")
     
-    # Delete existing index if it exists
-    if es_client.indices.exists(index=index_name):
-        es_client.indices.delete(index=index_name)
-        print(f"Deleted existing index: {index_name}")
+    # Shared Elasticsearch client, also used by the vector store below
+    es_client = clients.elasticsearch()
+    # Searches and writes go through the alias; the versioned index behind it changes on rebuild
+    index_name = ES_ACTIONS_ALIAS
+    if incremental and es_alias_target(es_client, index_name) is None:
+        print(f"Alias '{index_name}' does not exist yet, building the first index version")
+        incremental = False
     
-    # Initialize vector store with new index
+    # Initialize vector store on the alias
     vector_store = ElasticsearchStore(
-        es_url="http://localhost:9200/",
+        es_connection=es_client,
         index_name=index_name,
         embedding=embeddings
     )
@@ -38,36 +45,37 @@ def populate_vector_db():
     # Get all actions from database
     actions = get_mock_vector_db()
     
-    # Convert actions to documents for vector storage
-    documents = []
-    for action in actions:
-        # Create a text representation for embedding
-        text_content = f"""
-        # Action ID: {action['action_id']}
-        # Stage: {action['stage_name']}
-        Description: {action['description_for_llm']}
-        # Action Type: {action['action_type']}
-        """
-        
-        # Create document with metadata containing the full action
-        doc = Document(
-            page_content=text_content,
-            metadata={
-                "action_id": action['action_id'],
-                # "stage_name": action['stage_name'],
-                "action_type": action['action_type'],
-                "full_action": json.dumps(action)  # Store the complete action as JSON string in metadata
-            }
-        )
-        documents.append(doc)
+    # Convert actions to documents for vector storage, shared with ingestion_pipeline
+    # so both produce the same content hashes for the same action
+    documents = [action_document(action, "actions") for action in actions]
     
     # Add documents to vector store
     try:
-        vector_store.add_documents(documents)
-        print(f"Successfully added {len(documents)} actions to vector database")
+        ids = [doc.metadata['action_id'] for doc in documents]
+        test_query = "I want to login to the system"
+        if incremental:
+            report = sync_elasticsearch_index(
+                vector_store,
+                ids,
+                [doc.page_content for doc in documents],
+                [doc.metadata for doc in documents],
+                BatchEmbedder(embeddings)
+            )
+            report.print_summary()
+        else:
+            live_index = es_blue_green_reindex(
+                es_client,
+                index_name,
+                ids,
+                [doc.page_content for doc in documents],
+                [doc.metadata for doc in documents],
+                embeddings,
+                BatchEmbedder(embeddings),
+                smoke_query=test_query
+            )
+            print(f"Successfully added {len(documents)} actions to '{live_index}' behind alias '{index_name}'")
         
         # Test retrieval
-        test_query = "I want to login to the system"
         results = vector_store.similarity_search(test_query, k=1)
         if results:
             print(f"Test query successful. Retrieved: {results[0].metadata['action_id']}")
@@ -78,4 +86,7 @@ def populate_vector_db():
         print(f"Error populating vector database: {e}")
 
 if __name__ == "__main__":
-    populate_vector_db()
+    parser = argparse.ArgumentParser(description="Populate the Elasticsearch action index.")
+    parser.add_argument("--full", action="store_true", help="Build a new index version and swap the alias to it instead of syncing")
+    args = parser.parse_args()
+    populate_vector_db(incremental=not args.full)
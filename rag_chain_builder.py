@@ -1,18 +1,36 @@
 import os
 import json
+import time
 from dotenv import load_dotenv
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableGenerator, RunnableLambda, RunnablePassthrough
 from langchain_community.vectorstores import ElasticsearchStore
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
+from embedding_cache import get_cached_embeddings
 from llm_client import LLMManager 
-import chromadb
+from concurrency import run_blocking, run_sync
+from retrieval_context import get_retrieval_context
+from semantic_cache import hash_context, semantic_cache
+from action_catalog import action_catalog
+from payload_cache import payload_cache
+from frozen import thaw
+from local_index import select_vector_store
+from metrics import EMBEDDING, SIMILARITY_SEARCH, LLMTimingCallback, set_branch, timed
+from clients import clients
+from index_aliases import aliased_chroma
 
 # Load environment variables
 load_dotenv()
 
+# Keywords that mark a question as being about the onboarding process or its workflow steps
+WORKFLOW_KEYWORDS = ["onboarding", "process", "workflow", "step", "otp", "mobile", "aadhaar", "aadhar", "biometric"]
+
+# Returned when the onboarding flow can't be found or constructed from ChromaDB
+ONBOARDING_FLOW_UNAVAILABLE = {
+    "action": "onboarding_flow: The onboarding flow information could not be retrieved from the database",
+    "message": "Please ensure the onboarding flow data is properly uploaded to ChromaDB"
+}
+
 class RAGChainBuilder:
     """
     A Singleton class to build and provide a single instance of the RAG chain.
@@ -33,37 +51,59 @@ class RAGChainBuilder:
             print("Returning existing RAGChainBuilder instance...")
         return cls._instance
 
-    def __init__(self, llm_model_name: str = "gpt-3.5-turbo"):
+    def __init__(self, llm_model_name: str = "gpt-3.5-turbo", vector_store=None, llm=None):
         """
         Initializes the RAGChainBuilder's attributes.
         This will only run the first time the instance is created.
 
         Args:
-            vector_store (FAISS): The vector store to retrieve context from.
             llm_model_name (str): The name of the OpenAI chat model to use for generation.
+            vector_store (VectorStore, optional): The vector store to retrieve context from.
+                Defaults to the ChromaDB onboarding_flow collection.
+            llm (BaseChatModel, optional): The chat model to use. Defaults to an OpenAI model
+                created through LLMManager.
         """
         # The hasattr check prevents re-initialization on subsequent calls to get the instance
         if not hasattr(self, 'is_initialized'):
+            self.collection_name = "onboarding_flow"
 
-            # Initialize ChromaDB client
-            client = chromadb.HttpClient(host='3.6.132.24', port=8000)
-            
-            self.embeddings = OpenAIEmbeddings(
-                openai_api_key=os.getenv("OPENAI_API_KEY"),
-                model="text-embedding-3-small"
-            )
-            
-            # Initialize Chroma vector store with onboarding_flow collection
-            self.vector_store = Chroma(
-                client=client,
-                collection_name="onboarding_flow",    # Use the onboarding_flow collection
-                embedding_function=self.embeddings
-            )
-            self.llm = LLMManager(model_name=llm_model_name).llm
+            if vector_store is None:
+                # Shared ChromaDB client from the client registry
+                client = clients.chroma()
+                
+                # Shared, cached embeddings (memory LRU + on-disk store)
+                self.embeddings = get_cached_embeddings("text-embedding-3-small")
+                
+                # Chroma vector store for the collection the onboarding_flow alias points at
+                vector_store = aliased_chroma(client, self.collection_name, self.embeddings)
+            else:
+                self.embeddings = getattr(vector_store, "embeddings", None)
+            # Chroma, or the in-process mirror of it when VECTOR_SEARCH_BACKEND=local
+            self.vector_store = select_vector_store(vector_store, self.embeddings, self.collection_name)
+            self.semantic_cache = semantic_cache
+            # Exact action_id/step_id lookups are served from memory
+            self.catalog = action_catalog
+            self.catalog.ensure_loaded(self.vector_store)
+            self.llm = llm if llm is not None else LLMManager(model_name=llm_model_name).llm
             self.is_initialized = True
             print(f"RAGChainBuilder initialized with model: {llm_model_name}")
             self.rag_chain = self._build_chain()
 
+    def _similarity_search(self, query, k=4, filter=None):
+        """
+        Similarity search that reuses the request's query embeddings when a
+        retrieval context is active, and embeds the query directly otherwise.
+        """
+        retrieval = get_retrieval_context()
+        if retrieval is not None:
+            return retrieval.similarity_search(self.vector_store, query, k=k, filter=filter)
+        with timed(SIMILARITY_SEARCH):
+            return self.vector_store.similarity_search(query, k=k, filter=filter)
+
+    def _retrieve(self, question):
+        """Retriever step of the RAG chain."""
+        return self._similarity_search(question, k=4)
+
     def _format_context(self, docs):
         """Format retrieved documents for the prompt"""
         if not docs:
@@ -75,6 +115,54 @@ class RAGChainBuilder:
             return doc.metadata['full_action']
         return doc.page_content
 
+    def _embed_question(self, question):
+        """Embedding of the question, shared with the retriever when a retrieval context is active."""
+        retrieval = get_retrieval_context()
+        if retrieval is not None:
+            return retrieval.embed(question)
+        with timed(EMBEDDING):
+            return self.embeddings.embed_query(question)
+
+    def _cached_generation(self, inputs):
+        """
+        Semantic cache in front of the LLM call. Returns the cached answer for a
+        similar question over the same retrieved context, or the generation chain
+        wrapped so that its answer is stored once it completes.
+        """
+        if self.embeddings is None:
+            return self.generation_chain
+
+        question_vector = self._embed_question(inputs["question"])
+        context_hash = hash_context(inputs["context"])
+        answer = self.semantic_cache.lookup(question_vector, context_hash)
+        if answer is not None:
+            return answer
+
+        started = time.perf_counter()
+
+        def store(answer):
+            self.semantic_cache.store(
+                question_vector, context_hash, answer,
+                llm_seconds=time.perf_counter() - started,
+                collection=self.collection_name
+            )
+
+        def store_stream(chunks):
+            collected = []
+            for chunk in chunks:
+                collected.append(chunk)
+                yield chunk
+            store("".join(collected))
+
+        async def astore_stream(chunks):
+            collected = []
+            async for chunk in chunks:
+                collected.append(chunk)
+                yield chunk
+            store("".join(collected))
+
+        return self.generation_chain | RunnableGenerator(store_stream, astore_stream)
+
     def _build_chain(self):
         """
         A private method to construct the RAG chain.
@@ -100,14 +188,18 @@ class RAGChainBuilder:
         RESPONSE:
         """)
         
+        # Chat model calls are timed as the `llm` stage
+        llm = self.llm.with_config(callbacks=[LLMTimingCallback()])
+        self.generation_chain = prompt | llm | StrOutputParser()
+
+        # The retrieval and cache steps make blocking calls; on ainvoke/astream LangChain
+        # runs them on the loop's default executor, which the server sets to the bounded pool
         chain = (
             {
-                "context": self.vector_store.as_retriever() | self._format_context, 
+                "context": RunnableLambda(self._retrieve) | self._format_context, 
                 "question": RunnablePassthrough()
             }
-            | prompt
-            | self.llm
-            | StrOutputParser()
+            | RunnableLambda(self._cached_generation)
         )
         
         print("RAG chain built successfully.")
@@ -119,180 +211,274 @@ class RAGChainBuilder:
         """
         return self.rag_chain
 
-    def _get_workflow_step(self, step_id):
+
+    def _step_filter(self, step_id):
+        """Metadata filter matching a record by its action_id or step_id."""
+        return {"$or": [{"action_id": step_id}, {"step_id": step_id}]}
+
+    def _resolve_step_results(self, step_id, results):
         """
-        Retrieve the complete workflow step structure for a given step_id from ChromaDB.
+        Inspect search results for a workflow step.
+
+        Returns:
+            tuple: (step, mapped_step_id). `step` is the parsed workflow step if a result
+            carries a full_action; otherwise `mapped_step_id` is set when a result maps
+            the action_id to another step_id that should be looked up instead.
+        """
+        for result in results or []:
+            if 'full_action' in result.metadata:
+                try:
+                    return payload_cache.parse(result.metadata['full_action']), None
+                except json.JSONDecodeError:
+                    print(f"Error parsing JSON for step_id {step_id}")
+
+            # If we have a mapping from action_id to step_id
+            if 'step_id' in result.metadata:
+                return None, result.metadata['step_id']
+        return None, None
+
+    async def _aget_workflow_step(self, step_id):
         """
+        Retrieve the complete workflow step structure for a given step_id, from the
+        catalog or ChromaDB. Vector store calls run on the bounded executor.
+        """
+        step = self.catalog.get_step(step_id)
+        if step is not None:
+            return step
+
         try:
             # First, check if we're looking for a direct step_id
-            results = self.vector_store.similarity_search(
-                f"workflow step {step_id}", 
+            results = await run_blocking(
+                self._similarity_search,
+                f"workflow step {step_id}",
                 k=5,
-                filter={"$or": [{"action_id": step_id}, {"step_id": step_id}]}
+                filter=self._step_filter(step_id)
             )
-            
+
             # If no direct match, try to find if it's an action_id that maps to a step_id
             if not results:
-                results = self.vector_store.similarity_search(
-                    f"action {step_id}", 
+                results = await run_blocking(
+                    self._similarity_search,
+                    f"action {step_id}",
                     k=5
                 )
-            
-            # Process results
-            if results:
-                for result in results:
-                    if 'full_action' in result.metadata:
-                        try:
-                            return json.loads(result.metadata['full_action'])
-                        except json.JSONDecodeError:
-                            print(f"Error parsing JSON for step_id {step_id}")
-                    
-                    # If we have a mapping from action_id to step_id
-                    if 'step_id' in result.metadata:
-                        mapped_step_id = result.metadata['step_id']
-                        # Recursive call with the mapped step_id
-                        return self._get_workflow_step(mapped_step_id)
-            
+
+            step, mapped_step_id = self._resolve_step_results(step_id, results)
+            if step is not None:
+                return step
+            if mapped_step_id:
+                # Recursive call with the mapped step_id
+                return await self._aget_workflow_step(mapped_step_id)
+
             # If we reach here, we couldn't find the step
             print(f"Workflow step not found for ID: {step_id}")
             return None
-            
+
         except Exception as e:
             print(f"Error retrieving workflow step from ChromaDB: {e}")
             return None
 
+    def _shortcut_step_id(self, lower_question):
+        """
+        Map questions that name a specific workflow step to its step_id.
+        Returns None if the question doesn't match any keyword shortcut.
+        """
+        if "mobile otp" in lower_question or "otp validation" in lower_question:
+            if "validation" in lower_question or "verify" in lower_question:
+                return "mobile_otp_validation"
+            return "mobile_otp_generation"
+        elif "aadhaar" in lower_question or "aadhar" in lower_question or "biometric" in lower_question:
+            return "aadhar_biometric"
+        return None
+
+    def _is_workflow_question(self, lower_question):
+        return any(kw in lower_question for kw in WORKFLOW_KEYWORDS)
+
+    def _is_onboarding_question(self, lower_question):
+        return "onboarding" in lower_question or "process" in lower_question
+
+    def _flow_from_overview(self, flow_results):
+        """
+        Build the onboarding flow response from the overview search results.
+        Returns None if the results don't contain a usable overview.
+        """
+        if flow_results and 'full_action' in flow_results[0].metadata:
+            try:
+                return payload_cache.parse(flow_results[0].metadata['full_action'])
+            except json.JSONDecodeError:
+                print("Error parsing onboarding flow JSON")
+                # Continue to next approach if parsing fails
+        
+        # If we have results but no full_action, try to construct from metadata
+        if flow_results:
+            action_id = flow_results[0].metadata.get('action_id')
+            description = flow_results[0].metadata.get('description')
+            if action_id and description:
+                return {
+                    "action": f"{action_id}: {description}",
+                    "message": "Retrieved onboarding flow information from database"
+                }
+        return None
+
+    def _flow_from_steps(self, all_steps):
+        """
+        Construct an onboarding flow from individual workflow step results.
+        Returns None if no steps with a title and description were found.
+        """
+        if not all_steps:
+            return None
+
+        workflow_steps = []
+        step_ids = set()
+        
+        for step in all_steps:
+            step_id = step.metadata.get('step_id')
+            step_title = step.metadata.get('step_title')
+            description = step.metadata.get('description')
+            
+            if step_id and step_id not in step_ids and step_title and description:
+                step_ids.add(step_id)
+                workflow_steps.append({
+                    "step": str(len(workflow_steps) + 1),
+                    "name": step_title,
+                    "description": description
+                })
+        
+        if workflow_steps:
+            return {
+                "step_id": "onboarding_flow",
+                "step_title": "Onboarding Process",
+                "step_description": "Complete onboarding flow for microfinance clients",
+                "workflow_steps": workflow_steps,
+                "note": "Constructed from available workflow steps in database"
+            }
+        return None
+
+    def _action_from_result(self, result):
+        """Build the direct action response from the top search result."""
+        # Check if we have a full action in metadata
+        if 'full_action' in result.metadata:
+            try:
+                return payload_cache.parse(result.metadata['full_action'])
+            except json.JSONDecodeError:
+                # If not valid JSON, return as is
+                return {"action": result.metadata['full_action']}
+        
+        # Otherwise, create a simple action response
+        action_id = result.metadata.get('action_id')
+        description = result.metadata.get('description')
+        if action_id and description:
+            return {
+                "action": f"{action_id}: {description}"
+            }
+        
+        # Fallback to the document content
+        return {
+            "action": result.page_content
+        }
+
+    async def _aget_onboarding_flow(self):
+        """
+        Get the onboarding flow overview from ChromaDB, falling back to constructing
+        it from individual steps and finally to a generic response.
+        """
+        flow = self.catalog.get_step("onboarding_flow")
+        if flow is not None:
+            return flow
+
+        try:
+            # First try with exact filter
+            flow_results = await run_blocking(
+                self._similarity_search,
+                "onboarding flow overview process",
+                k=1,
+                filter={"action_id": "onboarding_flow"}
+            )
+
+            # If no results, try without filter
+            if not flow_results:
+                flow_results = await run_blocking(
+                    self._similarity_search,
+                    "onboarding flow overview process",
+                    k=1
+                )
+
+            flow = self._flow_from_overview(flow_results)
+            if flow:
+                return flow
+        except Exception as e:
+            print(f"Error retrieving onboarding flow: {e}")
+
+        # If we couldn't get the flow from ChromaDB, query for individual steps
+        # and try to construct the flow
+        try:
+            all_steps = await run_blocking(
+                self._similarity_search,
+                "all onboarding workflow steps",
+                k=20  # Try to get all steps
+            )
+            flow = self._flow_from_steps(all_steps)
+            if flow:
+                return flow
+        except Exception as e:
+            print(f"Error constructing workflow from steps: {e}")
+
+        # If we still couldn't get the flow, return a generic response
+        return dict(ONBOARDING_FLOW_UNAVAILABLE)
+
     def get_action_directly(self, question: str):
         """
-        Get action directly from vector store without LLM processing
+        Get action directly from vector store without LLM processing. Sync wrapper
+        around `aget_action_directly` for callers outside the event loop.
+
+        Returns:
+            A mutable copy (plain dicts and lists) of the action, or None.
+        """
+        action = run_sync(self.aget_action_directly(question))
+        return thaw(action) if action is not None else None
+
+    async def aget_action_directly(self, question: str):
+        """
+        Get action directly from the catalog or vector store without LLM processing.
+        Safe to await from the FastAPI event loop: every vector store round-trip runs
+        on the bounded executor.
+
+        Returns the shared, read-only payload (a FrozenDict carrying its pre-serialized
+        `json_body`) rather than a copy, so /chat can send it without re-encoding.
         """
         try:
             # Directly check for specific step requests in the question
             lower_question = question.lower()
-            
+
             # Check for specific workflow steps in the question
-            if "mobile otp" in lower_question or "otp validation" in lower_question:
-                if "validation" in lower_question or "verify" in lower_question:
-                    return self._get_workflow_step("mobile_otp_validation")
-                else:
-                    return self._get_workflow_step("mobile_otp_generation")
-            elif "aadhaar" in lower_question or "aadhar" in lower_question or "biometric" in lower_question:
-                return self._get_workflow_step("aadhar_biometric")
-            
+            step_id = self._shortcut_step_id(lower_question)
+            if step_id:
+                set_branch("keyword_shortcut")
+                return await self._aget_workflow_step(step_id)
+
             # If no direct match, search the vector store
-            results = self.vector_store.similarity_search(question, k=3)
-            
+            results = await run_blocking(self._similarity_search, question, k=3)
+
             # Check if the query is about the onboarding process or workflow steps
-            if any(kw in lower_question for kw in ["onboarding", "process", "workflow", "step", "otp", "mobile", "aadhaar", "aadhar", "biometric"]):
+            if self._is_workflow_question(lower_question):
                 # Try to find a specific step in the results
                 for result in results:
                     action_id = result.metadata.get('action_id')
                     if action_id:
-                        workflow_step = self._get_workflow_step(action_id)
+                        workflow_step = await self._aget_workflow_step(action_id)
                         if workflow_step:
+                            set_branch("workflow_step")
                             return workflow_step
-                
+
                 # If no specific step found but query is about onboarding, return a general onboarding flow
-                if "onboarding" in lower_question or "process" in lower_question:
-                    # Get the onboarding flow overview from ChromaDB
-                    try:
-                        # First try with exact filter
-                        flow_results = self.vector_store.similarity_search(
-                            "onboarding flow overview process", 
-                            k=1,
-                            filter={"action_id": "onboarding_flow"}
-                        )
-                        
-                        # If no results, try without filter
-                        if not flow_results:
-                            flow_results = self.vector_store.similarity_search(
-                                "onboarding flow overview process", 
-                                k=1
-                            )
-                        
-                        if flow_results and 'full_action' in flow_results[0].metadata:
-                            try:
-                                return json.loads(flow_results[0].metadata['full_action'])
-                            except json.JSONDecodeError:
-                                print("Error parsing onboarding flow JSON")
-                                # Continue to next approach if parsing fails
-                        
-                        # If we have results but no full_action, try to construct from metadata
-                        if flow_results:
-                            action_id = flow_results[0].metadata.get('action_id')
-                            description = flow_results[0].metadata.get('description')
-                            if action_id and description:
-                                return {
-                                    "action": f"{action_id}: {description}",
-                                    "message": "Retrieved onboarding flow information from database"
-                                }
-                    except Exception as e:
-                        print(f"Error retrieving onboarding flow: {e}")
-                    
-                    # If we couldn't get the flow from ChromaDB, query for individual steps
-                    # and try to construct the flow
-                    try:
-                        # Get all workflow steps
-                        all_steps = self.vector_store.similarity_search(
-                            "all onboarding workflow steps",
-                            k=20  # Try to get all steps
-                        )
-                        
-                        if all_steps:
-                            workflow_steps = []
-                            step_ids = set()
-                            
-                            for step in all_steps:
-                                step_id = step.metadata.get('step_id')
-                                step_title = step.metadata.get('step_title')
-                                description = step.metadata.get('description')
-                                
-                                if step_id and step_id not in step_ids and step_title and description:
-                                    step_ids.add(step_id)
-                                    workflow_steps.append({
-                                        "step": str(len(workflow_steps) + 1),
-                                        "name": step_title,
-                                        "description": description
-                                    })
-                            
-                            if workflow_steps:
-                                return {
-                                    "step_id": "onboarding_flow",
-                                    "step_title": "Onboarding Process",
-                                    "step_description": "Complete onboarding flow for microfinance clients",
-                                    "workflow_steps": workflow_steps,
-                                    "note": "Constructed from available workflow steps in database"
-                                }
-                    except Exception as e:
-                        print(f"Error constructing workflow from steps: {e}")
-                    
-                    # If we still couldn't get the flow, return a generic response
-                    return {
-                        "action": "onboarding_flow: The onboarding flow information could not be retrieved from the database",
-                        "message": "Please ensure the onboarding flow data is properly uploaded to ChromaDB"
-                    }
-            
+                if self._is_onboarding_question(lower_question):
+                    set_branch("onboarding_flow")
+                    return await self._aget_onboarding_flow()
+
             if results:
-                # Check if we have a full action in metadata
-                if 'full_action' in results[0].metadata:
-                    try:
-                        return json.loads(results[0].metadata['full_action'])
-                    except json.JSONDecodeError:
-                        # If not valid JSON, return as is
-                        return {"action": results[0].metadata['full_action']}
-                
-                # Otherwise, create a simple action response
-                action_id = results[0].metadata.get('action_id')
-                description = results[0].metadata.get('description')
-                if action_id and description:
-                    return {
-                        "action": f"{action_id}: {description}"
-                    }
-                
-                # Fallback to the document content
-                return {
-                    "action": results[0].page_content
-                }
-                
+                set_branch("top_result")
+                return self._action_from_result(results[0])
+
             return None
         except Exception as e:
             print(f"Error retrieving action: {e}")
@@ -1,5 +1,7 @@
-from langchain_community.vectorstores import ElasticsearchStore
-from langchain_community.embeddings import OllamaEmbeddings
+from embedding_cache import get_cached_embeddings
+from clients import clients
+from batch_embedding import BatchEmbedder
+from index_aliases import es_blue_green_reindex
 import os
 from langchain_core.documents import Document
 import json
@@ -8,8 +10,10 @@ import json
 from database import get_mock_vector_db
 
 # --- Configuration ---
-ES_URL = "http://localhost:9200/"
-INDEX_NAME = "loan_actions_index_v2"
+# Alias; each re-index builds a new version behind it. Kept apart from
+# ES_ACTIONS_ALIAS, which populate_vector_db.py fills with a different embedding
+# model and document format: vectors from the two can't be searched together.
+INDEX_NAME = os.getenv("ES_OLLAMA_ACTIONS_INDEX_ALIAS", "loan_actions_ollama_index")
 EMBEDDING_MODEL_NAME = "nomic-embed-text"
 
 # --- Load data from database.py ---
@@ -42,14 +46,21 @@ for doc_data in raw_action_documents:
 print(f"Prepared {len(documents)} documents for indexing.")
 
 # --- Initialize embedding model ---
-embeddings = OllamaEmbeddings(model=EMBEDDING_MODEL_NAME)
+embeddings = get_cached_embeddings(EMBEDDING_MODEL_NAME, provider="ollama")
 
 # --- Create or update Elasticsearch index ---
 print(f"Re-indexing data into Elasticsearch index '{INDEX_NAME}' with embeddings from '{EMBEDDING_MODEL_NAME}'...")
 
-es_store = ElasticsearchStore.from_documents(
-    documents, embeddings, es_url=ES_URL, index_name=INDEX_NAME, # Ensure index_name is passed
-    # The metadatas argument is automatically handled by from_documents when Document objects are passed
+# Builds and validates a new index version, then swaps the alias to it
+live_index = es_blue_green_reindex(
+    clients.elasticsearch(),
+    INDEX_NAME,
+    [doc.metadata.get('action_id') for doc in documents],
+    [doc.page_content for doc in documents],
+    [doc.metadata for doc in documents],
+    embeddings,
+    BatchEmbedder(embeddings),
+    smoke_query="I want to login to the system"
 )
 
-print("Re-indexing complete.")
\ No newline at end of file
+print(f"Re-indexing complete. Alias '{INDEX_NAME}' now points to '{live_index}'.")
@@ -0,0 +1,92 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from metrics import EMBEDDING, SIMILARITY_SEARCH, timed
+
+
+class RetrievalContext:
+    """
+    Per-request retrieval state. Embeds each distinct query string once and runs
+    every later search for that string through `similarity_search_by_vector`,
+    so one /chat request pays for one embedding round-trip per distinct query.
+    """
+    def __init__(self, embeddings):
+        """
+        Args:
+            embeddings (Embeddings): The embedding model used by the vector store.
+        """
+        self.embeddings = embeddings
+        self._vectors: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self.embedding_requests = 0
+        self.embedding_calls = 0
+
+    def embed(self, text: str) -> List[float]:
+        """
+        Returns the embedding for `text`, calling the embedding model only the first
+        time the string is seen in this request.
+        """
+        with self._lock:
+            self.embedding_requests += 1
+            vector = self._vectors.get(text)
+        if vector is not None:
+            return vector
+
+        with timed(EMBEDDING):
+            vector = self.embeddings.embed_query(text)
+        with self._lock:
+            self.embedding_calls += 1
+            self._vectors.setdefault(text, vector)
+        return vector
+
+    def similarity_search(self, vector_store, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None):
+        """
+        Run a similarity search using the request-scoped embedding of `query`.
+        """
+        vector = self.embed(query)
+        with timed(SIMILARITY_SEARCH):
+            return vector_store.similarity_search_by_vector(vector, k=k, filter=filter)
+
+    @property
+    def embedding_calls_saved(self) -> int:
+        return self.embedding_requests - self.embedding_calls
+
+    def metrics(self) -> Dict[str, int]:
+        """Embedding usage for this request."""
+        return {
+            "embedding_requests": self.embedding_requests,
+            "embedding_calls": self.embedding_calls,
+            "embedding_calls_saved": self.embedding_calls_saved,
+        }
+
+
+_current_context: ContextVar[Optional[RetrievalContext]] = ContextVar("retrieval_context", default=None)
+
+
+def get_retrieval_context() -> Optional[RetrievalContext]:
+    """Returns the retrieval context of the current request, if one is active."""
+    return _current_context.get()
+
+
+@contextmanager
+def retrieval_scope(embeddings):
+    """
+    Activate a fresh RetrievalContext for the duration of a request. The context is
+    visible to every search made from this task, including work handed to the
+    bounded executor and the RAG chain's retriever.
+
+    If `embeddings` is None (e.g. an injected vector store without an embedding
+    model), no context is activated and searches embed as before.
+    """
+    if embeddings is None:
+        yield None
+        return
+
+    context = RetrievalContext(embeddings)
+    token = _current_context.set(context)
+    try:
+        yield context
+    finally:
+        _current_context.reset(token)
@@ -0,0 +1,174 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# --- Configuration ---
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "1000"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+
+
+def hash_context(context: str) -> str:
+    """Stable hash of the retrieved context passed to the LLM."""
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+
+class _CacheEntry:
+    __slots__ = ("vector", "context_hash", "collection", "answer", "llm_seconds", "expires_at")
+
+    def __init__(self, vector, context_hash, collection, answer, llm_seconds, expires_at):
+        self.vector = vector
+        self.context_hash = context_hash
+        self.collection = collection
+        self.answer = answer
+        self.llm_seconds = llm_seconds
+        self.expires_at = expires_at
+
+
+class SemanticCache:
+    """
+    Response cache in front of the RAG chain's LLM call.
+
+    A cached answer is returned when a new query's embedding has cosine similarity
+    of at least `threshold` with a cached query AND the retrieved context hashes to
+    the same value, so a re-uploaded collection with changed content never serves a
+    stale answer. Entries are evicted least-recently-used beyond `max_size` and
+    expire after `ttl_seconds`.
+    """
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_size: int = SEMANTIC_CACHE_SIZE,
+        ttl_seconds: float = SEMANTIC_CACHE_TTL,
+    ):
+        """
+        Args:
+            threshold (float): Minimum cosine similarity for a cache hit.
+            max_size (int): Maximum number of cached answers.
+            ttl_seconds (float): How long an answer stays valid.
+        """
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        # Entries grouped by context hash; a lookup only compares against queries
+        # that were answered from the same retrieved context.
+        self._by_context: Dict[str, List[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.llm_seconds_saved = 0.0
+
+    def _normalize(self, vector) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        ids = self._by_context.get(entry.context_hash)
+        if ids is not None:
+            ids.remove(entry_id)
+            if not ids:
+                del self._by_context[entry.context_hash]
+
+    def lookup(self, query_vector, context_hash: str) -> Optional[str]:
+        """
+        Returns the cached answer for a similar query over the same context, or None.
+        """
+        query = self._normalize(query_vector)
+        now = time.monotonic()
+        with self._lock:
+            best_id, best_score = None, self.threshold
+            for entry_id in list(self._by_context.get(context_hash, ())):
+                entry = self._entries[entry_id]
+                if entry.expires_at < now:
+                    self._remove(entry_id)
+                    continue
+                score = float(np.dot(query, entry.vector))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            entry = self._entries[best_id]
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            self.llm_seconds_saved += entry.llm_seconds
+            return entry.answer
+
+    def store(self, query_vector, context_hash: str, answer: str, llm_seconds: float, collection: str = "onboarding_flow"):
+        """
+        Cache an LLM answer.
+
+        Args:
+            query_vector (List[float]): Embedding of the user's question.
+            context_hash (str): Hash of the retrieved context the answer was generated from.
+            answer (str): The LLM's answer.
+            llm_seconds (float): How long the LLM call took; credited as saved on each hit.
+            collection (str): The vector store collection the context came from.
+        """
+        if self.max_size <= 0:
+            return
+        entry = _CacheEntry(
+            self._normalize(query_vector), context_hash, collection, answer,
+            llm_seconds, time.monotonic() + self.ttl_seconds
+        )
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            self._by_context.setdefault(context_hash, []).append(entry_id)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, collection: Optional[str] = None) -> int:
+        """
+        Drop cached answers, e.g. after a collection is re-uploaded.
+
+        Args:
+            collection (str, optional): Only drop answers built from this collection.
+                Drops everything if not given.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        with self._lock:
+            to_remove = [
+                entry_id for entry_id, entry in self._entries.items()
+                if collection is None or entry.collection == collection
+            ]
+            for entry_id in to_remove:
+                self._remove(entry_id)
+        print(f"Semantic cache invalidated {len(to_remove)} entries" + (f" for '{collection}'" if collection else ""))
+        return len(to_remove)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit rate and LLM time saved by this cache."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "llm_seconds_saved": round(self.llm_seconds_saved, 3),
+            "entries": len(self._entries),
+        }
+
+
+# Shared cache instance used by the RAG chain
+semantic_cache = SemanticCache()
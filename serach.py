@@ -1,12 +1,14 @@
 from langchain_community.vectorstores import ElasticsearchStore
 from langchain_community.embeddings import OllamaEmbeddings
+from clients import clients
+from index_aliases import ES_ACTIONS_ALIAS, es_read_index
 
 # --- PREREQUISITES ---
-# 1. Your Elasticsearch instance is running at http://localhost:9200
+# 1. Your Elasticsearch instance is running at ELASTICSEARCH_URL (default http://localhost:9200)
 # 2. Your Ollama server is running
 
-ES_URL = "http://localhost:9200"
-INDEX_NAME = "loan_actions_index_v5" # The name of the index you created
+# Alias kept pointing at the live index version, or the legacy index until it exists
+INDEX_NAME = es_read_index(clients.elasticsearch(), ES_ACTIONS_ALIAS)
 
 # --- SETUP ---
 # Initialize the same embedding model used for indexing
@@ -15,7 +17,7 @@ embedding_model = OllamaEmbeddings(model="text-embedding-3-small")
 # Connect to your existing Elasticsearch index
 # This object knows how to talk to your vector DB
 vector_store = ElasticsearchStore(
-    es_url=ES_URL,
+    es_connection=clients.elasticsearch(),
     index_name=INDEX_NAME,
     embedding=embedding_model
     # If using security, add: es_user="elastic", es_password="YOUR_PASSWORD"
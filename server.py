@@ -1,28 +1,104 @@
+import os
 import array
+import logging
 import re
 import string
 import uuid
 import json
+from contextlib import asynccontextmanager
 from typing import Any, Dict, List, Optional
 from rag_chain_builder import RAGChainBuilder
 from tools import VectorDBTools
+from concurrency import SingleFlight, SpeculationStats, install_default_executor, run_blocking, speculate
+from retrieval_context import retrieval_scope
+from embedding_cache import embedding_cache_stats, normalize_text
+from semantic_cache import semantic_cache
+from action_catalog import action_catalog
+from payload_cache import dump_json, get_json_body, payload_cache
+from local_index import local_index_stats
+from form_validation import form_validator
+from workflow_graph import workflow_graph
+from metrics import (
+    OUTPUT_PARSING, SERIALIZATION, VALIDATION, register_stats, render_metrics,
+    request_scope, set_branch, timed
+)
+from clients import clients
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from langchain_core.messages import HumanMessage
+from langchain_core.utils.json import parse_partial_json
 from pydantic import BaseModel, Field
 
+# Per-request diagnostics; enable with logging level DEBUG for the "server" logger
+logger = logging.getLogger(__name__)
+
 chaiBuilder = RAGChainBuilder()
 
+# Opt-in speculative mode: start the RAG chain alongside get_action_directly instead of
+# after it misses. The delay bounds LLM spend on prompts the direct path resolves quickly.
+SPECULATIVE_RAG = os.getenv("SPECULATIVE_RAG", "false").lower() in ("1", "true", "yes")
+SPECULATIVE_RAG_DELAY = float(os.getenv("SPECULATIVE_RAG_DELAY_MS", "150")) / 1000
+speculation_stats = SpeculationStats()
+
+# Streamed partial responses are re-parsed only when a chunk closes a string, array or
+# object, and at most once per this many streamed characters
+STREAM_PARTIAL_MIN_CHARS = int(os.getenv("STREAM_PARTIAL_MIN_CHARS", "32"))
+_PARTIAL_TRIGGERS = ('"', "]", "}")
+
+# Opt-in: identical prompts arriving while one is being answered share that computation
+CHAT_SINGLE_FLIGHT = os.getenv("CHAT_SINGLE_FLIGHT", "false").lower() in ("1", "true", "yes")
+chat_single_flight = SingleFlight()
+
 # Initialize the vector DB tools
 vector_tools = VectorDBTools()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Route LangChain's run_in_executor(None, ...) fallbacks through the bounded pool too
+    install_default_executor()
+    yield
+    # Release the shared keep-alive pools on shutdown
+    await clients.aclose()
+    clients.close()
+
 # --- FastAPI App Setup ---
 app = FastAPI(
     title="Loan Onboarding Agent API",
     description="An API for interacting with the loan onboarding conversational agent.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Collect stage timings for the request and observe them, tagged with the route
+    and the branch that resolved it, once the response body has been sent.
+    """
+    with request_scope(request.url.path) as timings:
+        try:
+            response = await call_next(request)
+        except Exception:
+            timings.finish("500")
+            raise
+
+    # Label by route template rather than raw path to keep label cardinality bounded
+    route = request.scope.get("route")
+    timings.endpoint = getattr(route, "path", "unmatched")
+    body_iterator = response.body_iterator
+
+    async def observed_body():
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            timings.finish(str(response.status_code))
+
+    response.body_iterator = observed_body()
+    return response
+
 # --- In-memory state management ---
 # In a production app, you'd use Redis, a DB, or another persistent store.
 
@@ -82,6 +158,21 @@ class DataSubmitResponse(BaseModel):
     ui_tags: Optional[Dict[str, Any]] = Field({}, description="UI component tags for the frontend.")
     next_action_metadata: Optional[List[NextActionItem]] = Field([], description="Metadata about the next possible actions.")
 
+class ValidationResult(BaseModel):
+    action_id: str = Field(..., description="The ID of the action the submission is for.")
+    status: bool = Field(..., description="Whether every field passed validation.")
+    errors: List[ErrorItem] = Field([], description="One entry per invalid field.")
+
+
+class WorkflowStep(BaseModel):
+    action_id: str
+    stage_name: Optional[str] = None
+    step_title: Optional[str] = None
+    preconditions: List[str] = []
+
+class WorkflowPathResponse(BaseModel):
+    action_id: str = Field(..., description="The action the path starts from.")
+    steps: List[WorkflowStep] = Field([], description="The steps from the action to completion, both included.")
 
 
 class ChatResponse(BaseModel):
@@ -89,6 +180,93 @@ class ChatResponse(BaseModel):
     response: Any = Field(..., description="The agent's response - can be string or object.")
     ui_tags: List[str] = Field([], description="A list of UI component tags for the frontend.")
 
+def _validate_chat_request(request: ChatRequest):
+    """Validate request data based on type."""
+    if request.type.upper() == "FORM_DATA" and request.data is None:
+        raise HTTPException(status_code=400, detail="Data field is required for FORM_DATA requests.")
+    elif request.type.upper() == "PROMPT" and request.prompt is None:
+        raise HTTPException(status_code=400, detail="Prompt field is required for PROMPT requests.")
+
+def _sse_event(event: str, data: Any) -> str:
+    """Format a single Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _parse_partial_response(text: str):
+    """
+    Parse the JSON object streamed so far, closing any open strings, arrays and objects.
+    Returns None if no object has started yet or the prefix can't be parsed.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+    parsed = parse_partial_json(text[start:])
+    return parsed if isinstance(parsed, dict) else None
+
+def _report_retrieval(retrieval, coalesced: bool = False) -> Dict[str, str]:
+    """
+    Log the request's embedding usage (at debug level) and return it as response headers. A request
+    coalesced onto another's computation did no retrieval of its own, so it is
+    reported as coalesced rather than as zero lookups.
+    """
+    if coalesced:
+        logger.debug("Retrieval: coalesced with an in-flight identical request")
+        return {"X-Single-Flight": "coalesced"}
+    if retrieval is None:
+        return {}
+    metrics = retrieval.metrics()
+    logger.debug(
+        "Retrieval: %d embedding lookups, %d calls, %d saved",
+        metrics["embedding_requests"], metrics["embedding_calls"], metrics["embedding_calls_saved"]
+    )
+    return {
+        "X-Embedding-Calls": str(metrics["embedding_calls"]),
+        "X-Embedding-Calls-Saved": str(metrics["embedding_calls_saved"]),
+    }
+
+def _chat_response_body(session_id: str, response_body: bytes) -> bytes:
+    """
+    Serialize a ChatResponse around an already serialized `response` payload,
+    so cached workflow steps aren't re-encoded on every request.
+    """
+    return b'{"session_id":' + dump_json(session_id) + b',"response":' + response_body + b',"ui_tags":[]}'
+
+def _json_response(content: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serialize a response model like FastAPI would, timed as the serialization stage."""
+    with timed(SERIALIZATION):
+        body = dump_json(jsonable_encoder(content))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def _resolve_chat(prompt: str):
+    """
+    Resolve a prompt to either a direct action or a RAG chain answer.
+
+    Returns:
+        tuple: (action, response) - exactly one of them is set.
+    """
+    if SPECULATIVE_RAG:
+        # Run the direct lookup and the RAG chain concurrently; the chain is
+        # cancelled as soon as a direct action is found
+        result, from_chain = await speculate(
+            lambda: chaiBuilder.aget_action_directly(prompt),
+            lambda: chaiBuilder.get_chain().ainvoke(prompt),
+            delay=SPECULATIVE_RAG_DELAY,
+            stats=speculation_stats
+        )
+        if from_chain:
+            set_branch("rag")
+            return None, result
+        return result, None
+
+    # Try to get action directly from vector store first
+    action = await chaiBuilder.aget_action_directly(prompt)
+    if action:
+        return action, None
+
+    # If no direct action found, use the RAG chain
+    set_branch("rag")
+    response = await chaiBuilder.get_chain().ainvoke(prompt)
+    return None, response
+
 # --- API Endpoint ---
 @app.post("/chat")
 async def chat(request: ChatRequest):
@@ -97,42 +275,135 @@ async def chat(request: ChatRequest):
     It manages the conversation state based on the session_id.
     """
     session_id = request.session_id or str(uuid.uuid4())
+    _validate_chat_request(request)
 
-    # Validate request data based on type
-    if request.type.upper() == "FORM_DATA" and request.data is None:
-        raise HTTPException(status_code=400, detail="Data field is required for FORM_DATA requests.")
-    elif request.type.upper() == "PROMPT" and request.prompt is None:
-        raise HTTPException(status_code=400, detail="Prompt field is required for PROMPT requests.")
+    # Every search in this request shares one embedding per distinct query string
+    coalesced = False
+    with retrieval_scope(chaiBuilder.embeddings) as retrieval:
+        try:
+            if CHAT_SINGLE_FLIGHT:
+                key = normalize_text(request.prompt)
+                # Checked right before do() with no await in between, so it can't go stale
+                coalesced = chat_single_flight.in_flight(key)
+                action, response = await chat_single_flight.do(key, lambda: _resolve_chat(request.prompt))
+            else:
+                action, response = await _resolve_chat(request.prompt)
+        finally:
+            headers = _report_retrieval(retrieval, coalesced)
+
+    # The computation ran (and tagged its branch) in another request's context
+    if coalesced:
+        set_branch("coalesced")
 
-    # Try to get action directly from vector store first
-    action = chaiBuilder.get_action_directly(request.prompt)
-    
     if action:
+        # Cached workflow steps carry their serialized JSON; send it as is
+        action_body = get_json_body(action)
+        if action_body is not None:
+            with timed(SERIALIZATION):
+                body = _chat_response_body(session_id, action_body)
+            return Response(content=body, media_type="application/json", headers=headers)
+
         # Return the exact action structure
-        return ChatResponse(
+        return _json_response(ChatResponse(
             session_id=session_id,
             response=action,
             ui_tags=[]
-        )
+        ), headers)
 
-    # If no direct action found, use the RAG chain
-    response = chaiBuilder.get_chain().invoke(request.prompt)
-    
     # Try to parse response as JSON if it looks like JSON
     try:
-        parsed_response = json.loads(response)
-        return ChatResponse(
+        with timed(OUTPUT_PARSING):
+            parsed_response = json.loads(response)
+        return _json_response(ChatResponse(
             session_id=session_id,
             response=parsed_response,
             ui_tags=[]
-        )
+        ), headers)
     except json.JSONDecodeError:
         # Return as string if not valid JSON
-        return ChatResponse(
+        return _json_response(ChatResponse(
             session_id=session_id,
             response=response,
             ui_tags=[]
-        )
+        ), headers)
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, partial_json: bool = False):
+    """
+    Streaming variant of /chat using Server-Sent Events.
+
+    Directly resolved actions are sent as a single `final` event. Otherwise the RAG
+    chain's tokens are pushed as `token` events while they are generated, followed by
+    a `final` event carrying the complete response in the /chat response shape.
+    With `partial_json=true`, a `partial` event is also sent when the JSON object
+    generated so far parses to something new (checked when a token closes a string,
+    array or object, at most every STREAM_PARTIAL_MIN_CHARS characters), so clients can start rendering
+    `ui_components` before generation finishes.
+    """
+    session_id = request.session_id or str(uuid.uuid4())
+    _validate_chat_request(request)
+
+    async def event_stream():
+        with retrieval_scope(chaiBuilder.embeddings) as retrieval:
+            try:
+                async for event in chat_events():
+                    yield event
+            finally:
+                _report_retrieval(retrieval)
+
+    async def chat_events():
+        try:
+            action = await chaiBuilder.aget_action_directly(request.prompt)
+            if action:
+                action_body = get_json_body(action)
+                if action_body is not None:
+                    yield f"event: final\ndata: {_chat_response_body(session_id, action_body).decode('utf-8')}\n\n"
+                else:
+                    yield _sse_event("final", ChatResponse(
+                        session_id=session_id,
+                        response=action,
+                        ui_tags=[]
+                    ).model_dump())
+                return
+
+            set_branch("rag")
+            chunks = []
+            last_partial = None
+            unparsed = 0
+            async for chunk in chaiBuilder.get_chain().astream(request.prompt):
+                chunks.append(chunk)
+                yield _sse_event("token", {"session_id": session_id, "token": chunk})
+
+                # Each parse re-reads the whole buffer, so only parse once a value may
+                # have completed, and not on every such token
+                unparsed += len(chunk)
+                if partial_json and unparsed >= STREAM_PARTIAL_MIN_CHARS and any(c in chunk for c in _PARTIAL_TRIGGERS):
+                    unparsed = 0
+                    partial = _parse_partial_response("".join(chunks))
+                    if partial and partial != last_partial:
+                        last_partial = partial
+                        yield _sse_event("partial", {"session_id": session_id, "response": partial})
+
+            response = "".join(chunks)
+            try:
+                with timed(OUTPUT_PARSING):
+                    parsed_response = json.loads(response)
+            except json.JSONDecodeError:
+                parsed_response = response
+            yield _sse_event("final", ChatResponse(
+                session_id=session_id,
+                response=parsed_response,
+                ui_tags=[]
+            ).model_dump())
+        except Exception as e:
+            print(f"Error streaming chat response: {e}")
+            yield _sse_event("error", {"session_id": session_id, "error": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.post("/submit")
 async def submit_data(request: DataSubmitRequest):
@@ -157,8 +428,25 @@ async def submit_data(request: DataSubmitRequest):
     # Convert the list of KeyValuePair to a dictionary for processing if needed
     data_dict = {item.key: item.value for item in request.data}
     
-    # Search for relevant data in the vector database based on action_id
-    vector_results = vector_tools.search_by_action_id(action_id)
+    # Check the values against the action's declared form fields
+    with timed(VALIDATION):
+        field_errors = form_validator.validate(action_id, data_dict)
+    if field_errors:
+        return _json_response(DataSubmitResponse(
+            session_id=session_id,
+            status=False,
+            message=f"Validation failed for {len(field_errors)} field(s)",
+            action_id=action_id,
+            errors=[ErrorItem(key=key, error=error) for key, error in field_errors],
+            ui_tags={},
+            next_action_metadata=[]
+        ))
+    
+    # The stored records of actions the in-memory catalog holds are served without a
+    # round-trip; others are looked up in the vector database by action_id
+    vector_results = action_catalog.get_records(action_id)
+    if not vector_results:
+        vector_results = await vector_tools.asearch_by_action_id(action_id)
     
     # Process the results
     action_data = []
@@ -173,11 +461,16 @@ async def submit_data(request: DataSubmitRequest):
     # Here you can process the data as needed
     # For example, store it in a database, use it to update the RAG system, etc.
     
-    # Determine next actions based on vector search results
-    next_actions = []
+    # Actions in the workflow graph take their next steps from its precomputed edges;
+    # a step that completes its workflow has none
+    in_workflow = action_id in workflow_graph
+    next_actions = [
+        NextActionItem(next_action_id=next_action_id, suggestion_text=suggestion_text)
+        for next_action_id, suggestion_text in workflow_graph.next_actions(action_id)
+    ]
     
-    # If we found relevant actions in the vector database, suggest them
-    if action_data:
+    # Otherwise fall back to next actions stored in the vector search results' metadata
+    if not in_workflow and action_data:
         # Extract potential next actions from the metadata if available
         for item in action_data:
             metadata = item.get("metadata", {})
@@ -193,7 +486,7 @@ async def submit_data(request: DataSubmitRequest):
                 )
     
     # If no next actions were found in the vector database, provide default options
-    if not next_actions:
+    if not in_workflow and not next_actions:
         next_actions = [
             NextActionItem(
                 next_action_id="review_submission",
@@ -205,7 +498,7 @@ async def submit_data(request: DataSubmitRequest):
             )
         ]
     
-    return DataSubmitResponse(
+    return _json_response(DataSubmitResponse(
         session_id=session_id,
         status=True,
         message=f"Data received for action: {action_id}",
@@ -217,7 +510,89 @@ async def submit_data(request: DataSubmitRequest):
             "action_data": action_data  # Include the vector search results
         },
         next_action_metadata=next_actions
-    )
+    ))
+
+
+@app.post("/submit/validate")
+async def validate_submissions(requests: List[DataSubmitRequest]):
+    """
+    Validate many form submissions at once against their actions' form fields,
+    without submitting them.
+    """
+    with timed(VALIDATION):
+        results = form_validator.validate_many(
+            (request.action_id, {item.key: item.value for item in request.data or []})
+            for request in requests
+        )
+    return _json_response([
+        ValidationResult(
+            action_id=request.action_id,
+            status=not errors,
+            errors=[ErrorItem(key=key, error=error) for key, error in errors]
+        )
+        for request, errors in zip(requests, results)
+    ])
+
+
+@app.get("/workflow/{action_id}/path")
+async def workflow_path(action_id: str):
+    """
+    The success path from an action to the end of its workflow.
+    """
+    if action_id not in workflow_graph:
+        raise HTTPException(status_code=404, detail=f"Action '{action_id}' is not part of a workflow")
+    path = workflow_graph.path_to_completion(action_id)
+    if path is None:
+        raise HTTPException(status_code=409, detail=f"The workflow from '{action_id}' never reaches completion")
+    return _json_response(WorkflowPathResponse(
+        action_id=action_id,
+        steps=[WorkflowStep(**workflow_graph.describe(step)) for step in path]
+    ))
+
+
+# Counters reported by /stats and exported as gauges on /metrics
+STATS_SOURCES = {
+    "embedding_cache": embedding_cache_stats,
+    "semantic_cache": semantic_cache.stats,
+    "payload_cache": payload_cache.stats,
+    "local_index": local_index_stats,
+    "speculation": speculation_stats.stats,
+    "single_flight": chat_single_flight.stats,
+    "http_pools": clients.pool_stats,
+    "form_validation": form_validator.stats,
+    "workflow_graph": workflow_graph.stats,
+}
+register_stats(STATS_SOURCES)
+
+
+@app.get("/stats")
+async def stats():
+    """
+    Cache and performance counters for this worker process.
+    """
+    return {name: get_stats() for name, get_stats in STATS_SOURCES.items()}
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """
+    Prometheus exposition of per-stage latency histograms (tagged by endpoint and
+    resolution branch), request latencies and the /stats counters.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+@app.post("/cache/invalidate")
+async def invalidate_cache(collection: Optional[str] = None):
+    """
+    Drop cached RAG answers and reload the action catalog, e.g. after the
+    onboarding_flow collection is re-uploaded.
+    """
+    removed = semantic_cache.invalidate(collection)
+    if collection in (None, chaiBuilder.collection_name):
+        await run_blocking(action_catalog.load_from_vector_store, chaiBuilder.vector_store)
+    return {"collection": collection, "removed": removed}
 
 
 # Start the server when this file is run directly
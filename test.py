@@ -1,6 +1,6 @@
-import chromadb
+from clients import clients
 
-client = chromadb.HttpClient(host="3.6.132.24", port=8000)
+client = clients.chroma()
 
 # List all collections
 collections = client.list_collections()
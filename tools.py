@@ -2,9 +2,13 @@ import os
 import json
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
-from langchain_openai import OpenAIEmbeddings
-from langchain_chroma import Chroma
-import chromadb
+from embedding_cache import get_cached_embeddings
+from clients import clients
+from index_aliases import aliased_chroma
+from concurrency import run_blocking
+from action_catalog import action_catalog
+from local_index import select_vector_store
+from metrics import SIMILARITY_SEARCH, VECTOR_GET, timed
 
 # Load environment variables
 load_dotenv()
@@ -26,26 +30,32 @@ class VectorDBTools:
             print("Returning existing VectorDBTools instance...")
         return cls._instance
     
-    def __init__(self):
+    def __init__(self, vector_store=None):
         """
         Initialize the VectorDBTools with ChromaDB connection.
+
+        Args:
+            vector_store (VectorStore, optional): The vector store to search.
+                Defaults to the ChromaDB onboarding_flow collection.
         """
         # The hasattr check prevents re-initialization on subsequent calls
         if not hasattr(self, 'is_initialized'):
-            # Initialize ChromaDB client
-            self.client = chromadb.HttpClient(host='3.6.132.24', port=8000)
-            
-            self.embeddings = OpenAIEmbeddings(
-                openai_api_key=os.getenv("OPENAI_API_KEY"),
-                model="text-embedding-3-small"
-            )
-            
-            # Initialize Chroma vector store with onboarding_flow collection
-            self.vector_store = Chroma(
-                client=self.client,
-                collection_name="onboarding_flow",
-                embedding_function=self.embeddings
-            )
+            if vector_store is None:
+                # Shared ChromaDB client from the client registry
+                self.client = clients.chroma()
+                
+                # Shared, cached embeddings (memory LRU + on-disk store)
+                self.embeddings = get_cached_embeddings("text-embedding-3-small")
+                
+                # Chroma vector store for the collection the onboarding_flow alias points at
+                vector_store = aliased_chroma(self.client, "onboarding_flow", self.embeddings)
+            else:
+                self.client = None
+                self.embeddings = getattr(vector_store, "embeddings", None)
+            # Chroma, or the in-process mirror of it when VECTOR_SEARCH_BACKEND=local
+            self.vector_store = select_vector_store(vector_store, self.embeddings, "onboarding_flow")
+            self.catalog = action_catalog
+            self.catalog.ensure_loaded(self.vector_store)
             
             self.is_initialized = True
             print("VectorDBTools initialized successfully")
@@ -61,11 +71,17 @@ class VectorDBTools:
         Returns:
             List[Dict[str, Any]]: List of matching documents with their metadata
         """
+        # Exact action_id matches are served from the in-memory catalog
+        catalog_results = self.catalog.get_records(action_id)
+        if catalog_results:
+            return catalog_results
+
         try:
             # First try an exact metadata filter search
-            results = self.vector_store.get(
-                where={"action_id": action_id}
-            )
+            with timed(VECTOR_GET):
+                results = self.vector_store.get(
+                    where={"action_id": action_id}
+                )
             
             if results and len(results['ids']) > 0:
                 # Format the results
@@ -79,10 +95,11 @@ class VectorDBTools:
                 return formatted_results
             
             # If no exact match, try a similarity search with the action_id as query
-            results = self.vector_store.similarity_search(
-                query=f"action {action_id}",
-                k=k
-            )
+            with timed(SIMILARITY_SEARCH):
+                results = self.vector_store.similarity_search(
+                    query=f"action {action_id}",
+                    k=k
+                )
             
             # Format the results from similarity search
             formatted_results = []
@@ -111,10 +128,11 @@ class VectorDBTools:
             List[Dict[str, Any]]: List of matching documents with their metadata
         """
         try:
-            results = self.vector_store.similarity_search(
-                query=query,
-                k=k
-            )
+            with timed(SIMILARITY_SEARCH):
+                results = self.vector_store.similarity_search(
+                    query=query,
+                    k=k
+                )
             
             # Format the results
             formatted_results = []
@@ -130,3 +148,15 @@ class VectorDBTools:
         except Exception as e:
             print(f"Error searching vector database: {e}")
             return []
+
+    async def asearch_by_action_id(self, action_id: str, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Async version of `search_by_action_id`. The sync Chroma client runs on the bounded executor.
+        """
+        return await run_blocking(self.search_by_action_id, action_id, k)
+
+    async def asearch_by_text(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Async version of `search_by_text`. The sync Chroma client runs on the bounded executor.
+        """
+        return await run_blocking(self.search_by_text, query, k)
@@ -1,12 +1,20 @@
 import os
 import json
-import chromadb
-from langchain_openai import OpenAIEmbeddings
+import time
+import argparse
+from clients import clients
+from embedding_cache import get_cached_embeddings
+from batch_embedding import BatchEmbedder
+from incremental_sync import SOURCE_FIELD, sync_chroma_collection
+from index_aliases import chroma_blue_green_upload, chroma_resolve
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# The API server's cache invalidation endpoint; empty to skip the notification
+CACHE_INVALIDATE_URL = os.getenv("CACHE_INVALIDATE_URL", "http://localhost:8000/cache/invalidate")
+
 # Define workflow steps
 workflow_steps = {
     "mobile_otp_generation": {
@@ -163,91 +171,142 @@ onboarding_flow = {
     ]
 }
 
-def upload_workflow_to_chroma():
-    """Upload workflow steps to ChromaDB collection"""
-    try:
-        # Initialize ChromaDB client
-        client = chromadb.HttpClient(host='3.6.132.24', port=8000)
-        
-        # Initialize OpenAI embeddings
-        embeddings = OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"), model="text-embedding-3-small")
-        
-        # Check if collection exists, if not create it
-        try:
-            collection = client.get_collection("onboarding_flow")
-            print("Collection 'onboarding_flow' already exists")
-        except Exception:
-            collection = client.create_collection(
-                name="onboarding_flow",
-                metadata={"hnsw:space": "cosine"}
-            )
-            print("Created new collection 'onboarding_flow'")
+def build_workflow_records(workflow_steps, action_to_step, onboarding_flow=None):
+    """
+    Build the onboarding_flow collection records for the given workflow definitions.
+
+    Returns:
+        tuple: (ids, documents, metadatas) in upload order.
+    """
+    documents = []
+    metadatas = []
+    ids = []
+    
+    # Add workflow steps
+    for step_id, step_data in workflow_steps.items():
+        # Create a document with step details
+        doc_text = f"{step_id}: {step_data['step_title']} - {step_data['step_description']}"
+        documents.append(doc_text)
         
-        # Prepare documents for each workflow step
-        documents = []
-        metadatas = []
-        ids = []
+        # Store the full step data in metadata
+        metadatas.append({
+            "action_id": step_id,
+            "description": step_data['step_description'],
+            "full_action": json.dumps(step_data),
+            SOURCE_FIELD: "workflow"
+        })
         
-        # Add workflow steps
-        for step_id, step_data in workflow_steps.items():
-            # Create a document with step details
-            doc_text = f"{step_id}: {step_data['step_title']} - {step_data['step_description']}"
-            documents.append(doc_text)
-            
-            # Store the full step data in metadata
-            metadatas.append({
-                "action_id": step_id,
-                "description": step_data['step_description'],
-                "full_action": json.dumps(step_data)
-            })
-            
-            ids.append(f"workflow_step_{step_id}")
+        ids.append(f"workflow_step_{step_id}")
+    
+    # Add action to step mappings
+    for action_id, step_id in action_to_step.items():
+        step_data = workflow_steps[step_id]
+        doc_text = f"{action_id}: Maps to {step_id} - {step_data['step_title']}"
+        documents.append(doc_text)
         
-        # Add action to step mappings
-        for action_id, step_id in action_to_step.items():
-            step_data = workflow_steps[step_id]
-            doc_text = f"{action_id}: Maps to {step_id} - {step_data['step_title']}"
-            documents.append(doc_text)
-            
-            metadatas.append({
-                "action_id": action_id,
-                "description": f"Maps to {step_id}",
-                "step_id": step_id,
-                "full_action": json.dumps(step_data)
-            })
-            
-            ids.append(f"action_mapping_{action_id}")
+        metadatas.append({
+            "action_id": action_id,
+            "description": f"Maps to {step_id}",
+            "step_id": step_id,
+            "full_action": json.dumps(step_data),
+            SOURCE_FIELD: "workflow"
+        })
         
-        # Add the onboarding flow overview
+        ids.append(f"action_mapping_{action_id}")
+    
+    # Add the onboarding flow overview
+    if onboarding_flow:
         doc_text = f"onboarding_flow: {onboarding_flow['step_title']} - {onboarding_flow['step_description']}"
         documents.append(doc_text)
         
         metadatas.append({
             "action_id": "onboarding_flow",
             "description": onboarding_flow['step_description'],
-            "full_action": json.dumps(onboarding_flow)
+            "full_action": json.dumps(onboarding_flow),
+            SOURCE_FIELD: "workflow"
         })
         
         ids.append("workflow_overview")
+    
+    return ids, documents, metadatas
+
+def notify_cache_invalidation(collection: str = "onboarding_flow"):
+    """
+    Ask the API server to drop cached RAG answers for `collection` and reload its
+    action catalog. The cache lives in the server process, so it has to be asked
+    over HTTP. If the server can't be reached, cached answers are still guarded by
+    the semantic cache's context-hash check: an answer is only reused when the
+    retrieved context hashes the same as when it was cached.
+    """
+    if not CACHE_INVALIDATE_URL:
+        return
+    try:
+        response = clients.http_client("api").post(CACHE_INVALIDATE_URL, params={"collection": collection})
+        response.raise_for_status()
+        print(f"Server cache invalidated: {response.json()}")
+    except Exception as e:
+        print(f"Could not invalidate the server cache at {CACHE_INVALIDATE_URL}: {e}")
+
+def upload_workflow_to_chroma(blue_green: bool = False):
+    """
+    Sync workflow steps to the ChromaDB collection the onboarding_flow alias points at.
+    Only new or changed records are embedded and upserted, and records no longer
+    defined are deleted, so the upload can be re-run safely.
+
+    Args:
+        blue_green (bool): Instead of syncing in place, build a new versioned collection,
+            validate it and switch the alias to it, keeping the previous version for rollback.
+    """
+    started = time.perf_counter()
+    try:
+        # Shared ChromaDB client from the client registry
+        client = clients.chroma()
         
-        # Generate embeddings for each document
-        embeddings_list = []
-        for doc in documents:
-            embedding = embeddings.embed_query(doc)
-            embeddings_list.append(embedding)
+        # Initialize OpenAI embeddings (cached, so unchanged documents aren't re-embedded)
+        embeddings = get_cached_embeddings("text-embedding-3-small")
         
-        # Add documents to collection
-        collection.add(
-            embeddings=embeddings_list,
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        # Prepare documents for each workflow step, action mapping and the overview
+        ids, documents, metadatas = build_workflow_records(workflow_steps, action_to_step, onboarding_flow)
+        
+        # Embed in batches, several batches in flight at once
+        embedder = BatchEmbedder(embeddings)
         
-        print(f"Successfully added {len(documents)} workflow items to ChromaDB collection 'onboarding_flow'")
+        if blue_green:
+            chroma_blue_green_upload(
+                client, "onboarding_flow", ids, documents, metadatas, embedder,
+                smoke_query="mobile otp generation"
+            )
+            changed = True
+        else:
+            # Check if collection exists, if not create it
+            collection_name = chroma_resolve(client, "onboarding_flow")
+            collection = client.get_or_create_collection(
+                name=collection_name,
+                metadata={"hnsw:space": "cosine"}
+            )
+            print(f"Syncing collection '{collection_name}'")
+            report = sync_chroma_collection(collection, ids, documents, metadatas, embedder)
+            report.print_summary()
+            changed = report.changed
+
+        embed_stats = embedder.stats()
+        elapsed = time.perf_counter() - started
+        print(
+            f"Embedded {embed_stats['documents']} documents in {embed_stats['batches']} batches "
+            f"({embed_stats['retries']} rate-limit retries) at {embed_stats['docs_per_second']} docs/sec; "
+            f"upload throughput {len(documents) / elapsed:.1f} docs/sec"
+        )
+
+        # Cached RAG answers may have been generated from the previous content
+        if changed:
+            notify_cache_invalidation("onboarding_flow")
         
     except Exception as e:
         print(f"Error uploading workflow to ChromaDB: {e}")
 
 if __name__ == "__main__":
-    upload_workflow_to_chroma()
+    parser = argparse.ArgumentParser(description="Upload the workflow definitions to ChromaDB.")
+    parser.add_argument("--blue-green", action="store_true",
+                        help="Build a new collection version and switch the alias instead of syncing in place")
+    args = parser.parse_args()
+    upload_workflow_to_chroma(blue_green=args.blue_green)
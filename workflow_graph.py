@@ -0,0 +1,249 @@
+import os
+import sys
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+SUCCESS = "success"
+FAILURE = "failure"
+
+# Catalog fields holding each outcome's next action
+EDGE_FIELDS = {SUCCESS: "next_action_id_success", FAILURE: "next_action_id_failure"}
+
+
+class WorkflowGraph:
+    """
+    Transition graph of an action catalog, compiled once from each action's
+    next_action_id_success / next_action_id_failure and preconditions.
+
+    Adjacency lists, precondition sets and every action's path to completion are
+    computed up front, so next-action resolution is a dict lookup. An action is a
+    completion (terminal) step when its success edge is missing or points back at
+    itself; a failure edge pointing at itself means "retry this step".
+    """
+
+    def __init__(self, actions: Iterable[Dict[str, Any]], name: str = "workflow"):
+        """
+        Args:
+            actions (Iterable[dict]): Action definitions with next_action_id_* fields.
+            name (str): Label used in log messages.
+        """
+        self.name = name
+        self._actions: Dict[str, Dict[str, Any]] = {}
+        edges: Dict[str, Dict[str, str]] = {}
+        predecessors: Dict[str, List[str]] = {}
+        preconditions: Dict[str, FrozenSet[str]] = {}
+
+        for action in actions:
+            action_id = action["action_id"]
+            self._actions[action_id] = action
+            preconditions[action_id] = frozenset(action.get("preconditions") or ())
+            edges[action_id] = {
+                outcome: action[field] for outcome, field in EDGE_FIELDS.items() if action.get(field)
+            }
+
+        self.dangling: Tuple[Tuple[str, str, str], ...] = tuple(
+            (action_id, outcome, target)
+            for action_id, targets in edges.items()
+            for outcome, target in targets.items()
+            if target not in self._actions
+        )
+        for action_id, targets in edges.items():
+            for target in dict.fromkeys(targets.values()):
+                if target != action_id and target in self._actions:
+                    predecessors.setdefault(target, []).append(action_id)
+
+        self._edges: Mapping[str, Mapping[str, str]] = MappingProxyType(
+            {action_id: MappingProxyType(targets) for action_id, targets in edges.items()}
+        )
+        self._predecessors: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+            {action_id: tuple(sources) for action_id, sources in predecessors.items()}
+        )
+        self._preconditions: Mapping[str, FrozenSet[str]] = MappingProxyType(preconditions)
+
+        self.terminals: Tuple[str, ...] = tuple(
+            action_id for action_id in self._actions if self._is_terminal(action_id)
+        )
+        self.entries: Tuple[str, ...] = tuple(
+            action_id for action_id in self._actions if action_id not in self._predecessors
+        )
+        self.cycles: Tuple[Tuple[str, ...], ...] = self._find_success_cycles()
+        self._paths: Mapping[str, Optional[Tuple[str, ...]]] = MappingProxyType(self._compile_paths())
+        self.unreachable: Tuple[str, ...] = self._find_unreachable()
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    def __contains__(self, action_id: str) -> bool:
+        return action_id in self._actions
+
+    def _is_terminal(self, action_id: str) -> bool:
+        target = self._edges[action_id].get(SUCCESS)
+        return target is None or target == action_id
+
+    def _success_target(self, action_id: str) -> Optional[str]:
+        """The next step on success, or None for terminal steps and dangling edges."""
+        if self._is_terminal(action_id):
+            return None
+        target = self._edges[action_id][SUCCESS]
+        return target if target in self._actions else None
+
+    def _find_success_cycles(self) -> Tuple[Tuple[str, ...], ...]:
+        """Loops of two or more steps along success edges, which never reach completion."""
+        cycles = []
+        state: Dict[str, int] = {}  # 1 = on the current walk, 2 = finished
+        for start in self._actions:
+            walk = []
+            action_id = start
+            while action_id is not None and action_id not in state:
+                state[action_id] = 1
+                walk.append(action_id)
+                action_id = self._success_target(action_id)
+            if action_id is not None and state[action_id] == 1:
+                cycles.append(tuple(walk[walk.index(action_id):]))
+            for visited in walk:
+                state[visited] = 2
+        return tuple(cycles)
+
+    def _compile_paths(self) -> Dict[str, Optional[Tuple[str, ...]]]:
+        """Every action's success path to a terminal step; None if it runs into a cycle or a dangling edge."""
+        in_cycle = {action_id for cycle in self.cycles for action_id in cycle}
+        paths: Dict[str, Optional[Tuple[str, ...]]] = {}
+        for start in self._actions:
+            walk = []
+            action_id = start
+            while action_id not in paths and action_id not in in_cycle:
+                walk.append(action_id)
+                next_id = self._success_target(action_id)
+                if next_id is None:
+                    ended = self._is_terminal(action_id)
+                    paths[action_id] = (action_id,) if ended else None
+                    walk.pop()
+                    break
+                action_id = next_id
+            else:
+                if action_id in in_cycle:
+                    paths[action_id] = None
+            # Unwind the walk, reusing the already known tail
+            for visited in reversed(walk):
+                tail = paths[self._success_target(visited)]
+                paths[visited] = (visited,) + tail if tail is not None else None
+        return paths
+
+    def _find_unreachable(self) -> Tuple[str, ...]:
+        """Actions no entry step reaches along any edge."""
+        roots = self.entries or tuple(self._actions)[:1]
+        reached = self.reachable_from(*roots)
+        return tuple(action_id for action_id in self._actions if action_id not in reached)
+
+    def action(self, action_id: str) -> Optional[Dict[str, Any]]:
+        """The catalog definition of an action in the graph, or None."""
+        return self._actions.get(action_id)
+
+    def successors(self, action_id: str) -> Mapping[str, str]:
+        """Outcome -> next action_id for this action; empty if it is unknown."""
+        return self._edges.get(action_id, MappingProxyType({}))
+
+    def predecessors(self, action_id: str) -> Tuple[str, ...]:
+        """Actions that lead to this one on success or failure, excluding retries."""
+        return self._predecessors.get(action_id, ())
+
+    def preconditions(self, action_id: str) -> FrozenSet[str]:
+        return self._preconditions.get(action_id, frozenset())
+
+    def reachable_from(self, *action_ids: str) -> Set[str]:
+        """Every action reachable from `action_ids` along success and failure edges, including themselves."""
+        reached = {action_id for action_id in action_ids if action_id in self._actions}
+        pending = list(reached)
+        while pending:
+            for target in self.successors(pending.pop()).values():
+                if target in self._actions and target not in reached:
+                    reached.add(target)
+                    pending.append(target)
+        return reached
+
+    def path_to_completion(self, action_id: str) -> Optional[Tuple[str, ...]]:
+        """
+        The success path from `action_id` to a terminal step, both included.
+
+        Returns:
+            Optional[Tuple[str, ...]]: The action_ids in order; None if the action is
+            unknown or its success path loops or leaves the catalog.
+        """
+        return self._paths.get(action_id)
+
+    def describe(self, action_id: str) -> Dict[str, Any]:
+        """Summary of one step for API responses."""
+        action = self._actions[action_id]
+        ui_definition = action.get("ui_definition") or {}
+        return {
+            "action_id": action_id,
+            "stage_name": action.get("stage_name"),
+            "step_title": ui_definition.get("step_title"),
+            "preconditions": sorted(self.preconditions(action_id)),
+        }
+
+    def next_actions(self, action_id: str) -> List[Tuple[str, str]]:
+        """
+        Suggested next steps after submitting `action_id`, from its outgoing edges.
+
+        Returns:
+            List[Tuple[str, str]]: (next_action_id, suggestion_text) pairs, success
+            first; empty if the action is unknown or completes the workflow.
+        """
+        if action_id not in self._actions or self._is_terminal(action_id):
+            return []
+        suggestions = []
+        for outcome, target in self.successors(action_id).items():
+            if target not in self._actions:
+                continue
+            stage = self._actions[target].get("stage_name") or target
+            if target == action_id:
+                text = f"Retry {stage}"
+            else:
+                text = f"Continue to {stage}" if outcome == SUCCESS else f"Go back to {stage}"
+            suggestions.append((target, text))
+        return suggestions
+
+    def check(self) -> Dict[str, Any]:
+        """Structural problems found while compiling: dangling edges, success cycles, unreachable steps."""
+        return {
+            "dangling_edges": [
+                {"action_id": action_id, "outcome": outcome, "target": target}
+                for action_id, outcome, target in self.dangling
+            ],
+            "cycles": [list(cycle) for cycle in self.cycles],
+            "unreachable": list(self.unreachable),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "actions": len(self._actions),
+            "edges": sum(len(targets) for targets in self._edges.values()),
+            "entries": len(self.entries),
+            "terminals": len(self.terminals),
+            "dangling_edges": len(self.dangling),
+            "cycles": len(self.cycles),
+            "unreachable": len(self.unreachable),
+        }
+
+
+def load_workflow_graph() -> WorkflowGraph:
+    """Compile the graph of db/dbdata.py, the catalog that declares transitions, and log its problems."""
+    # db/ is a folder of scripts rather than a package
+    db_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "db")
+    if db_dir not in sys.path:
+        sys.path.insert(0, db_dir)
+    import dbdata
+
+    graph = WorkflowGraph(dbdata.get_action_registry(), name="db/dbdata.py")
+    for action_id, outcome, target in graph.dangling:
+        print(f"Workflow {graph.name}: {action_id} {outcome} edge points to unknown action {target}")
+    for cycle in graph.cycles:
+        print(f"Workflow {graph.name}: success edges loop without completing: {' -> '.join(cycle)}")
+    if graph.unreachable:
+        print(f"Workflow {graph.name}: unreachable from any entry step: {', '.join(graph.unreachable)}")
+    return graph
+
+
+# Shared graph, compiled when first imported
+workflow_graph = load_workflow_graph()